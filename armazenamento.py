@@ -0,0 +1,210 @@
+"""
+Armazenamento colunar dos dados consolidados (Parquet particionado por Ano)
+
+Substitui o antigo dados_completos.csv como intermediário compartilhado entre
+a consolidação, os geradores de gráficos e o relatório detalhado.
+"""
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from colunas_derivadas import ORDEM_CATEGORIAS
+from instrumentacao import etapa
+
+# Diretório do dataset (um subdiretório Ano=AAAA por ano)
+CAMINHO_DADOS = 'dados_completos.parquet'
+
+# Colunas de alta repetição gravadas como dicionário (categóricas no pandas)
+COLUNAS_CATEGORICAS = ['Rodovia', 'Regional', 'Tipo Acidente', 'Sentido', 'Ocorrencia']
+COLUNAS_DATA = ['Data Abertura', 'Nova data']
+COLUNAS_VITIMAS = ['Leve', 'Grave', 'Fatal', 'Total de Vítimas']
+# Colunas derivadas (colunas_derivadas.py): categóricas e inteiros pequenos
+COLUNAS_CATEGORICAS_DERIVADAS = ['Ano_Mes', 'Faixa_KM', 'Gravidade_Categoria']
+COLUNAS_INT8 = ['Mes', 'Dia_Semana']
+
+# Esquema fixo de cada partição (o Ano fica no nome do diretório)
+ESQUEMA = pa.schema([
+    ('Evento', pa.string()),
+    ('Rodovia', pa.dictionary(pa.int32(), pa.string())),
+    ('Km', pa.float64()),
+    ('Sentido', pa.dictionary(pa.int32(), pa.string())),
+    ('Ocorrencia', pa.dictionary(pa.int32(), pa.string())),
+    ('Tipo Acidente', pa.dictionary(pa.int32(), pa.string())),
+    ('Leve', pa.int32()),
+    ('Grave', pa.int32()),
+    ('Fatal', pa.int32()),
+    ('Data Abertura', pa.timestamp('us')),
+    ('Regional', pa.dictionary(pa.int32(), pa.string())),
+    ('Nova data', pa.timestamp('us')),
+    ('Total de Vítimas', pa.int32()),
+    ('UBA', pa.string()),
+    ('UBA sigla', pa.string()),
+    ('Mes', pa.int8()),
+    ('Dia_Semana', pa.int8()),
+    ('Ano_Mes', pa.dictionary(pa.int32(), pa.string())),
+    ('Faixa_KM', pa.dictionary(pa.int32(), pa.string())),
+    ('Gravidade_Categoria', pa.dictionary(pa.int32(), pa.string())),
+    ('Severidade', pa.float64()),
+])
+
+# Arquivo de cada planilha na partição do ano (na ordem das planilhas: o
+# dataset lê os arquivos em ordem alfabética)
+NOME_PARTE = 'parte-{:03d}.parquet'
+
+PARTICIONAMENTO = ds.partitioning(pa.schema([('Ano', pa.int16())]), flavor='hive')
+
+
+def _tipar_colunas(df):
+    """Converte o DataFrame consolidado para os tipos do esquema"""
+    df = df.copy()
+    for col in ESQUEMA.names:
+        if col not in df.columns:
+            df[col] = None
+    # Evento e Rodovia misturam números e textos entre os anos
+    df['Evento'] = df['Evento'].astype('string')
+    df['UBA'] = df['UBA'].astype('string')
+    df['UBA sigla'] = df['UBA sigla'].astype('string')
+    for col in COLUNAS_CATEGORICAS + COLUNAS_CATEGORICAS_DERIVADAS:
+        df[col] = df[col].astype('string').astype('category')
+    for col in COLUNAS_DATA:
+        df[col] = pd.to_datetime(df[col], errors='coerce').astype('datetime64[us]')
+    df['Km'] = pd.to_numeric(df['Km'], errors='coerce').astype('float64')
+    # Contagens de vítimas como inteiros (nulos preservados)
+    for col in COLUNAS_VITIMAS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int32')
+    for col in COLUNAS_INT8:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int8')
+    df['Severidade'] = pd.to_numeric(df['Severidade'], errors='coerce').astype('float64')
+    return df
+
+
+def caminho_particao(ano, caminho=CAMINHO_DADOS):
+    """Diretório da partição de um ano"""
+    return os.path.join(caminho, f'Ano={int(ano)}')
+
+
+def _tabela_arrow(df):
+    """Tabela Arrow no ESQUEMA a partir de um DataFrame (ou bloco) de acidentes"""
+    df = _tipar_colunas(df)
+    tabela = pa.Table.from_pandas(df[ESQUEMA.names], schema=ESQUEMA, preserve_index=False)
+    # Sem metadados do pandas: a leitura usa os tipos Arrow (inteiros com nulos
+    # voltam como float64, dicionários como categóricas)
+    return tabela.replace_schema_metadata(None)
+
+
+def caminho_provisorio(ano, caminho=CAMINHO_DADOS):
+    """Diretório onde a partição de um ano é montada antes de substituir a
+    atual (o prefixo '_' faz o pyarrow ignorá-lo ao abrir o dataset)"""
+    return os.path.join(caminho, f'_Ano={int(ano)}.parcial')
+
+
+def gravar_blocos(blocos, arquivo, ano):
+    """Grava os blocos de linhas em um arquivo Parquet no ESQUEMA
+
+    Cada bloco (DataFrame) vira um row group, de modo que só um bloco fica
+    em memória por vez. Devolve o número de linhas gravadas.
+    """
+    linhas = 0
+    with pq.ParquetWriter(arquivo, ESQUEMA, compression='zstd') as escritor:
+        for bloco in blocos:
+            with etapa('gravacao_parquet', ano=ano, linhas=len(bloco)):
+                escritor.write_table(_tabela_arrow(bloco))
+            linhas += len(bloco)
+    return linhas
+
+
+def substituir_particao(ano, origem, caminho=CAMINHO_DADOS):
+    """Troca a partição do ano pelo diretório `origem` já completo"""
+    destino = caminho_particao(ano, caminho)
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    os.replace(origem, destino)
+    return destino
+
+
+def salvar_particao_em_blocos(blocos, ano, caminho=CAMINHO_DADOS):
+    """Grava (substituindo) a partição de um ano a partir de blocos de linhas
+
+    Devolve o número de linhas gravadas (ver gravar_blocos).
+    """
+    destino = caminho_particao(ano, caminho)
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    os.makedirs(destino)
+    return gravar_blocos(blocos, os.path.join(destino, NOME_PARTE.format(0)), ano)
+
+
+def salvar_particao(df_ano, ano, caminho=CAMINHO_DADOS):
+    """Grava (substituindo) a partição de um único ano"""
+    salvar_particao_em_blocos([df_ano], ano, caminho)
+    return caminho_particao(ano, caminho)
+
+
+def salvar_dados(df, caminho=CAMINHO_DADOS):
+    """Grava o DataFrame consolidado, uma partição por valor de 'Ano'"""
+    for ano, df_ano in df.groupby('Ano', sort=True):
+        salvar_particao(df_ano, ano, caminho)
+
+
+def anos_disponiveis(caminho=CAMINHO_DADOS):
+    """Anos com partição gravada no dataset"""
+    if not os.path.isdir(caminho):
+        return []
+    anos = []
+    for nome in os.listdir(caminho):
+        if nome.startswith('Ano='):
+            anos.append(int(nome[4:]))
+    return sorted(anos)
+
+
+def abrir_dataset(caminho=CAMINHO_DADOS):
+    """Abre o dataset Parquet particionado (leitura preguiçosa)"""
+    if not os.path.isdir(caminho):
+        raise FileNotFoundError(
+            f"Dataset '{caminho}' não encontrado. Execute consolidar_dados.py primeiro."
+        )
+    return ds.dataset(caminho, format='parquet', partitioning=PARTICIONAMENTO)
+
+
+def para_pandas(tabela):
+    """DataFrame de uma tabela Arrow do dataset
+
+    Datas voltam como timestamps e as colunas de dicionário como categóricas,
+    sem reprocessamento de texto. As categorias são ordenadas (ou seguem
+    ORDEM_CATEGORIAS, ex.: todas as faixas de km em ordem), para não
+    dependerem da ordem dos anos e dos blocos gravados.
+    """
+    return ordenar_categorias(tabela.to_pandas())
+
+
+def ordenar_categorias(df):
+    """Converte as colunas categóricas de `df` (texto ou categoria) para
+    categorias em ordem estável, no lugar"""
+    for col in df.columns.intersection(COLUNAS_CATEGORICAS + COLUNAS_CATEGORICAS_DERIVADAS):
+        if col in ORDEM_CATEGORIAS:
+            df[col] = df[col].astype('category').cat.set_categories(ORDEM_CATEGORIAS[col])
+        else:
+            df[col] = df[col].astype('category')
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def carregar_dados(colunas=None, anos=None, caminho=CAMINHO_DADOS, filtro=None):
+    """Carrega apenas as colunas e as partições de ano pedidas
+
+    `filtro` é uma expressão opcional do pyarrow.dataset, avaliada na
+    leitura (ver consulta.py). Tipos como em para_pandas.
+    """
+    dataset = abrir_dataset(caminho)
+    if colunas is not None:
+        colunas = list(dict.fromkeys(list(colunas) + ['Ano']))
+    if anos is not None:
+        filtro_anos = ds.field('Ano').isin([int(a) for a in anos])
+        filtro = filtro_anos if filtro is None else filtro & filtro_anos
+    tabela = dataset.to_table(columns=colunas, filter=filtro)
+    df = para_pandas(tabela)
+    return df.sort_values('Ano', kind='stable').reset_index(drop=True)
@@ -0,0 +1,220 @@
+"""
+Preparação dos arquivos do site: HTML minificado e versões pré-comprimidas
+
+- minificar_html: remove a indentação e os espaços redundantes das páginas
+  geradas (usado pelo motor em cada gráfico). Blocos <pre>/<textarea> ficam
+  intactos; scripts só são compactados fora das strings e quando não têm
+  '/' (comentários, regex) nem template strings, casos em que ficam como estão.
+- gravar_comprimidos: grava as versões .gz e .br ao lado do arquivo, para
+  servidores que as entregam com Content-Encoding (servidor_local.py). Elas
+  não são versionadas: valem para a pré-visualização local, não para o site
+  publicado sem build (no Render, a compressão é feita pelo serviço).
+- preparar_ativos: percorre o site e (re)gera as versões comprimidas de
+  cada HTML, JSON e JS cujo original mudou, removendo as que ficaram órfãs.
+
+O .gz é gravado com mtime=0 (mesmo conteúdo, mesmo arquivo) e a versão
+comprimida só é mantida se for menor que o original.
+
+Uso:
+    python ativos_estaticos.py                 # .gz e .br de todo o site
+    python ativos_estaticos.py --comprimir gz
+"""
+import argparse
+import gzip
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # compressão .br é opcional
+    brotli = None
+
+from instrumentacao import etapa
+
+COMPRESSOES = ['gz', 'br']
+
+# Extensões comprimidas e tamanho mínimo (abaixo disso o ganho não compensa)
+EXTENSOES_COMPRIMIVEIS = ('.html', '.json', '.js', '.css', '.svg')
+TAMANHO_MINIMO = 1024
+
+# Pastas que não fazem parte do site publicado
+DIRETORIOS_IGNORADOS = {'.git', '__pycache__', 'dados_completos.parquet', 'perfis', '.venv', 'venv'}
+
+_BLOCO_HTML = re.compile(r'<(script|style|pre|textarea)\b[^>]*>.*?</\1\s*>', re.S | re.I)
+_ABERTURA = re.compile(r'^<[^>]*>', re.S)
+_STRING_OU_ESPACO = re.compile(r'''("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')|(\s+)''')
+
+# Pontuação junto à qual o espaço pode ser removido, por linguagem
+_PONTUACAO_JS = set('{}[]();,:')
+_PONTUACAO_CSS = set('{};,')
+
+
+def _compactar(codigo, pontuacao, quebras=True):
+    """Reduz os espaços fora das strings: espaços junto à `pontuacao` somem
+    e os demais viram um espaço; com `quebras`, uma sequência com quebra de
+    linha vira uma só quebra (no JS a quebra pode encerrar o comando)"""
+    partes = []
+    fim = 0
+    for casamento in _STRING_OU_ESPACO.finditer(codigo):
+        partes.append(codigo[fim:casamento.start()])
+        fim = casamento.end()
+        if casamento.group(1) is not None:
+            partes.append(casamento.group(1))
+            continue
+        espaco = casamento.group(2)
+        anterior = codigo[casamento.start() - 1] if casamento.start() else ''
+        seguinte = codigo[fim] if fim < len(codigo) else ''
+        if not anterior or not seguinte:
+            continue
+        if quebras and '\n' in espaco:
+            partes.append('\n')
+        elif anterior not in pontuacao and seguinte not in pontuacao:
+            partes.append(' ')
+    partes.append(codigo[fim:])
+    return ''.join(partes)
+
+
+def _script_compactavel(codigo):
+    """Só scripts sem '/' nem '`' fora das strings (comentários, regex e
+    template strings exigiriam um analisador de JS)"""
+    sem_strings = _STRING_OU_ESPACO.sub(lambda c: '' if c.group(1) else c.group(2), codigo)
+    return '/' not in sem_strings and '`' not in sem_strings
+
+
+def _minificar_bloco(bloco, tag):
+    tag = tag.lower()
+    if tag in ('pre', 'textarea'):
+        return bloco
+    abertura = _ABERTURA.match(bloco).group(0)
+    fechamento = bloco[bloco.rindex('<'):]
+    conteudo = bloco[len(abertura):len(bloco) - len(fechamento)]
+    if tag == 'style':
+        conteudo = _compactar(conteudo, _PONTUACAO_CSS, quebras=False)
+    elif _script_compactavel(conteudo):
+        conteudo = _compactar(conteudo, _PONTUACAO_JS)
+    return re.sub(r'\s+', ' ', abertura) + conteudo + fechamento
+
+
+def minificar_html(texto):
+    """HTML sem indentação nem espaços redundantes (mesma renderização)"""
+    partes = []
+    fim = 0
+    for casamento in _BLOCO_HTML.finditer(texto):
+        partes.append(re.sub(r'\s*\n\s*', '\n', re.sub(r'[ \t]+', ' ', texto[fim:casamento.start()])))
+        partes.append(_minificar_bloco(casamento.group(0), casamento.group(1)))
+        fim = casamento.end()
+    partes.append(re.sub(r'\s*\n\s*', '\n', re.sub(r'[ \t]+', ' ', texto[fim:])))
+    return ''.join(partes).strip()
+
+
+def comprimir(conteudo, compressao):
+    """Bytes comprimidos em 'gz' ou 'br' (nível máximo)"""
+    if compressao == 'gz':
+        # mtime=0: o .gz não muda se o conteúdo não mudar
+        return gzip.compress(conteudo, compresslevel=9, mtime=0)
+    if compressao == 'br':
+        if brotli is None:
+            raise ImportError("brotli não instalado (pip install brotli)")
+        return brotli.compress(conteudo, quality=11)
+    raise ValueError(f"Compressão inválida: {compressao} (use {', '.join(COMPRESSOES)})")
+
+
+def gravar_comprimidos(caminho, conteudo, compressoes=COMPRESSOES):
+    """Grava `caminho`.gz/.br com o `conteudo` (bytes) comprimido
+
+    Compressões indisponíveis (.br sem o brotli) são ignoradas; versões que
+    não ficam menores que o original são removidas. Devolve os caminhos
+    gravados.
+    """
+    gravados = []
+    for compressao in compressoes:
+        if compressao == 'br' and brotli is None:
+            continue
+        destino = f'{caminho}.{compressao}'
+        with etapa('compressao', arquivo=destino) as registro:
+            comprimido = comprimir(conteudo, compressao)
+            if len(comprimido) >= len(conteudo):
+                if os.path.exists(destino):
+                    os.remove(destino)
+                continue
+            with open(destino, 'wb') as f:
+                f.write(comprimido)
+            registro['bytes'] = len(comprimido)
+        gravados.append(destino)
+    return gravados
+
+
+def variante_atual(caminho, compressao):
+    """True se `caminho`.<compressao> existe e não é mais antigo que o original"""
+    try:
+        return os.stat(f'{caminho}.{compressao}').st_mtime_ns >= os.stat(caminho).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def arquivos_do_site(diretorio='.'):
+    """Caminhos dos arquivos comprimíveis do site, em ordem"""
+    for raiz, pastas, arquivos in os.walk(diretorio):
+        pastas[:] = sorted(p for p in pastas if p not in DIRETORIOS_IGNORADOS and not p.startswith('.'))
+        for nome in sorted(arquivos):
+            if nome.endswith(EXTENSOES_COMPRIMIVEIS):
+                yield os.path.join(raiz, nome)
+
+
+def preparar_ativos(diretorio='.', compressoes=COMPRESSOES):
+    """Gera as versões comprimidas desatualizadas e remove as órfãs
+
+    Devolve {'comprimidos': n, 'atuais': n, 'removidos': n, 'bytes': (originais, comprimidos)}
+    com os bytes dos originais e das menores versões comprimidas.
+    """
+    if 'br' in compressoes and brotli is None:
+        print("⚠ Módulo brotli não instalado: arquivos .br não serão gerados")
+        compressoes = [c for c in compressoes if c != 'br']
+    resumo = {'comprimidos': 0, 'atuais': 0, 'removidos': 0}
+    originais = comprimidos = 0
+    for caminho in arquivos_do_site(diretorio):
+        tamanho = os.path.getsize(caminho)
+        if tamanho < TAMANHO_MINIMO:
+            continue
+        pendentes = [c for c in compressoes if not variante_atual(caminho, c)]
+        if pendentes:
+            with open(caminho, 'rb') as f:
+                gravar_comprimidos(caminho, f.read(), pendentes)
+            resumo['comprimidos'] += 1
+        else:
+            resumo['atuais'] += 1
+        variantes = [os.path.getsize(f'{caminho}.{c}') for c in COMPRESSOES if os.path.exists(f'{caminho}.{c}')]
+        originais += tamanho
+        comprimidos += min(variantes, default=tamanho)
+
+    # Versões comprimidas de arquivos que não existem mais (ex.: versionados antigos)
+    for raiz, pastas, arquivos in os.walk(diretorio):
+        pastas[:] = [p for p in pastas if p not in DIRETORIOS_IGNORADOS and not p.startswith('.')]
+        for nome in arquivos:
+            base, extensao = os.path.splitext(nome)
+            if (extensao[1:] in COMPRESSOES and base.endswith(EXTENSOES_COMPRIMIVEIS)
+                    and not os.path.exists(os.path.join(raiz, base))):
+                os.remove(os.path.join(raiz, nome))
+                resumo['removidos'] += 1
+    resumo['bytes'] = (originais, comprimidos)
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera as versões pré-comprimidas dos arquivos do site')
+    parser.add_argument('diretorio', nargs='?', default='.', help='pasta do site (padrão: atual)')
+    parser.add_argument('--comprimir', nargs='+', choices=COMPRESSOES, default=COMPRESSOES,
+                        help='compressões geradas (padrão: gz br)')
+    args = parser.parse_args()
+
+    resumo = preparar_ativos(args.diretorio, args.comprimir)
+    originais, comprimidos = resumo['bytes']
+    print(f"✓ {resumo['comprimidos']} arquivos comprimidos, {resumo['atuais']} já atualizados, "
+          f"{resumo['removidos']} versões órfãs removidas")
+    if comprimidos:
+        print(f"• {originais / 1024:,.0f} KB -> {comprimidos / 1024:,.0f} KB "
+              f"({originais / comprimidos:.1f}x menor)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""
+Banco analítico embutido (DuckDB ou SQLite) com os dados consolidados
+
+Opcional: carrega o dataset Parquet em um arquivo de banco e executa nele as
+agregações dos gráficos, de modo que só os resultados (pequenos) voltam ao
+Python. A carga é feita em lotes, partição por partição, sem montar a base
+inteira em memória.
+
+Usa o DuckDB se estiver instalado (tabela ordenada por Ano e data, o que
+deixa os zone maps de cada row group seletivos); senão, o sqlite3 da
+biblioteca padrão, com índices em Ano, Rodovia, Regional e Data Abertura.
+O banco é recriado quando os arquivos do dataset mudam.
+
+Uso:
+    python banco_analitico.py                 # cria/atualiza o banco
+    python motor_graficos.py --banco          # cubo, calendário e distribuições agregados no banco
+"""
+import argparse
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+try:
+    import duckdb
+except ImportError:  # DuckDB é opcional; sem ele, SQLite
+    duckdb = None
+
+from armazenamento import CAMINHO_DADOS, ESQUEMA, abrir_dataset, ordenar_categorias
+from cubo_agregado import DIMENSOES_CUBO, METRICAS_CUBO
+from serie_temporal import METRICAS_SERIE, densificar
+
+ARQUIVOS_BANCO = {'duckdb': 'acidentes.duckdb', 'sqlite': 'acidentes.sqlite'}
+TABELA = 'acidentes'
+COLUNAS_INDICE = ['Ano', 'Rodovia', 'Regional', 'Data Abertura']
+
+# Linhas por lote na carga do SQLite
+TAMANHO_LOTE = 50_000
+
+
+def motor_banco():
+    """'duckdb' se disponível, senão 'sqlite'"""
+    return 'duckdb' if duckdb is not None else 'sqlite'
+
+
+def _q(nome):
+    """Identificador SQL entre aspas (há colunas com espaço e acento)"""
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def _conectar(caminho_banco, motor):
+    if motor == 'duckdb':
+        return duckdb.connect(caminho_banco)
+    return sqlite3.connect(caminho_banco)
+
+
+def assinatura_dataset(caminho=CAMINHO_DADOS):
+    """Arquivos do dataset com tamanho e mtime (muda quando a consolidação regrava)
+
+    Só as partições Ano=AAAA contam: partições provisórias deixadas por uma
+    consolidação interrompida (_Ano=AAAA.parcial) não fazem parte do dataset.
+    """
+    arquivos = []
+    for raiz, pastas, nomes in os.walk(caminho):
+        if raiz == caminho:
+            pastas[:] = [p for p in pastas if p.startswith('Ano=')]
+        for nome in sorted(nomes):
+            if nome.endswith('.parquet'):
+                arquivo = os.path.join(raiz, nome)
+                st = os.stat(arquivo)
+                arquivos.append([os.path.relpath(arquivo, caminho), st.st_size, st.st_mtime])
+    return json.dumps(sorted(arquivos))
+
+
+def _tipo_sqlite(tipo):
+    if pa.types.is_dictionary(tipo) or pa.types.is_string(tipo) or pa.types.is_timestamp(tipo):
+        return 'TEXT'
+    if pa.types.is_integer(tipo):
+        return 'INTEGER'
+    return 'REAL'
+
+
+def _carregar_sqlite(con, caminho):
+    """Cria a tabela e insere o dataset em lotes (datas como texto ISO)"""
+    campos = [pa.field('Ano', pa.int16())] + list(ESQUEMA)
+    colunas = ', '.join(f"{_q(c.name)} {_tipo_sqlite(c.type)}" for c in campos)
+    con.execute(f"CREATE TABLE {TABELA} ({colunas})")
+    marcadores = ', '.join('?' for _ in campos)
+    nomes = [c.name for c in campos]
+    for lote in abrir_dataset(caminho).to_batches(columns=nomes, batch_size=TAMANHO_LOTE):
+        valores = []
+        for campo in campos:
+            coluna = lote.column(campo.name)
+            if pa.types.is_timestamp(campo.type):
+                coluna = pc.strftime(coluna, format='%Y-%m-%d %H:%M:%S')
+            elif pa.types.is_dictionary(campo.type):
+                coluna = coluna.cast(campo.type.value_type)
+            valores.append(coluna.to_pylist())
+        con.executemany(f"INSERT INTO {TABELA} VALUES ({marcadores})", zip(*valores))
+    for coluna in COLUNAS_INDICE:
+        con.execute(f"CREATE INDEX {_q('idx_' + coluna)} ON {TABELA} ({_q(coluna)})")
+    con.execute("ANALYZE")
+
+
+def _carregar_duckdb(con, caminho):
+    """Cria a tabela direto dos arquivos Parquet, ordenada por Ano e data"""
+    # Só as partições Ano=AAAA (não as provisórias _Ano=AAAA.parcial)
+    padrao = os.path.join(caminho, 'Ano=*', '*.parquet')
+    con.execute(
+        f"CREATE TABLE {TABELA} AS SELECT * FROM read_parquet(?, hive_partitioning = true) "
+        f"ORDER BY {_q('Ano')}, {_q('Data Abertura')}",
+        [padrao],
+    )
+
+
+def criar_banco(caminho_banco=None, caminho=CAMINHO_DADOS, motor=None, forcar=False):
+    """Cria (ou recria, se o dataset mudou) o banco analítico; devolve o caminho"""
+    motor = motor or motor_banco()
+    caminho_banco = caminho_banco or ARQUIVOS_BANCO[motor]
+    assinatura = assinatura_dataset(caminho)
+    if not forcar and os.path.exists(caminho_banco):
+        con = _conectar(caminho_banco, motor)
+        try:
+            atual = con.execute("SELECT valor FROM metadados WHERE chave = 'dataset'").fetchone()
+        except Exception:
+            atual = None
+        finally:
+            con.close()
+        if atual and atual[0] == assinatura:
+            return caminho_banco
+
+    if os.path.exists(caminho_banco):
+        os.remove(caminho_banco)
+    con = _conectar(caminho_banco, motor)
+    try:
+        if motor == 'duckdb':
+            _carregar_duckdb(con, caminho)
+        else:
+            _carregar_sqlite(con, caminho)
+        con.execute("CREATE TABLE metadados (chave TEXT PRIMARY KEY, valor TEXT)")
+        con.execute("INSERT INTO metadados VALUES ('dataset', ?)", [assinatura])
+        if motor == 'sqlite':
+            con.commit()
+    finally:
+        con.close()
+    print(f"✓ Banco {motor} criado em {caminho_banco}")
+    return caminho_banco
+
+
+def consultar_banco(sql, parametros=(), caminho_banco=None, motor=None):
+    """Executa uma consulta SQL no banco e devolve o resultado como DataFrame"""
+    motor = motor or motor_banco()
+    caminho_banco = caminho_banco or ARQUIVOS_BANCO[motor]
+    con = _conectar(caminho_banco, motor)
+    try:
+        if motor == 'duckdb':
+            return con.execute(sql, list(parametros)).df()
+        return pd.read_sql_query(sql, con, params=list(parametros))
+    finally:
+        con.close()
+
+
+def _onde(condicoes, anos):
+    """Cláusula WHERE (vazia se não há condições) com o filtro de anos e seus parâmetros"""
+    condicoes = list(condicoes)
+    parametros = []
+    if anos is not None:
+        parametros = [int(a) for a in anos]
+        condicoes.append(f"{_q('Ano')} IN ({', '.join('?' for _ in parametros)})")
+    return (f" WHERE {' AND '.join(condicoes)}" if condicoes else ''), parametros
+
+
+def construir_cubo_banco(colunas, anos=None, caminho_banco=None, motor=None):
+    """Cubo agregado (como cubo_agregado.construir_cubo) calculado no banco
+
+    Usa as dimensões e métricas do cubo presentes em `colunas`. Só as
+    células agregadas são trazidas para o pandas, ordenadas pelas dimensões
+    (a ordem do GROUP BY varia com o motor e o plano da consulta).
+    """
+    presentes = set(colunas) | {'Ano'}
+    dimensoes = [d for d in DIMENSOES_CUBO if d in presentes]
+    metricas = [m for m in METRICAS_CUBO if m in presentes]
+    selecao = [_q(d) for d in dimensoes] + ['COUNT(*) AS "Acidentes"']
+    selecao += [f"COALESCE(SUM({_q(m)}), 0) AS {_q(m)}" for m in metricas]
+    onde, parametros = _onde([], anos)
+    sql = f"SELECT {', '.join(selecao)} FROM {TABELA}{onde}"
+    sql += f" GROUP BY {', '.join(_q(d) for d in dimensoes)}"
+    sql += f" ORDER BY {', '.join(_q(d) for d in dimensoes)}"
+    return ordenar_categorias(consultar_banco(sql, parametros, caminho_banco, motor))
+
+
+def calendario_banco(colunas, anos=None, caminho_banco=None, motor=None):
+    """Calendário diário (como serie_temporal.calendario_diario) calculado no banco
+
+    Conta os acidentes e soma as métricas presentes em `colunas` por dia da
+    Data Abertura; só os dias com registros voltam ao pandas, onde são
+    completados com zero nos demais dias de cada ano coberto.
+    """
+    motor = motor or motor_banco()
+    metricas = [m for m in METRICAS_SERIE if m != 'Acidentes' and m in colunas]
+    data = _q('Data Abertura')
+    dia = f"CAST({data} AS DATE)" if motor == 'duckdb' else f"DATE({data})"
+    selecao = [f'{dia} AS "Data"', 'COUNT(*) AS "Acidentes"']
+    selecao += [f"COALESCE(SUM({_q(m)}), 0) AS {_q(m)}" for m in metricas]
+    onde, parametros = _onde([f"{data} IS NOT NULL"], anos)
+    sql = f"SELECT {', '.join(selecao)} FROM {TABELA}{onde}"
+    sql += f' GROUP BY {dia} ORDER BY "Data"'
+    diario = consultar_banco(sql, parametros, caminho_banco, motor)
+    # Mesma resolução da Data Abertura no dataset (e no calendário do pandas)
+    unidade = ESQUEMA.field('Data Abertura').type.unit
+    diario['Data'] = pd.to_datetime(diario['Data']).astype(f'datetime64[{unidade}]')
+    return densificar(diario.set_index('Data')[['Acidentes'] + metricas])
+
+
+def contagens_banco(colunas, faixas=None, anos=None, caminho_banco=None, motor=None):
+    """Acidentes por combinação de valores de `colunas`, contados no banco
+
+    Base dos box plots, percentis, histogramas e dispersões calculados a
+    partir de contagens (pre_agregacao.*_contagens): voltam ao pandas só os
+    valores distintos, não as linhas. Linhas com alguma das colunas nula
+    ficam de fora. `faixas` ({coluna: largura}) troca o valor da coluna pelo
+    índice da sua faixa, floor(valor / largura). Ordenado pelas colunas.
+    """
+    motor = motor or motor_banco()
+    faixas = faixas or {}
+    expressoes = []
+    for coluna in colunas:
+        if coluna in faixas:
+            razao = f"{_q(coluna)} / {float(faixas[coluna])!r}"
+            if motor == 'duckdb':
+                expressoes.append(f"CAST(FLOOR({razao}) AS INTEGER)")
+            else:
+                # SQLite: FLOOR é opcional na compilação e o CAST trunca em direção ao zero
+                truncado = f"CAST({razao} AS INTEGER)"
+                expressoes.append(f"({truncado} - ({razao} < {truncado}))")
+        else:
+            expressoes.append(_q(coluna))
+    selecao = [f"{e} AS {_q(c)}" for e, c in zip(expressoes, colunas)] + ['COUNT(*) AS "Acidentes"']
+    onde, parametros = _onde([f"{_q(c)} IS NOT NULL" for c in colunas], anos)
+    posicoes = ', '.join(str(i + 1) for i in range(len(colunas)))
+    sql = f"SELECT {', '.join(selecao)} FROM {TABELA}{onde} GROUP BY {posicoes} ORDER BY {posicoes}"
+    return ordenar_categorias(consultar_banco(sql, parametros, caminho_banco, motor))
+
+
+def correlacoes_banco(colunas, anos=None, caminho_banco=None, motor=None):
+    """Matriz de correlação de Pearson (como DataFrame.corr() nas linhas sem
+    nulos) calculada no banco, em duas passadas: médias e somas dos produtos
+    dos desvios"""
+    onde, parametros = _onde([f"{_q(c)} IS NOT NULL" for c in colunas], anos)
+    medias = ', '.join(f"AVG({_q(c)}) AS m{i}" for i, c in enumerate(colunas))
+    pares = [(i, j) for i in range(len(colunas)) for j in range(i, len(colunas))]
+    somas = ', '.join(f"SUM(({_q(colunas[i])} - m{i}) * ({_q(colunas[j])} - m{j})) AS s{i}_{j}" for i, j in pares)
+    sql = (f"WITH base AS (SELECT {', '.join(_q(c) for c in colunas)} FROM {TABELA}{onde}), "
+           f"medias AS (SELECT {medias} FROM base) SELECT {somas} FROM base, medias")
+    resultado = consultar_banco(sql, parametros, caminho_banco, motor).iloc[0]
+    covariancias = np.zeros((len(colunas), len(colunas)))
+    for i, j in pares:
+        covariancias[i, j] = covariancias[j, i] = resultado[f's{i}_{j}']
+    desvios = np.sqrt(np.diag(covariancias))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlacoes = covariancias / np.outer(desvios, desvios)
+    return pd.DataFrame(correlacoes, index=list(colunas), columns=list(colunas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cria o banco analítico com os dados consolidados')
+    parser.add_argument('--motor', choices=sorted(ARQUIVOS_BANCO), default=None,
+                        help='duckdb (padrão, se instalado) ou sqlite')
+    parser.add_argument('--forcar', action='store_true', help='recria o banco mesmo sem mudanças')
+    args = parser.parse_args()
+    if args.motor == 'duckdb' and duckdb is None:
+        parser.error("DuckDB não instalado (pip install duckdb) - use --motor sqlite")
+    caminho_banco = criar_banco(motor=args.motor, forcar=args.forcar)
+    motor = args.motor or motor_banco()
+    total = consultar_banco(f"SELECT COUNT(*) AS n FROM {TABELA}", caminho_banco=caminho_banco, motor=motor)
+    print(f"• {int(total['n'].iloc[0]):,} registros em {caminho_banco}")
+
+
+if __name__ == '__main__':
+    main()
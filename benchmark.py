@@ -0,0 +1,342 @@
+"""
+Benchmark do pipeline com dados sintéticos em escala
+
+Gera dados sintéticos com o esquema e as distribuições das planilhas reais
+(reamostragem com reposição das linhas do dataset consolidado, que preserva
+as distribuições conjuntas de rodovia, km, tipo, vítimas e datas, com ruído
+no km e na hora) em 10x, 100x e 1000x o tamanho atual, e mede cada etapa
+separadamente:
+  - geracao: dados sintéticos (planilhas XLSX ou, acima do limite de linhas
+    de uma aba, partições Parquet já consolidadas)
+  - ingestao_xlsx: leitura bruta das planilhas (openpyxl)
+  - consolidacao: consolidar_dados.consolidar (leitura, normalização,
+    derivação e gravação do Parquet, uma planilha por processo)
+  - derivacao: colunas_derivadas.derivar_colunas sobre a base inteira
+  - carga, cubo, calendario: entradas dos gráficos (como no motor)
+  - graficos: por gráfico, a agregação ('agregacao'), a montagem da figura
+    ('figura') e o HTML gravado ('html', com o tamanho em bytes)
+  - relatorio: gerar_relatorio_detalhado.py
+
+Cada escala roda em um processo separado, em um diretório de trabalho
+próprio, e grava os resultados após cada etapa: se uma etapa estoura a
+memória ou falha, as anteriores ficam registradas com o erro. O resultado
+vai para um JSON (BENCHMARK_JSON) para comparar execuções.
+
+Uso:
+    python benchmark.py                        # escalas 10, 100 e 1000
+    python benchmark.py --escalas 1 10 --graficos 08 13 30
+    python benchmark.py --sem-xlsx --saida benchmark_antes.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly
+import pyarrow as pa
+from openpyxl import Workbook, load_workbook
+
+from armazenamento import CAMINHO_DADOS, ESQUEMA, carregar_dados, salvar_particao_em_blocos
+from colunas_derivadas import COLUNAS_DERIVADAS, derivar_colunas
+from esquema_fontes import esquema_fonte, normalizar
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+ESCALAS_PADRAO = [10, 100, 1000]
+BENCHMARK_JSON = 'benchmark_resultados.json'
+
+# Colunas das planilhas de origem (as derivadas são recalculadas na consolidação)
+COLUNAS_FONTE = [c for c in ESQUEMA.names if c not in COLUNAS_DERIVADAS]
+COLUNAS_DERIVACAO = ['Data Abertura', 'Km', 'Leve', 'Grave', 'Fatal']
+
+# Linhas de dados em uma aba do Excel (1.048.576 menos o cabeçalho)
+LIMITE_LINHAS_XLSX = 1_048_575
+
+# Linhas sintéticas geradas por bloco
+TAMANHO_BLOCO_SINTETICO = 100_000
+
+
+# ---------------------------------------------------------------------------
+# Dados sintéticos
+# ---------------------------------------------------------------------------
+
+def carregar_base(caminho):
+    """Linhas reais de cada ano (colunas de origem), base da reamostragem"""
+    if not os.path.isdir(caminho):
+        raise FileNotFoundError(f"Dataset {caminho} não encontrado - execute consolidar_dados.py antes")
+    df = carregar_dados(colunas=COLUNAS_FONTE, caminho=caminho)
+    return {int(ano): grupo.drop(columns='Ano').reset_index(drop=True)
+            for ano, grupo in df.groupby('Ano', sort=True)}
+
+
+def blocos_sinteticos(base, escala, semente=0, tamanho_bloco=TAMANHO_BLOCO_SINTETICO):
+    """`escala` x len(base) linhas sintéticas de um ano, em blocos
+
+    Reamostragem com reposição das linhas reais, com ruído de até 0,5 km no
+    km e hora sorteada no mesmo dia; cada linha recebe um Evento único.
+    """
+    rng = np.random.default_rng(semente)
+    total = len(base) * escala
+    for inicio in range(0, total, tamanho_bloco):
+        n = min(tamanho_bloco, total - inicio)
+        bloco = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+        bloco['Km'] = (bloco['Km'] + rng.uniform(-0.5, 0.5, n)).clip(lower=0).round(3)
+        bloco['Data Abertura'] = (bloco['Data Abertura'].dt.normalize()
+                                  + pd.to_timedelta(rng.integers(0, 86400, n), unit='s'))
+        bloco['Evento'] = 'S' + pd.Series(np.arange(inicio, inicio + n)).astype(str)
+        yield bloco
+
+
+def escrever_planilha(blocos, ano):
+    """Grava os blocos na planilha do ano (arquivo e aba de esquema_fontes)"""
+    fonte = esquema_fonte(ano)
+    pasta = Workbook(write_only=True)
+    planilha = pasta.create_sheet(fonte['aba'])
+    planilha.append(COLUNAS_FONTE)
+    linhas = 0
+    for bloco in blocos:
+        valores = bloco[COLUNAS_FONTE].astype(object)
+        for linha in valores.where(valores.notna(), None).itertuples(index=False, name=None):
+            planilha.append(linha)
+        linhas += len(bloco)
+    pasta.save(fonte['arquivo'])
+    return linhas
+
+
+def _padronizar_sintetico(bloco, ano):
+    bloco['Ano'] = ano
+    return derivar_colunas(normalizar(bloco, ano))
+
+
+def gerar_dados(base, escala, xlsx):
+    """Grava os dados sintéticos no diretório atual; devolve o total de linhas"""
+    total = 0
+    for ano, linhas_ano in base.items():
+        blocos = blocos_sinteticos(linhas_ano, escala, semente=ano)
+        if xlsx:
+            total += escrever_planilha(blocos, ano)
+        else:
+            total += salvar_particao_em_blocos((_padronizar_sintetico(b, ano) for b in blocos), ano)
+    return total
+
+
+def ler_planilhas_brutas(anos):
+    """Só a leitura das planilhas pelo openpyxl (sem pandas); devolve as linhas lidas"""
+    linhas = 0
+    for ano in anos:
+        fonte = esquema_fonte(ano)
+        pasta = load_workbook(fonte['arquivo'], read_only=True, data_only=True)
+        try:
+            planilha = pasta[fonte['aba']]
+            planilha.reset_dimensions()
+            linhas += sum(1 for _ in planilha.iter_rows(values_only=True)) - 1
+        finally:
+            pasta.close()
+    return linhas
+
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+
+class Medicao:
+    """Resultados de uma escala, gravados em `caminho` após cada etapa"""
+
+    def __init__(self, caminho, escala):
+        self.caminho = caminho
+        self.resultado = {'escala': escala, 'etapas': {}, 'graficos': {}}
+
+    def salvar(self):
+        with open(self.caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.resultado, f, indent=2, ensure_ascii=False)
+
+    def medir(self, destino, nome, funcao, *args, rotulo=None, **kwargs):
+        """Executa `funcao` e registra o tempo (ou o erro) em destino[nome]
+
+        Devolve (sucesso, valor).
+        """
+        rotulo = rotulo or nome
+        inicio = time.perf_counter()
+        try:
+            valor = funcao(*args, **kwargs)
+        except Exception as erro:  # etapas que quebram com o volume ficam registradas
+            destino[nome] = {'segundos': round(time.perf_counter() - inicio, 4),
+                             'erro': f"{type(erro).__name__}: {erro}"}
+            print(f"  ⚠ {rotulo}: {type(erro).__name__}: {erro}")
+            self.salvar()
+            return False, None
+        destino[nome] = {'segundos': round(time.perf_counter() - inicio, 4)}
+        print(f"  • {rotulo}: {destino[nome]['segundos']:.2f}s")
+        self.salvar()
+        return True, valor
+
+
+def _consolidar_tudo():
+    """Consolidação completa (planilhas em paralelo); um ano com erro interrompe a escala"""
+    from consolidar_dados import consolidar
+
+    status = consolidar(completo=True)
+    com_erro = [str(ano) for ano, situacao in status.items() if situacao == 'erro']
+    if com_erro:
+        raise RuntimeError(f"anos não consolidados: {', '.join(com_erro)}")
+    return status
+
+
+def _relatorio():
+    with contextlib.redirect_stdout(io.StringIO()):
+        runpy.run_path(os.path.join(DIRETORIO_PROJETO, 'gerar_relatorio_detalhado.py'), run_name='__main__')
+
+
+def executar_escala(escala, base_dados, caminho_parcial, numeros=None, xlsx=True):
+    """Gera os dados de uma escala no diretório atual e mede as etapas"""
+    from consulta import consultar
+    from cubo_agregado import construir_cubo
+    from motor_graficos import salvar_grafico_acessivel, selecionar_graficos
+    from serie_temporal import calendario_diario
+
+    medicao = Medicao(caminho_parcial, escala)
+    etapas = medicao.resultado['etapas']
+    base = carregar_base(base_dados)
+    registros = sum(len(linhas) for linhas in base.values()) * escala
+    xlsx = xlsx and all(len(linhas) * escala <= LIMITE_LINHAS_XLSX for linhas in base.values())
+    medicao.resultado.update(registros=registros, origem='xlsx' if xlsx else 'parquet')
+    medicao.salvar()
+    print(f"\nEscala {escala}x: {registros:,} registros ({'planilhas XLSX' if xlsx else 'Parquet direto'})")
+
+    anos = sorted(base)
+    ok, _ = medicao.medir(etapas, 'geracao', gerar_dados, base, escala, xlsx)
+    del base
+    if not ok:
+        return medicao.resultado
+    if xlsx:
+        medicao.medir(etapas, 'ingestao_xlsx', ler_planilhas_brutas, anos)
+        ok, _ = medicao.medir(etapas, 'consolidacao', _consolidar_tudo)
+        if not ok:
+            return medicao.resultado
+
+    ok, df_base = medicao.medir(etapas, 'carga_derivacao', consultar, colunas=COLUNAS_DERIVACAO)
+    if ok:
+        medicao.medir(etapas, 'derivacao', derivar_colunas, df_base)
+    del df_base
+
+    graficos = selecionar_graficos(numeros)
+    colunas = list(dict.fromkeys(c for g in graficos for c in g.colunas))
+    ok, df = medicao.medir(etapas, 'carga', consultar, colunas=colunas)
+    if not ok:
+        return medicao.resultado
+    entradas = {'linhas': df}
+    if any(g.entrada == 'cubo' for g in graficos):
+        _, entradas['cubo'] = medicao.medir(etapas, 'cubo', construir_cubo, df)
+    if any(g.entrada == 'calendario' for g in graficos):
+        _, entradas['calendario'] = medicao.medir(etapas, 'calendario', calendario_diario, df)
+
+    for grafico in graficos:
+        tempos = medicao.resultado['graficos'].setdefault(grafico.numero, {'arquivo': grafico.arquivo})
+        if entradas.get(grafico.entrada) is None:
+            tempos['erro'] = f"entrada '{grafico.entrada}' indisponível"
+            continue
+        ok, dados = medicao.medir(tempos, 'agregacao', grafico.agregar, entradas,
+                                  rotulo=f'gráfico {grafico.numero} (agregação)')
+        if ok:
+            ok, fig = medicao.medir(tempos, 'figura', grafico.funcao, dados,
+                                    rotulo=f'gráfico {grafico.numero} (figura)')
+        if ok:
+            ok, _ = medicao.medir(tempos, 'html', salvar_grafico_acessivel, fig, grafico.arquivo, grafico.titulo,
+                                  rotulo=f'gráfico {grafico.numero} (html)')
+        if ok:
+            tempos['bytes'] = os.path.getsize(grafico.arquivo)
+            medicao.salvar()
+    del entradas, df
+
+    medicao.medir(etapas, 'relatorio', _relatorio)
+    return medicao.resultado
+
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+def ambiente():
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'plotly': plotly.__version__,
+    }
+
+
+def rodar_escala_em_processo(escala, args, diretorio_base):
+    """Roda uma escala em um processo próprio; devolve o resultado (parcial, se falhou)"""
+    diretorio = os.path.join(diretorio_base, f'escala_{escala}')
+    os.makedirs(diretorio, exist_ok=True)
+    parcial = os.path.join(diretorio, 'resultado.json')
+    comando = [sys.executable, os.path.abspath(__file__), '--_escala', str(escala), '--_parcial', parcial,
+               '--_base', os.path.abspath(CAMINHO_DADOS)]
+    if args.graficos:
+        comando += ['--graficos', *args.graficos]
+    if args.sem_xlsx:
+        comando.append('--sem-xlsx')
+    inicio = time.perf_counter()
+    processo = subprocess.run(comando, cwd=diretorio)
+    resultado = {'escala': escala}
+    if os.path.exists(parcial):
+        with open(parcial, encoding='utf-8') as f:
+            resultado = json.load(f)
+    resultado['segundos_total'] = round(time.perf_counter() - inicio, 2)
+    if processo.returncode != 0:
+        # Código negativo = sinal (ex.: -9, processo encerrado por falta de memória)
+        resultado['erro'] = f"processo encerrado com código {processo.returncode}"
+        print(f"⚠ Escala {escala}x interrompida (código {processo.returncode})")
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline com dados sintéticos em escala')
+    parser.add_argument('--escalas', nargs='+', type=int, default=ESCALAS_PADRAO,
+                        help='multiplicadores do tamanho atual (padrão: 10 100 1000)')
+    parser.add_argument('--graficos', nargs='+', help='gráficos medidos (padrão: todos)')
+    parser.add_argument('--sem-xlsx', action='store_true',
+                        help='gera direto o Parquet, sem planilhas (pula ingestão e consolidação)')
+    parser.add_argument('--saida', default=BENCHMARK_JSON, help=f'arquivo JSON (padrão: {BENCHMARK_JSON})')
+    parser.add_argument('--diretorio', help='diretório de trabalho (padrão: temporário, apagado no fim)')
+    parser.add_argument('--_escala', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--_parcial', help=argparse.SUPPRESS)
+    parser.add_argument('--_base', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._escala is not None:
+        # Processo de uma escala (chamado por rodar_escala_em_processo)
+        executar_escala(args._escala, args._base, args._parcial, args.graficos, xlsx=not args.sem_xlsx)
+        return
+
+    if not os.path.isdir(CAMINHO_DADOS):
+        parser.error(f"dataset {CAMINHO_DADOS} não encontrado - execute consolidar_dados.py antes")
+    diretorio_base = args.diretorio or tempfile.mkdtemp(prefix='benchmark_acidentes_')
+    resultados = {'ambiente': ambiente(), 'escalas': []}
+    try:
+        for escala in args.escalas:
+            resultados['escalas'].append(rodar_escala_em_processo(escala, args, diretorio_base))
+            with open(args.saida, 'w', encoding='utf-8') as f:
+                json.dump(resultados, f, indent=2, ensure_ascii=False)
+    finally:
+        if not args.diretorio:
+            shutil.rmtree(diretorio_base, ignore_errors=True)
+    print(f"\n✓ Resultados salvos em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""
+Cache de saída dos gráficos endereçado por conteúdo
+
+Cada arquivo gerado é registrado no manifesto_graficos.json com:
+  - chave: hash da entrada que o gráfico recebe (só a parte que ele usa),
+    do código da função que o desenha, do restante do módulo que a define (cores, rótulos, funções
+    auxiliares), dos módulos do projeto que esse módulo importa, direta ou
+    indiretamente, e da versão do Plotly. Se a chave não mudou e o arquivo
+    continua igual, o gráfico não é redesenhado nem regravado.
+  - sha256: hash do conteúdo gravado.
+  - versionado: só nas saídas JSON, cópia com o hash no nome
+    (versionados/<nome>.<hash>.json) que o painel busca e que pode ser
+    servida com cache imutável. As páginas HTML não são copiadas: elas
+    carregam o plotly-<versão>.min.js por caminho relativo à raiz do site.
+"""
+import ast
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from cubo_agregado import DIMENSOES_CUBO, METRICAS_CUBO
+
+CAMINHO_MANIFESTO_GRAFICOS = 'manifesto_graficos.json'
+DIRETORIO_VERSIONADOS = 'versionados'
+
+# Caracteres do hash usados no nome dos arquivos versionados
+TAMANHO_IMPRESSAO = 12
+
+# Saídas com cópia versionada (os dados que o painel busca)
+EXTENSOES_VERSIONADAS = ('.json',)
+
+# Pasta dos módulos do projeto (as importações de fora dela não entram na chave)
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos com as definições dos gráficos (importados por motor_graficos.py)
+MODULOS_GRAFICOS = ['gerar_graficos_1', 'gerar_graficos_2', 'gerar_graficos_3',
+                    'gerar_graficos_4', 'gerar_graficos_5', 'gerar_graficos_6']
+
+# Análise de cada módulo por (caminho, mtime, tamanho): cada arquivo só é
+# lido e analisado de novo quando muda (modo de observação)
+_MODULOS = {}
+
+
+def hash_texto(*partes):
+    """SHA-256 das partes (textos) concatenadas"""
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(str(parte).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def hash_conteudo(caminho, tamanho_bloco=1024 * 1024):
+    """SHA-256 do arquivo (None se não existe)"""
+    if not os.path.exists(caminho):
+        return None
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def impressoes_colunas(df):
+    """Hash de cada coluna do DataFrame carregado (valores, na ordem)"""
+    impressoes = {}
+    for col in df.columns:
+        valores = pd.util.hash_pandas_object(df[col], index=False).values
+        impressoes[col] = hashlib.sha256(valores.tobytes()).hexdigest()
+    return impressoes
+
+
+def impressao_dados(dados):
+    """Hash de dados de gráfico: DataFrame (nomes das colunas, valores e
+    índice, na ordem), Series, arrays do numpy e tuplas, listas e dicts deles"""
+    if isinstance(dados, pd.Series):
+        dados = dados.to_frame()
+    if isinstance(dados, pd.DataFrame):
+        # O índice vira coluna: o hash do índice não aceita níveis com nulos
+        dados = dados.reset_index()
+        valores = pd.util.hash_pandas_object(dados, index=False).values
+        return hash_texto(*dados.columns, hashlib.sha256(valores.tobytes()).hexdigest())
+    if isinstance(dados, np.ndarray):
+        return hash_texto(dados.dtype, dados.shape, hashlib.sha256(np.ascontiguousarray(dados).tobytes()).hexdigest())
+    if isinstance(dados, dict):
+        return hash_texto(*(f"{chave!r}={impressao_dados(valor)}" for chave, valor in dados.items()))
+    if isinstance(dados, (list, tuple)):
+        return hash_texto(*(impressao_dados(valor) for valor in dados))
+    return hash_texto(repr(dados))
+
+
+def impressoes_entradas(graficos, entradas):
+    """Hash da entrada que cada gráfico recebe, {numero: hash}
+
+    Só entra a parte da entrada que o gráfico usa (`colunas` e Ano):
+      - 'cubo': o roll-up pelas suas dimensões e métricas, que não muda com
+        as dimensões que só outros gráficos pedem ao cubo (nem entre o cubo
+        do pandas e o do banco, que tem só as dimensões da seleção);
+      - 'calendario': a contagem diária e as somas das suas métricas;
+      - 'linhas': o hash de cada coluna usada (calculado uma vez por coluna);
+      - dados já agregados no banco (entradas['banco']): os próprios dados.
+    """
+    colunas_linhas = impressoes_colunas(entradas['linhas']) if 'linhas' in entradas else {}
+    fatias = {}
+    impressoes = {}
+    for grafico in graficos:
+        if grafico.numero in entradas.get('banco', {}):
+            impressoes[grafico.numero] = impressao_dados(entradas['banco'][grafico.numero])
+            continue
+        usadas = set(grafico.colunas) | {'Ano'}
+        entrada = entradas[grafico.entrada]
+        if grafico.entrada == 'linhas':
+            partes = [f"{col}={colunas_linhas.get(col)}" for col in sorted(usadas)]
+            impressoes[grafico.numero] = hash_texto(*partes)
+            continue
+        if grafico.entrada == 'cubo':
+            por = tuple(d for d in DIMENSOES_CUBO if d in usadas and d in entrada.columns)
+            metricas = ('Acidentes',) + tuple(m for m in METRICAS_CUBO if m in usadas and m in entrada.columns)
+        else:
+            por, metricas = None, tuple(c for c in entrada.columns if c == 'Acidentes' or c in usadas)
+        if (por, metricas) not in fatias:
+            if por is None:
+                fatia = entrada[list(metricas)]
+            else:
+                # Roll-up que mantém as células com dimensão nula (o gráfico as recebe)
+                fatia = entrada.groupby(list(por), observed=True, dropna=False)[list(metricas)].sum()
+            fatias[por, metricas] = impressao_dados(fatia)
+        impressoes[grafico.numero] = fatias[por, metricas]
+    return impressoes
+
+
+def hash_codigo(*objetos):
+    """Hash do código-fonte de funções ou módulos"""
+    return hash_texto(*(inspect.getsource(obj) for obj in objetos))
+
+
+def _registra_grafico(decorador):
+    funcao = decorador.func if isinstance(decorador, ast.Call) else decorador
+    return getattr(funcao, 'id', None) == 'registrar_grafico'
+
+
+def _agregacoes(decoradores):
+    """Nomes das funções passadas como agregacao= ou agregacao_banco= a @registrar_grafico"""
+    return {palavra.value.id for d in decoradores if isinstance(d, ast.Call) and _registra_grafico(d)
+            for palavra in d.keywords
+            if palavra.arg in ('agregacao', 'agregacao_banco') and isinstance(palavra.value, ast.Name)}
+
+
+def _numero_grafico(decorador):
+    """Número passado a @registrar_grafico (None se não é um texto literal)"""
+    argumentos = decorador.args[:1] + [p.value for p in decorador.keywords if p.arg == 'numero']
+    if argumentos and isinstance(argumentos[0], ast.Constant) and isinstance(argumentos[0].value, str):
+        return argumentos[0].value
+    return None
+
+
+def _analisar_modulo(caminho):
+    """{'texto', 'sem_graficos', 'importados', 'graficos'} do arquivo .py
+
+    'sem_graficos' é o texto sem as funções registradas com
+    @registrar_grafico e as suas funções de agregação (cada uma entra na
+    chave do seu gráfico, não na dos vizinhos); 'importados' inclui as importações feitas dentro de funções;
+    'graficos' são os números registrados no módulo.
+    """
+    st = os.stat(caminho)
+    chave = (caminho, st.st_mtime_ns, st.st_size)
+    if chave not in _MODULOS:
+        with open(caminho, encoding='utf-8') as f:
+            texto = f.read()
+        arvore = ast.parse(texto, caminho)
+        importados = set()
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.Import):
+                importados.update(alias.name for alias in no.names)
+            elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+                importados.add(no.module)
+        funcoes = [no for no in arvore.body if isinstance(no, ast.FunctionDef)]
+        agregacoes = set().union(*(_agregacoes(no.decorator_list) for no in funcoes))
+        linhas = texto.splitlines(keepends=True)
+        for no in reversed(funcoes):
+            if no.name in agregacoes or any(_registra_grafico(d) for d in no.decorator_list):
+                inicio = min([d.lineno for d in no.decorator_list] + [no.lineno]) - 1
+                del linhas[inicio:no.end_lineno]
+        graficos = [_numero_grafico(d) for no in funcoes for d in no.decorator_list
+                    if isinstance(d, ast.Call) and _registra_grafico(d)]
+        _MODULOS[chave] = {'texto': texto, 'sem_graficos': ''.join(linhas), 'importados': sorted(importados),
+                           'graficos': [n for n in graficos if n is not None]}
+    return _MODULOS[chave]
+
+
+def arquivo_modulo(nome, diretorio=DIRETORIO_PROJETO):
+    """Arquivo .py do módulo `nome` no projeto, ou None se é externo"""
+    caminho = os.path.join(diretorio, *nome.split('.')) + '.py'
+    return caminho if os.path.isfile(caminho) else None
+
+
+def graficos_registrados(modulos=MODULOS_GRAFICOS, diretorio=DIRETORIO_PROJETO):
+    """Números dos gráficos registrados nos `modulos`, em ordem, lidos do
+    código-fonte sem importá-los (nem o Plotly)"""
+    numeros = set()
+    for nome in modulos:
+        caminho = arquivo_modulo(nome, diretorio)
+        if caminho is not None:
+            numeros.update(_analisar_modulo(caminho)['graficos'])
+    return sorted(numeros)
+
+
+def dependencias_modulo(nome, diretorio=DIRETORIO_PROJETO):
+    """Arquivos .py do projeto usados pelo módulo `nome`: o próprio e os que
+    ele importa, direta ou indiretamente, em ordem"""
+    pendentes = [nome]
+    arquivos = []
+    while pendentes:
+        caminho = arquivo_modulo(pendentes.pop(), diretorio)
+        if caminho is None or caminho in arquivos:
+            continue
+        arquivos.append(caminho)
+        pendentes.extend(_analisar_modulo(caminho)['importados'])
+    return arquivos
+
+
+def hash_dependencias(nome, diretorio=DIRETORIO_PROJETO):
+    """Hash do código do módulo `nome` (sem as suas funções de gráficos) e
+    de todos os módulos do projeto que ele importa"""
+    partes = []
+    for i, caminho in enumerate(dependencias_modulo(nome, diretorio)):
+        analise = _analisar_modulo(caminho)
+        partes.append(os.path.basename(caminho))
+        partes.append(analise['sem_graficos'] if i == 0 else analise['texto'])
+    return hash_texto(*partes)
+
+
+def chave_grafico(grafico, impressao, versao_motor, opcoes, diretorio=DIRETORIO_PROJETO):
+    """Chave de cache de um gráfico: entrada (ver impressoes_entradas) +
+    código + dependências + motor"""
+    return hash_texto(
+        grafico.numero, grafico.arquivo, grafico.titulo, grafico.entrada,
+        impressao,
+        hash_codigo(*filter(None, [grafico.agregacao, grafico.agregacao_banco, grafico.funcao])),
+        hash_dependencias(grafico.modulo, diretorio),
+        versao_motor,
+        json.dumps(opcoes, sort_keys=True),
+    )
+
+
+def carregar_manifesto_graficos(caminho=CAMINHO_MANIFESTO_GRAFICOS):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def salvar_manifesto_graficos(manifesto, caminho=CAMINHO_MANIFESTO_GRAFICOS):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(manifesto.items())), f, indent=2, ensure_ascii=False)
+
+
+def em_cache(manifesto, saida, chave):
+    """True se `saida` foi gerada com a mesma chave e não foi alterada"""
+    registro = manifesto.get(saida)
+    if not registro or registro.get('chave') != chave:
+        return False
+    if registro.get('versionado') and not os.path.exists(registro['versionado']):
+        return False
+    return hash_conteudo(saida) == registro.get('sha256')
+
+
+def caminho_versionado(saida, sha256, diretorio=DIRETORIO_VERSIONADOS):
+    """Nome com impressão digital (ex: versionados/01_total.1a2b3c4d5e6f.html)"""
+    base, extensao = os.path.splitext(os.path.basename(saida))
+    return os.path.join(diretorio, f"{base}.{sha256[:TAMANHO_IMPRESSAO]}{extensao}")
+
+
+def _eh_versionado(nome, base=None, extensao=None):
+    """True se `nome` tem a forma <base>.<hash>.<ext> de uma cópia versionada"""
+    partes = nome.split('.')
+    if len(partes) != 3 or len(partes[1]) != TAMANHO_IMPRESSAO:
+        return False
+    return (base is None or partes[0] == base) and (extensao is None or nome.endswith(extensao))
+
+
+def versionar(saida, sha256, diretorio=DIRETORIO_VERSIONADOS):
+    """Copia `saida` para o nome versionado e remove versões antigas dela"""
+    os.makedirs(diretorio, exist_ok=True)
+    destino = caminho_versionado(saida, sha256, diretorio)
+    base, extensao = os.path.splitext(os.path.basename(saida))
+    for nome in os.listdir(diretorio):
+        antigo = os.path.join(diretorio, nome)
+        if antigo != destino and _eh_versionado(nome, base, extensao):
+            os.remove(antigo)
+    if not os.path.exists(destino):
+        shutil.copyfile(saida, destino)
+    return destino.replace(os.sep, '/')
+
+
+def registrar_saida(manifesto, saida, chave):
+    """Atualiza o manifesto após gravar `saida` e, se é JSON, cria a cópia versionada"""
+    sha256 = hash_conteudo(saida)
+    manifesto[saida] = {'chave': chave, 'sha256': sha256}
+    if saida.endswith(EXTENSOES_VERSIONADAS):
+        manifesto[saida]['versionado'] = versionar(saida, sha256)
+    return manifesto[saida]
+
+
+def podar_versionados(manifesto, diretorio=DIRETORIO_VERSIONADOS):
+    """Remove do manifesto as saídas que não existem mais e, de `diretorio`,
+    as cópias versionadas que nenhuma entrada referencia (versões
+    substituídas, gráficos removidos, páginas HTML de versões anteriores)
+
+    Devolve os caminhos removidos (entradas do manifesto e arquivos).
+    """
+    removidos = [saida for saida in manifesto if not os.path.exists(saida)]
+    for saida in removidos:
+        del manifesto[saida]
+    for saida, registro in manifesto.items():
+        if not saida.endswith(EXTENSOES_VERSIONADAS):
+            registro.pop('versionado', None)
+    if os.path.isdir(diretorio):
+        referenciados = {os.path.normpath(r['versionado']) for r in manifesto.values() if r.get('versionado')}
+        for nome in sorted(os.listdir(diretorio)):
+            caminho = os.path.join(diretorio, nome)
+            if _eh_versionado(nome) and os.path.normpath(caminho) not in referenciados:
+                os.remove(caminho)
+                removidos.append(caminho.replace(os.sep, '/'))
+    return removidos
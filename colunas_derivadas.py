@@ -0,0 +1,54 @@
+"""
+Colunas derivadas gravadas junto com os dados consolidados
+
+Mês, dia da semana, ano-mês, faixa de km, categoria de gravidade e índice de
+severidade são calculados uma única vez, de forma vetorizada, em cada bloco
+da consolidação e gravados no dataset. Gráficos e relatórios usam as colunas
+prontas, sempre com as mesmas definições.
+"""
+import hashlib
+import inspect
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_DERIVADAS = ['Mes', 'Dia_Semana', 'Ano_Mes', 'Faixa_KM', 'Gravidade_Categoria', 'Severidade']
+
+# Rótulos dos meses (Mes = 1..12) e dos dias da semana (Dia_Semana = 0..6, segunda a domingo)
+MESES_ABREV = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+MESES_NOME = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+              'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+DIAS_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+
+# Faixas de km de 50 em 50 (intervalos fechados à direita, como no pd.cut)
+BORDAS_KM = list(range(0, 700, 50))
+FAIXAS_KM = [f"{i}-{i+50}" for i in BORDAS_KM[:-1]]
+
+# Ordem fixa das categorias derivadas ao carregar (as demais são ordenadas)
+ORDEM_CATEGORIAS = {'Faixa_KM': FAIXAS_KM}
+
+
+def derivar_colunas(df):
+    """Acrescenta a `df` as colunas derivadas (no lugar) e devolve `df`"""
+    data = pd.to_datetime(df['Data Abertura'], errors='coerce')
+    df['Mes'] = data.dt.month.astype('Int8')
+    # dt.dayofweek: 0 = segunda (independe do idioma do sistema)
+    df['Dia_Semana'] = data.dt.dayofweek.astype('Int8')
+    df['Ano_Mes'] = data.dt.strftime('%Y-%m')
+
+    km = pd.to_numeric(df['Km'], errors='coerce')
+    df['Faixa_KM'] = pd.cut(km, bins=BORDAS_KM, labels=FAIXAS_KM)
+
+    leve, grave, fatal = (pd.to_numeric(df[col], errors='coerce') for col in ['Leve', 'Grave', 'Fatal'])
+    df['Gravidade_Categoria'] = np.select(
+        [fatal > 0, grave > 0, leve > 0], ['Fatal', 'Grave', 'Leve'], default='Sem Vítimas'
+    )
+    # Índice de severidade: (graves + 2 x fatais) / (vítimas + 1), em %
+    df['Severidade'] = (grave + fatal * 2) / (leve + grave + fatal + 1) * 100
+    return df
+
+
+def versao_derivadas():
+    """Código das derivações: partições gravadas com outra versão são refeitas"""
+    codigo = inspect.getsource(derivar_colunas) + repr(ORDEM_CATEGORIAS)
+    return hashlib.sha256(codigo.encode('utf-8')).hexdigest()
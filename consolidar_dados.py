@@ -1,77 +1,371 @@
 """
 Script para consolidar dados de acidentes de 2023, 2024 e 2025
+
+Modo incremental: cada planilha é identificada por tamanho, data de
+modificação e hash do conteúdo (manifesto gravado junto ao dataset). Anos
+cuja planilha não mudou reaproveitam a partição já normalizada; só a
+planilha alterada é lida novamente. Use --completo para reprocessar tudo.
+As planilhas alteradas são lidas em paralelo, uma por processo (o openpyxl
+ocupa a CPU), e um ano pode ser dividido em várias planilhas (ex.: uma por
+mês, ver esquema_fontes.arquivos_fonte). Uma planilha com erro falha só o
+seu ano, que mantém a partição anterior.
+Com --profile, o tempo, a CPU e a memória de cada etapa (abertura e leitura
+das planilhas, padronização, derivação e gravação de cada bloco) vão para
+rastro_consolidacao.json/.csv (ver instrumentacao.py).
 """
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import warnings
+from openpyxl import load_workbook
+from armazenamento import (CAMINHO_DADOS, ESQUEMA, NOME_PARTE, caminho_particao, caminho_provisorio, carregar_dados,
+                           gravar_blocos, substituir_particao)
+from colunas_derivadas import derivar_colunas, versao_derivadas
+from esquema_fontes import ESQUEMAS_FONTES, arquivos_fonte, esquema_fonte, normalizar, versao_esquema
+from instrumentacao import ativar, etapa, imprimir_resumo, registrar_importacoes, salvar_rastro
 warnings.filterwarnings('ignore')
 
-print("=" * 60)
-print("CONSOLIDAÇÃO DE DADOS - ACIDENTES DER 2023-2024-2025")
-print("=" * 60)
-
-# Carregar dados de cada ano da planilha correta
-print("\nCarregando dados...")
-df2023 = pd.read_excel('Acidentes_DER_2023.xlsx', sheet_name='Base de Dados')
-df2024 = pd.read_excel('Acidentes_DER_2024.xlsx', sheet_name='Base de Dados')
-df2025 = pd.read_excel('Acidentes_DER_2025.xlsx', sheet_name='Base de dados ')
-
-print(f"2023: {len(df2023):,} registros")
-print(f"2024: {len(df2024):,} registros")
-print(f"2025: {len(df2025):,} registros")
-
-# Padronizar colunas
-# 2024 tem ' Ocorrência' com espaço e 'Data' em vez de 'Nova data'
-df2024 = df2024.rename(columns={
-    ' Ocorrência': 'Ocorrencia',
-    'Data': 'Nova data'
-})
-
-# 2025 tem colunas extras UBA
-# Manter todas as colunas importantes
-
-# Adicionar coluna Ano
-df2023['Ano'] = 2023
-df2024['Ano'] = 2024
-df2025['Ano'] = 2025
-
-# Selecionar colunas comuns
-colunas_base = ['Evento', 'Rodovia', 'Km', 'Sentido', 'Ocorrencia', 'Tipo Acidente', 
-                'Leve', 'Grave', 'Fatal', 'Data Abertura', 'Regional', 'Nova data', 
-                'Total de Vítimas', 'Ano']
-
-# Garantir que todas as colunas existam
-for col in colunas_base:
-    if col not in df2023.columns:
-        df2023[col] = None
-    if col not in df2024.columns:
-        df2024[col] = None
-    if col not in df2025.columns:
-        df2025[col] = None
-
-# Adicionar colunas UBA para 2025 (se existirem)
-if 'UBA' in df2025.columns:
-    colunas_extra = ['UBA', 'UBA sigla']
-    for col in colunas_extra:
-        if col not in df2023.columns:
-            df2023[col] = None
-        if col not in df2024.columns:
-            df2024[col] = None
-
-# Consolidar dados
-df_total = pd.concat([df2023, df2024, df2025], ignore_index=True)
-
-# Converter datas
-df_total['Data Abertura'] = pd.to_datetime(df_total['Data Abertura'], errors='coerce')
-df_total['Nova data'] = pd.to_datetime(df_total['Nova data'], errors='coerce')
-
-# Salvar arquivo consolidado
-df_total.to_csv('dados_completos.csv', index=False)
-
-print("\n" + "=" * 60)
-print("RESUMO DA CONSOLIDAÇÃO")
-print("=" * 60)
-print(f"\nTotal de registros consolidados: {len(df_total):,}")
-print(f"\nDistribuição por ano:")
-print(df_total['Ano'].value_counts().sort_index())
-print(f"\nArquivo salvo: dados_completos.csv")
-print("=" * 60)
+# Manifesto com a impressão digital das planilhas já consolidadas (o prefixo
+# '_' faz o pyarrow ignorar o arquivo ao abrir o dataset)
+CAMINHO_MANIFESTO = os.path.join(CAMINHO_DADOS, '_manifesto_fontes.json')
+
+# Textos tratados como nulos (os mesmos padrões do pd.read_excel)
+TEXTOS_NULOS = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+                'n/a', 'nan', 'null'}
+
+# Linhas da planilha por bloco gravado (row group do Parquet)
+TAMANHO_BLOCO = 5000
+
+# Rastro das etapas gravado com --profile (.json e .csv)
+RASTRO_CONSOLIDACAO = 'rastro_consolidacao'
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """SHA-256 do conteúdo do arquivo"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def impressao_digital(caminho, anterior=None):
+    """Tamanho, mtime e hash da planilha
+
+    Se tamanho e mtime coincidem com a impressão anterior, o hash é
+    reaproveitado sem reler o arquivo.
+    """
+    st = os.stat(caminho)
+    digital = {'tamanho': st.st_size, 'mtime': st.st_mtime}
+    if anterior and anterior.get('tamanho') == st.st_size and anterior.get('mtime') == st.st_mtime:
+        digital['sha256'] = anterior['sha256']
+    else:
+        digital['sha256'] = hash_arquivo(caminho)
+    return digital
+
+
+def carregar_manifesto(caminho=CAMINHO_MANIFESTO):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def salvar_manifesto(manifesto, caminho=CAMINHO_MANIFESTO):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, ensure_ascii=False)
+
+
+def _valor_celula(valor):
+    """Converte a célula como o pd.read_excel: textos de nulo viram None e
+    números inteiros guardados como float viram int"""
+    if isinstance(valor, str) and valor in TEXTOS_NULOS:
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _padronizar_bloco(linhas, colunas, ano):
+    """DataFrame padronizado de um bloco de linhas da planilha"""
+    with etapa('padronizacao', ano=ano, linhas=len(linhas)):
+        # Todas as colunas do esquema existem (2025 tem colunas extras UBA,
+        # completadas com nulos nos demais anos)
+        df = pd.DataFrame(linhas, columns=colunas, dtype=object).reindex(columns=ESQUEMA.names)
+        df = df.infer_objects()
+        df['Ano'] = ano
+        df['Data Abertura'] = pd.to_datetime(df['Data Abertura'], errors='coerce')
+        df['Nova data'] = pd.to_datetime(df['Nova data'], errors='coerce')
+        df = normalizar(df, ano)
+    with etapa('derivacao', ano=ano, linhas=len(linhas)):
+        return derivar_colunas(df)
+
+
+def _linhas_em_blocos(linhas, projecao, tamanho_bloco):
+    """Listas de até `tamanho_bloco` linhas com as colunas projetadas
+
+    Linhas vazias só entram no bloco se aparecer uma linha preenchida
+    depois (as vazias do fim da aba são descartadas).
+    """
+    bloco, vazias = [], []
+    for linha in linhas:
+        valores = [_valor_celula(linha[i]) if i < len(linha) else None for i, _ in projecao]
+        if all(v is None or v == '' for v in valores):
+            vazias.append([None] * len(valores))
+            continue
+        bloco.extend(vazias)
+        vazias = []
+        bloco.append(valores)
+        if len(bloco) >= tamanho_bloco:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def ler_planilha_em_blocos(ano, tamanho_bloco=TAMANHO_BLOCO, arquivo=None):
+    """Lê a planilha de um ano em blocos padronizados de até `tamanho_bloco` linhas
+
+    A planilha é aberta em modo somente leitura (as linhas são lidas em
+    sequência, sem carregar a pasta inteira) e só as colunas do esquema do
+    dataset são extraídas, já com os nomes, as categorias e o sentido
+    normalizados conforme o registro do ano (esquema_fontes) e com as
+    colunas derivadas (colunas_derivadas) calculadas. Linhas vazias
+    no fim da aba são descartadas. Em anos com várias planilhas (ver
+    esquema_fontes.arquivos_fonte), `arquivo` escolhe qual delas ler.
+    """
+    fonte = esquema_fonte(ano)
+    arquivo = arquivo or fonte['arquivo']
+    with etapa('abertura_xlsx', ano=ano, arquivo=arquivo):
+        pasta = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        planilha = pasta[fonte['aba']]
+        # Algumas planilhas gravam dimensões erradas; ler até a última linha real
+        planilha.reset_dimensions()
+        linhas = planilha.iter_rows(values_only=True)
+        cabecalho = [fonte['aliases'].get(nome, nome) for nome in next(linhas, ())]
+        projecao = [(i, nome) for i, nome in enumerate(cabecalho) if nome in ESQUEMA.names]
+        colunas = [nome for _, nome in projecao]
+        if not colunas:
+            yield _padronizar_bloco([], colunas, ano)
+            return
+
+        blocos = _linhas_em_blocos(linhas, projecao, tamanho_bloco)
+        while True:
+            # Só a leitura das linhas pelo openpyxl (a padronização é medida à parte)
+            with etapa('leitura_xlsx', ano=ano):
+                bloco = next(blocos, None)
+            if bloco is None:
+                break
+            yield _padronizar_bloco(bloco, colunas, ano)
+    finally:
+        pasta.close()
+
+
+def ler_planilha(ano, arquivo=None):
+    """Lê e padroniza a planilha (ou uma das planilhas) de um ano"""
+    return pd.concat(ler_planilha_em_blocos(ano, arquivo=arquivo), ignore_index=True)
+
+
+def _em_processos(funcao, tarefas, processos):
+    """Executa `funcao(*tarefa)` para cada tarefa em até `processos` processos
+
+    Produz (tarefa, resultado, erro) à medida que as tarefas terminam: a
+    falha de uma tarefa (planilha corrompida) não interrompe as demais. Com
+    um único processo (ou uma tarefa), executa no processo atual.
+    """
+    if processos <= 1 or len(tarefas) <= 1:
+        for tarefa in tarefas:
+            try:
+                yield tarefa, funcao(*tarefa), None
+            except Exception as erro:
+                yield tarefa, None, erro
+        return
+    with ProcessPoolExecutor(min(processos, len(tarefas))) as executor:
+        futuros = {executor.submit(funcao, *tarefa): tarefa for tarefa in tarefas}
+        for futuro in as_completed(futuros):
+            try:
+                yield futuros[futuro], futuro.result(), None
+            except Exception as erro:
+                yield futuros[futuro], None, erro
+
+
+def _maiores_primeiro(tarefas):
+    """Planilhas maiores primeiro: o tempo total tende ao da maior planilha"""
+    return sorted(tarefas, key=lambda tarefa: -os.path.getsize(tarefa[1]))
+
+
+def _processos(processos):
+    return processos or os.cpu_count() or 1
+
+
+def ler_planilhas(anos=None, processos=None):
+    """Lê e padroniza as planilhas dos anos em paralelo
+
+    Cada planilha é lida em um processo (`processos`: padrão = núcleos).
+    Devolve ({ano: DataFrame}, {ano: erro}), em ordem de ano; um ano com
+    alguma planilha com erro fica só em erros.
+    """
+    anos = sorted(ESQUEMAS_FONTES) if anos is None else sorted(anos)
+    arquivos, erros = {}, {}
+    for ano in anos:
+        try:
+            arquivos[ano] = arquivos_fonte(ano)
+        except FileNotFoundError as erro:
+            erros[ano] = erro
+    tarefas = _maiores_primeiro([(ano, arquivo) for ano, lista in arquivos.items() for arquivo in lista])
+    partes = {}
+    for (ano, arquivo), df, erro in _em_processos(ler_planilha, tarefas, _processos(processos)):
+        if erro is not None:
+            erros.setdefault(ano, RuntimeError(f"{arquivo}: {erro}"))
+        else:
+            partes[(ano, arquivo)] = df
+    dados = {ano: pd.concat([partes[(ano, arquivo)] for arquivo in lista], ignore_index=True)
+             for ano, lista in arquivos.items() if ano not in erros}
+    return dados, dict(sorted(erros.items()))
+
+
+def _consolidar_planilha(ano, arquivo, destino):
+    """Lê uma planilha e grava seus blocos no arquivo Parquet `destino`"""
+    with etapa('consolidacao', ano=ano, arquivo=arquivo) as registro:
+        registros = gravar_blocos(ler_planilha_em_blocos(ano, arquivo=arquivo), destino, ano)
+        registro['registros'] = registros
+        registro['bytes'] = os.path.getsize(destino)
+    return registros
+
+
+def consolidar(completo=False, anos=None, processos=None):
+    """Atualiza o dataset consolidado e devolve o status de cada ano
+
+    As planilhas alteradas são lidas em paralelo, uma por processo
+    (`processos`: padrão = núcleos), cada uma gravando seu arquivo na
+    partição provisória do ano; quando todas as planilhas de um ano
+    terminam, a partição provisória substitui a atual. Status:
+    'reaproveitado' (planilhas inalteradas), 'processado' ou 'erro' (alguma
+    planilha do ano falhou: a partição anterior é mantida e os demais anos
+    seguem normalmente).
+    """
+    anos = sorted(ESQUEMAS_FONTES) if anos is None else sorted(anos)
+    manifesto = {} if completo else carregar_manifesto()
+    status = {}
+    pendentes = {}
+
+    for ano in anos:
+        chave = str(ano)
+        try:
+            arquivos = arquivos_fonte(ano)
+            anterior = manifesto.get(chave) or {}
+            digitais = {arquivo: impressao_digital(arquivo, anterior.get('arquivos', {}).get(arquivo))
+                        for arquivo in arquivos}
+        except OSError as erro:
+            status[ano] = 'erro'
+            print(f"⚠ {ano}: {erro}")
+            continue
+        digital = {'arquivos': digitais, 'esquema': versao_esquema(ano), 'derivadas': versao_derivadas()}
+
+        hashes = {arquivo: d['sha256'] for arquivo, d in digitais.items()}
+        hashes_anteriores = {arquivo: d.get('sha256') for arquivo, d in anterior.get('arquivos', {}).items()}
+        if (anterior and os.path.isdir(caminho_particao(ano)) and hashes == hashes_anteriores
+                and anterior.get('esquema') == digital['esquema']
+                and anterior.get('derivadas') == digital['derivadas']):
+            manifesto[chave] = dict(anterior, **digital)
+            status[ano] = 'reaproveitado'
+            descricao = f"{arquivos[0]} inalterado" if len(arquivos) == 1 else f"{len(arquivos)} planilhas inalteradas"
+            print(f"{ano}: {descricao} - partição reaproveitada")
+            continue
+        pendentes[ano] = digital
+
+    # Uma tarefa por planilha, gravando na partição provisória do ano
+    tarefas = []
+    for ano, digital in pendentes.items():
+        provisorio = caminho_provisorio(ano)
+        if os.path.isdir(provisorio):
+            shutil.rmtree(provisorio)
+        os.makedirs(provisorio)
+        for indice, arquivo in enumerate(digital['arquivos']):
+            tarefas.append((ano, arquivo, os.path.join(provisorio, NOME_PARTE.format(indice))))
+    restantes = {ano: len(digital['arquivos']) for ano, digital in pendentes.items()}
+    registros = dict.fromkeys(pendentes, 0)
+    erros = {}
+
+    for (ano, arquivo, _), linhas, erro in _em_processos(_consolidar_planilha, _maiores_primeiro(tarefas),
+                                                         _processos(processos)):
+        if erro is not None:
+            erros.setdefault(ano, f"{arquivo}: {erro}")
+        else:
+            registros[ano] += linhas
+        restantes[ano] -= 1
+        if restantes[ano]:
+            continue
+        # Todas as planilhas do ano terminaram
+        if ano in erros:
+            shutil.rmtree(caminho_provisorio(ano), ignore_errors=True)
+            status[ano] = 'erro'
+            print(f"⚠ {ano}: {erros[ano]} - partição anterior mantida")
+            continue
+        substituir_particao(ano, caminho_provisorio(ano))
+        manifesto[str(ano)] = dict(pendentes[ano], registros=registros[ano])
+        status[ano] = 'processado'
+        print(f"{ano}: {registros[ano]:,} registros")
+        # Gravar após cada ano para não perder o progresso se outro ano falhar
+        salvar_manifesto(manifesto)
+
+    salvar_manifesto(manifesto)
+    return dict(sorted(status.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consolida as planilhas de acidentes do DER')
+    parser.add_argument('--completo', action='store_true',
+                        help='reprocessa todas as planilhas, ignorando o manifesto')
+    parser.add_argument('-p', '--processos', type=int, default=0,
+                        help='planilhas lidas em paralelo (padrão: 0 = todos os núcleos)')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'mede cada etapa e grava {RASTRO_CONSOLIDACAO}.json/.csv '
+                             '(planilhas reaproveitadas não são medidas: use com --completo)')
+    args = parser.parse_args()
+    processos = args.processos
+    if args.profile:
+        ativar()
+        registrar_importacoes("import consolidar_dados")
+        if processos != 1:
+            print("• --profile mede em um único processo: planilhas lidas em sequência")
+            processos = 1
+
+    print("=" * 60)
+    print("CONSOLIDAÇÃO DE DADOS - ACIDENTES DER 2023-2024-2025")
+    print("=" * 60)
+
+    print("\nCarregando dados...")
+    status = consolidar(completo=args.completo, processos=processos)
+
+    df_total = carregar_dados(colunas=['Ano'])
+
+    print("\n" + "=" * 60)
+    print("RESUMO DA CONSOLIDAÇÃO")
+    print("=" * 60)
+    print(f"\nTotal de registros consolidados: {len(df_total):,}")
+    print(f"\nDistribuição por ano:")
+    print(df_total['Ano'].value_counts().sort_index())
+    print(f"\nDataset salvo: {CAMINHO_DADOS}/")
+    print("=" * 60)
+    if args.profile:
+        imprimir_resumo()
+        caminho_json, caminho_csv = salvar_rastro(RASTRO_CONSOLIDACAO)
+        print(f"\n✓ Rastro salvo em {caminho_json} e {caminho_csv}")
+    com_erro = [str(ano) for ano, situacao in status.items() if situacao == 'erro']
+    if com_erro:
+        print(f"\n⚠ Anos não atualizados: {', '.join(com_erro)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
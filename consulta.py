@@ -0,0 +1,166 @@
+"""
+Consultas sobre o dataset consolidado com filtros aplicados na leitura
+
+Os filtros (ano, período, rodovia, regional, tipo, ocorrência, faixa de km)
+viram uma expressão do pyarrow.dataset: o ano descarta partições inteiras e
+os demais predicados são avaliados na leitura, com as estatísticas dos row
+groups descartando blocos que não podem conter linhas pedidas. Com `por`, o
+agrupamento também é feito no Arrow e só o resultado agregado chega ao
+pandas.
+
+Uso:
+    python consulta.py --rodovia SP-055 --regional CR.05 --inicio 2025-04-01 --fim 2025-06-30 --metricas Fatal
+    python consulta.py --ano 2024 2025 --por Ano Regional --metricas Acidentes Fatal
+
+    from consulta import consultar
+    consultar(rodovias=['SP-055'], inicio='2025-04-01', fim='2025-06-30', por='Regional')
+"""
+import argparse
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from armazenamento import CAMINHO_DADOS, abrir_dataset, carregar_dados, para_pandas
+from cubo_agregado import METRICAS_CUBO
+from esquema_fontes import rotulo_rodovia
+
+# Métricas disponíveis nas consultas agrupadas: contagem de acidentes e somas
+METRICAS_CONSULTA = ['Acidentes'] + METRICAS_CUBO
+
+
+def _lista(valores):
+    if valores is None:
+        return None
+    if isinstance(valores, (str, int)):
+        return [valores]
+    return list(valores)
+
+
+def _data(valor):
+    return pa.scalar(pd.Timestamp(valor), type=pa.timestamp('us'))
+
+
+def filtro_consulta(anos=None, inicio=None, fim=None, rodovias=None, regionais=None,
+                    tipos=None, ocorrencias=None, km=None):
+    """Expressão do pyarrow.dataset com os filtros pedidos (None se nenhum)
+
+    `inicio` e `fim` são datas de abertura (o dia `fim` entra inteiro);
+    `km` é um par (mínimo, máximo), com None para um lado aberto. Rodovias
+    aceitam o número (330) ou o rótulo canônico ('SP-330').
+    """
+    condicoes = []
+    anos = _lista(anos)
+    if anos is not None:
+        condicoes.append(ds.field('Ano').isin([int(a) for a in anos]))
+    if inicio is not None:
+        condicoes.append(ds.field('Data Abertura') >= _data(inicio))
+        # Também descarta as partições de anos anteriores ao período
+        condicoes.append(ds.field('Ano') >= pd.Timestamp(inicio).year)
+    if fim is not None:
+        condicoes.append(ds.field('Data Abertura') < _data(pd.Timestamp(fim).normalize() + pd.Timedelta(days=1)))
+        condicoes.append(ds.field('Ano') <= pd.Timestamp(fim).year)
+    for coluna, valores in [('Rodovia', _lista(rodovias)), ('Regional', _lista(regionais)),
+                            ('Tipo Acidente', _lista(tipos)), ('Ocorrencia', _lista(ocorrencias))]:
+        if valores is None:
+            continue
+        if coluna == 'Rodovia':
+            valores = [rotulo_rodovia(v) for v in valores]
+        condicoes.append(ds.field(coluna).isin([str(v) for v in valores]))
+    if km is not None:
+        km_min, km_max = km
+        if km_min is not None:
+            condicoes.append(ds.field('Km') >= float(km_min))
+        if km_max is not None:
+            condicoes.append(ds.field('Km') <= float(km_max))
+
+    filtro = None
+    for condicao in condicoes:
+        filtro = condicao if filtro is None else filtro & condicao
+    return filtro
+
+
+def _agrupar(tabela, por, metricas):
+    """Agrupamento no Arrow: contagem de acidentes e somas das métricas"""
+    agregacoes = []
+    nomes = {}
+    for metrica in metricas:
+        if metrica == 'Acidentes':
+            agregacoes.append(([], 'count_all'))
+            nomes['count_all'] = 'Acidentes'
+        else:
+            agregacoes.append((metrica, 'sum'))
+            nomes[f'{metrica}_sum'] = metrica
+    # Cada partição/row group tem o próprio dicionário; unificar antes de agrupar
+    agrupado = tabela.unify_dictionaries().group_by(por).aggregate(agregacoes)
+    return agrupado.rename_columns([nomes.get(c, c) for c in agrupado.column_names])
+
+
+def consultar(por=None, metricas=None, colunas=None, formato='pandas', caminho=CAMINHO_DADOS, **filtros):
+    """Executa uma consulta filtrada (e opcionalmente agrupada) no dataset
+
+    Filtros: os argumentos de filtro_consulta (anos, inicio, fim, rodovias,
+    regionais, tipos, ocorrencias, km).
+
+    Sem `por`, devolve as linhas filtradas com as `colunas` pedidas (todas se
+    None). Com `por` (dimensões), devolve uma linha por grupo com as
+    `metricas` (padrão: METRICAS_CONSULTA), ordenada pelas dimensões.
+    `formato`: 'pandas' (DataFrame) ou 'arrow' (pyarrow.Table).
+    """
+    if formato not in ('pandas', 'arrow'):
+        raise ValueError(f"Formato '{formato}' inválido (use 'pandas' ou 'arrow')")
+    filtro = filtro_consulta(**filtros)
+
+    if por is None:
+        if formato == 'pandas':
+            return carregar_dados(colunas=colunas, caminho=caminho, filtro=filtro)
+        if colunas is not None:
+            colunas = list(dict.fromkeys(list(colunas) + ['Ano']))
+        return abrir_dataset(caminho).to_table(columns=colunas, filter=filtro)
+
+    por = _lista(por)
+    metricas = METRICAS_CONSULTA if metricas is None else _lista(metricas)
+    desconhecidas = [m for m in metricas if m not in METRICAS_CONSULTA]
+    if desconhecidas:
+        raise KeyError(f"Métricas desconhecidas: {', '.join(desconhecidas)} "
+                       f"(disponíveis: {', '.join(METRICAS_CONSULTA)})")
+    leitura = list(dict.fromkeys(por + [m for m in metricas if m != 'Acidentes']))
+    tabela = _agrupar(abrir_dataset(caminho).to_table(columns=leitura, filter=filtro), por, metricas)
+    if formato == 'arrow':
+        # Resultado pequeno: dicionários viram texto para permitir a ordenação
+        for i, campo in enumerate(tabela.schema):
+            if pa.types.is_dictionary(campo.type):
+                tabela = tabela.set_column(i, campo.name, pc.cast(tabela[campo.name], campo.type.value_type))
+        return tabela.sort_by([(c, 'ascending') for c in por])
+    return para_pandas(tabela).sort_values(por).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consulta o dataset consolidado de acidentes')
+    parser.add_argument('--ano', nargs='+', type=int, help='anos (partições) consultados')
+    parser.add_argument('--inicio', help='data de abertura inicial (AAAA-MM-DD)')
+    parser.add_argument('--fim', help='data de abertura final, inclusive (AAAA-MM-DD)')
+    parser.add_argument('--rodovia', nargs='+', help='rodovias (ex: SP-330 ou 330)')
+    parser.add_argument('--regional', nargs='+', help='regionais (ex: CR.05)')
+    parser.add_argument('--tipo', nargs='+', help='tipos de acidente')
+    parser.add_argument('--ocorrencia', nargs='+', help='ocorrências')
+    parser.add_argument('--km', nargs=2, type=float, metavar=('MIN', 'MAX'), help='faixa de km')
+    parser.add_argument('--por', nargs='+', default=['Ano'], help='dimensões do agrupamento (padrão: Ano)')
+    parser.add_argument('--metricas', nargs='+', help=f"métricas ({', '.join(METRICAS_CONSULTA)})")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resultado = consultar(
+        por=args.por, metricas=args.metricas,
+        anos=args.ano, inicio=args.inicio, fim=args.fim, rodovias=args.rodovia,
+        regionais=args.regional, tipos=args.tipo, ocorrencias=args.ocorrencia, km=args.km,
+    )
+    duracao = time.perf_counter() - inicio
+    print(resultado.to_string(index=False))
+    print(f"\n• {len(resultado)} grupos em {duracao * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Cubo agregado de acidentes
+
+Agrega as linhas uma única vez no grão mais fino usado pelos gráficos
+(ano, mês, dia da semana, rodovia, regional, tipo, ocorrência, sentido,
+faixa de km e categoria de gravidade), com a contagem de acidentes e as
+somas de vítimas. Os gráficos fazem o "roll-up" a partir do cubo, cujo
+tamanho é limitado pela combinação de categorias e não pelo número de
+acidentes.
+"""
+
+# Dimensões do cubo, na ordem do agrupamento
+DIMENSOES_CUBO = ['Ano', 'Mes', 'Dia_Semana', 'Rodovia', 'Regional', 'Tipo Acidente',
+                  'Ocorrencia', 'Sentido', 'Faixa_KM', 'Gravidade_Categoria']
+
+# Métricas somadas em cada célula (além da contagem de acidentes)
+METRICAS_CUBO = ['Leve', 'Grave', 'Fatal', 'Total de Vítimas']
+
+
+def construir_cubo(df):
+    """Agrega o DataFrame de acidentes no cubo
+
+    Usa apenas as dimensões e métricas presentes em `df`. Células com
+    dimensão nula (ex.: Km ausente) são mantidas.
+    """
+    dimensoes = [d for d in DIMENSOES_CUBO if d in df.columns]
+    metricas = [m for m in METRICAS_CUBO if m in df.columns]
+    agregacoes = {'Acidentes': ('Ano', 'size')}
+    for metrica in metricas:
+        agregacoes[metrica] = (metrica, 'sum')
+    cubo = df.groupby(dimensoes, observed=True, dropna=False, sort=False).agg(**agregacoes)
+    return cubo.reset_index()
+
+
+def agregar(cubo, por, metricas=None):
+    """Roll-up do cubo pelas dimensões `por`
+
+    Devolve um DataFrame indexado por `por` com a soma das métricas pedidas
+    (padrão: Acidentes e todas as somas de vítimas).
+    """
+    if isinstance(por, str):
+        por = [por]
+    if metricas is None:
+        metricas = ['Acidentes'] + [m for m in METRICAS_CUBO if m in cubo.columns]
+    return cubo.groupby(por, observed=True)[metricas].sum()
+
+
+def tabela_cruzada(cubo, linhas, colunas, metrica='Acidentes'):
+    """Tabela linhas x colunas da métrica (equivalente a pd.crosstab)"""
+    tabela = agregar(cubo, [linhas, colunas], [metrica])[metrica].unstack(fill_value=0)
+    tabela.columns.name = colunas
+    return tabela
+
+
+def top_n(cubo, dimensao, n, metrica='Acidentes'):
+    """As `n` categorias de maior valor da métrica (como value_counts().head(n))"""
+    return agregar(cubo, dimensao, [metrica])[metrica].sort_values(ascending=False, kind='stable').head(n)
+
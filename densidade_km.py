@@ -0,0 +1,119 @@
+"""
+Densidade de acidentes ao longo do km de cada rodovia (KDE por FFT)
+
+Estimativa de densidade por núcleo gaussiano, ponderada pela severidade
+(peso do gráfico 20: 1 + 5 x graves + 20 x fatais). Os acidentes de cada
+rodovia são somados em uma grade fina de km (RESOLUCAO_KM) e a grade é
+convolvida com o núcleo via FFT, em O(m log m) no tamanho da grade, em vez
+da soma direta de um núcleo por acidente em cada ponto. A intensidade sai em
+peso por km.
+
+Uso:
+    python densidade_km.py                      # grava os picos em PICOS_CSV
+    python densidade_km.py --banda 1.0 --picos 3
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from indice_km import peso_severidade
+
+COLUNAS_DENSIDADE = ['Rodovia', 'Km', 'Grave', 'Fatal']
+
+# Grade de 100 m e desvio padrão do núcleo gaussiano (km)
+RESOLUCAO_KM = 0.1
+BANDA_KM = 0.5
+# O núcleo é truncado em +-4 desvios padrão
+ALCANCE_NUCLEO = 4
+
+PICOS_CSV = 'picos_densidade_km.csv'
+
+
+def _nucleo(resolucao, banda):
+    """Núcleo gaussiano amostrado na grade, com integral 1 (em km)"""
+    meia_largura = int(np.ceil(ALCANCE_NUCLEO * banda / resolucao))
+    x = np.arange(-meia_largura, meia_largura + 1) * resolucao
+    nucleo = np.exp(-0.5 * (x / banda) ** 2)
+    return nucleo / (nucleo.sum() * resolucao)
+
+
+def _convolver_fft(sinal, nucleo):
+    """Convolução 'same' de `sinal` com `nucleo` (ímpar, centrado) via FFT"""
+    tamanho = len(sinal) + len(nucleo) - 1
+    n_fft = 1 << (tamanho - 1).bit_length()
+    completo = np.fft.irfft(np.fft.rfft(sinal, n_fft) * np.fft.rfft(nucleo, n_fft), n_fft)[:tamanho]
+    inicio = len(nucleo) // 2
+    # Erros de arredondamento da FFT podem dar valores negativos minúsculos
+    return np.clip(completo[inicio:inicio + len(sinal)], 0, None)
+
+
+def densidade_rodovia(km, pesos, resolucao=RESOLUCAO_KM, banda=BANDA_KM):
+    """Densidade ponderada de uma rodovia
+
+    Devolve (grade, densidade): os km da grade (do primeiro ao último
+    acidente, com margem de ALCANCE_NUCLEO bandas) e a intensidade em cada
+    ponto, em peso por km.
+    """
+    km = np.asarray(km, dtype='float64')
+    pesos = np.asarray(pesos, dtype='float64')
+    margem = ALCANCE_NUCLEO * banda
+    origem = np.floor((km.min() - margem) / resolucao) * resolucao
+    n_pontos = int(np.ceil((km.max() + margem - origem) / resolucao)) + 1
+    posicoes = np.rint((km - origem) / resolucao).astype('int64')
+    contagens = np.bincount(posicoes, weights=pesos, minlength=n_pontos)
+    grade = origem + np.arange(n_pontos) * resolucao
+    return grade, _convolver_fft(contagens, _nucleo(resolucao, banda))
+
+
+def densidades(df, resolucao=RESOLUCAO_KM, banda=BANDA_KM, rodovias=None):
+    """{rodovia: (grade, densidade)} para cada rodovia com acidentes com Km"""
+    dados = df[COLUNAS_DENSIDADE].dropna(subset=['Rodovia', 'Km'])
+    pesos = peso_severidade(dados['Grave'].to_numpy(dtype='float64'), dados['Fatal'].to_numpy(dtype='float64'))
+    dados = pd.DataFrame({'Rodovia': dados['Rodovia'].astype(str).to_numpy(),
+                          'Km': dados['Km'].to_numpy(dtype='float64'), 'Peso': pesos})
+    if rodovias is not None:
+        dados = dados[dados['Rodovia'].isin(rodovias)]
+    return {rodovia: densidade_rodovia(grupo['Km'], grupo['Peso'], resolucao, banda)
+            for rodovia, grupo in dados.groupby('Rodovia', sort=True)}
+
+
+def picos(df, n_por_rodovia=5, resolucao=RESOLUCAO_KM, banda=BANDA_KM, rodovias=None):
+    """Máximos locais da densidade de cada rodovia, do mais intenso ao menos
+
+    Devolve um DataFrame com Rodovia, Km e Intensidade (peso por km) dos
+    `n_por_rodovia` picos mais intensos de cada rodovia.
+    """
+    linhas = []
+    for rodovia, (grade, densidade) in densidades(df, resolucao, banda, rodovias).items():
+        if len(densidade) < 3:
+            continue
+        centro = densidade[1:-1]
+        maximos = np.flatnonzero((centro > densidade[:-2]) & (centro >= densidade[2:])) + 1
+        maximos = maximos[np.argsort(-densidade[maximos], kind='stable')][:n_por_rodovia]
+        for posicao in maximos:
+            linhas.append((rodovia, round(float(grade[posicao]), 3), float(densidade[posicao])))
+    resultado = pd.DataFrame(linhas, columns=['Rodovia', 'Km', 'Intensidade'])
+    return resultado.sort_values('Intensidade', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def main():
+    from consulta import consultar
+
+    parser = argparse.ArgumentParser(description='Picos de densidade de acidentes ao longo das rodovias')
+    parser.add_argument('--resolucao', type=float, default=RESOLUCAO_KM, help='passo da grade em km (padrão: 0.1)')
+    parser.add_argument('--banda', type=float, default=BANDA_KM, help='desvio padrão do núcleo em km (padrão: 0.5)')
+    parser.add_argument('--picos', type=int, default=5, help='picos por rodovia (padrão: 5)')
+    parser.add_argument('--ano', nargs='+', type=int, help='anos considerados (padrão: todos)')
+    parser.add_argument('--saida', default=PICOS_CSV, help=f'arquivo CSV (padrão: {PICOS_CSV})')
+    args = parser.parse_args()
+
+    df = consultar(colunas=COLUNAS_DENSIDADE, anos=args.ano)
+    resultado = picos(df, args.picos, args.resolucao, args.banda)
+    resultado.to_csv(args.saida, index=False, encoding='utf-8-sig')
+    print(resultado.head(15).to_string(index=False))
+    print(f"\n✓ {len(resultado)} picos de {resultado['Rodovia'].nunique()} rodovias salvos em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
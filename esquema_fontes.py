@@ -0,0 +1,141 @@
+"""
+Registro declarativo das planilhas de origem de cada ano
+
+Cada ano descreve a planilha (arquivo e aba), os nomes alternativos das
+colunas, os mapas de normalização das categorias e o sistema de registro do
+sentido da via. A consolidação aplica o registro uma única vez, por bloco e
+de forma vetorizada; os tipos finais das colunas são os do ESQUEMA do
+armazenamento. Incluir um ano novo (ou uma peculiaridade nova de um ano) é
+uma entrada em ESQUEMAS_FONTES, não uma alteração de código.
+
+O 'arquivo' pode ser um padrão glob para anos divididos em várias planilhas
+(ex.: uma por mês, 'Acidentes_DER_2026_*.xlsx'): as planilhas que casam com
+o padrão são lidas em ordem alfabética (use o mês com dois dígitos) e juntas
+formam a partição do ano.
+"""
+import glob
+import hashlib
+import inspect
+import json
+import re
+
+# Sistemas de registro do Sentido
+SENTIDO_CRESCENTE = 'Crescente/Decrescente'
+SENTIDO_CARDEAL = 'Coordenadas Cardeais'
+
+# Normalizações aplicadas a todos os anos: {coluna: {valor original: valor canônico}}
+NORMALIZACAO_COMUM = {
+    # Ocorrências em Title Case (2025 usa capitalização diferente)
+    'Ocorrencia': {
+        'Acidente com Vítima': 'Acidente Com Vítima',
+        'Acidente com Vítima Fatal': 'Acidente Com Vítima Fatal',
+        'Acidente sem Vítima': 'Acidente Sem Vítima',
+    },
+}
+
+ESQUEMAS_FONTES = {
+    2023: {
+        'arquivo': 'Acidentes_DER_2023.xlsx',
+        'aba': 'Base de Dados',
+        'aliases': {},
+        'normalizacao': {},
+        'sentido': SENTIDO_CRESCENTE,
+    },
+    2024: {
+        'arquivo': 'Acidentes_DER_2024.xlsx',
+        'aba': 'Base de Dados',
+        # ' Ocorrência' com espaço e 'Data' em vez de 'Nova data'
+        'aliases': {' Ocorrência': 'Ocorrencia', 'Data': 'Nova data'},
+        'normalizacao': {},
+        'sentido': SENTIDO_CRESCENTE,
+    },
+    2025: {
+        'arquivo': 'Acidentes_DER_2025.xlsx',
+        # Nome da aba com espaço no final
+        'aba': 'Base de dados ',
+        'aliases': {},
+        'normalizacao': {
+            'Tipo Acidente': {
+                'Atropelamento de Pedestre': 'Atropelamento De Pedestre',
+                'Atropelamento de animal': 'Atropelamento Animal',
+            },
+            'Sentido': {
+                'Leste / Oeste': 'Leste/Oeste',
+                'Norte / Sul': 'Norte/Sul',
+                'SI': 'Sem Informação',
+                '-': 'Sem Informação',
+            },
+        },
+        # A partir de 2025 o sentido passou a ser registrado em coordenadas
+        # cardeais (Norte/Sul/Leste/Oeste)
+        'sentido': SENTIDO_CARDEAL,
+    },
+}
+
+
+def rotulo_rodovia(valor):
+    """Rótulo canônico da rodovia (ex: 8 => SP-008, ' 009/010' => SP-009/010,
+    'SPI 172/060' => SPI-172/060)"""
+    texto = str(valor).strip()
+    if texto.isdigit():
+        return f"SP-{int(texto):03d}"
+    prefixo = re.match(r'^([A-Z]+)\s*-?\s*(.+)$', texto)
+    if prefixo:
+        return f"{prefixo.group(1)}-{prefixo.group(2)}"
+    return f"SP-{texto}"
+
+
+def esquema_fonte(ano):
+    """Registro da planilha de um ano"""
+    try:
+        return ESQUEMAS_FONTES[int(ano)]
+    except KeyError:
+        raise KeyError(f"Ano {ano} não tem planilha registrada em ESQUEMAS_FONTES") from None
+
+
+def arquivos_fonte(ano):
+    """Planilhas do ano, em ordem (várias se 'arquivo' é um padrão glob)"""
+    padrao = esquema_fonte(ano)['arquivo']
+    if not any(caractere in padrao for caractere in '*?['):
+        return [padrao]
+    arquivos = sorted(glob.glob(padrao))
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhuma planilha de {ano} encontrada para '{padrao}'")
+    return arquivos
+
+
+def mapas_normalizacao(ano):
+    """Mapas de normalização do ano (comuns + específicos), por coluna"""
+    mapas = {col: dict(mapa) for col, mapa in NORMALIZACAO_COMUM.items()}
+    for col, mapa in esquema_fonte(ano)['normalizacao'].items():
+        mapas.setdefault(col, {}).update(mapa)
+    return mapas
+
+
+def sistema_sentido(ano):
+    """Sistema de registro do Sentido no ano (SENTIDO_CRESCENTE ou SENTIDO_CARDEAL)"""
+    return esquema_fonte(ano)['sentido']
+
+
+def versao_esquema(ano):
+    """Hash do registro do ano: partições gravadas com outro registro são refeitas"""
+    registro = dict(esquema_fonte(ano), normalizacao=mapas_normalizacao(ano))
+    texto = json.dumps(registro, sort_keys=True, ensure_ascii=False)
+    codigo = inspect.getsource(rotulo_rodovia) + inspect.getsource(normalizar)
+    return hashlib.sha256((texto + codigo).encode('utf-8')).hexdigest()
+
+
+def normalizar(df, ano):
+    """Aplica os mapas de normalização do ano às colunas de `df` (no lugar)
+
+    A substituição é vetorizada (Series.replace), sem laço em Python pelas
+    linhas. A Rodovia recebe o rótulo canônico, calculado uma vez por valor
+    distinto.
+    """
+    for col, mapa in mapas_normalizacao(ano).items():
+        if col in df.columns and mapa:
+            df[col] = df[col].replace(mapa)
+    if 'Rodovia' in df.columns:
+        distintos = df['Rodovia'].dropna().unique()
+        df['Rodovia'] = df['Rodovia'].map({valor: rotulo_rodovia(valor) for valor in distintos})
+    return df
@@ -1,334 +1,307 @@
-import pandas as pd
+"""
+Gráficos 8 a 13: séries temporais, severidade, sentido, quilometragem e heatmap rodovia x mês
+"""
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
-
-# Função para salvar gráfico com HTML acessível
-def salvar_grafico_acessivel(fig, filename, titulo):
-    """Salva o gráfico com HTML completo e tags de acessibilidade"""
-    # Configurar para ser responsivo
-    fig.update_layout(
-        autosize=True,
-        margin=dict(l=50, r=50, t=80, b=150, autoexpand=True)
-    )
-    html_content = fig.to_html(include_plotlyjs='cdn', full_html=False, config={'responsive': True})
-    html_completo = f'''<!DOCTYPE html>
-<html lang="pt-BR">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{titulo} - Análise de Acidentes DER</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        html, body {{ width: 100%; height: 100%; overflow: hidden; }}
-        .plotly-graph-div {{ width: 100% !important; height: 100% !important; }}
-        .js-plotly-plot {{ width: 100% !important; height: 100% !important; }}
-    </style>
-</head>
-<body>
-{html_content}
-</body>
-</html>'''
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html_completo)
-
-# Carregar dados
-df_total = pd.read_csv('dados_completos.csv')
-df_total['Data Abertura'] = pd.to_datetime(df_total['Data Abertura'], errors='coerce')
-df_total['Nova data'] = pd.to_datetime(df_total['Nova data'], errors='coerce')
-
-# Incluir todos os três anos de análise (2023, 2024, 2025)
-df = df_total[df_total['Ano'].isin([2023, 2024, 2025])].copy()
-
-# Paleta de cores Sigma-PLI (azul institucional, verde, amarelo)
-CORES_SIGMA = ['#1E3A5F', '#2E7D32', '#F9A825']  # Azul, Verde, Amarelo
-
-print("Gerando gráficos avançados...")
+from cubo_agregado import tabela_cruzada, top_n
+from pre_agregacao import histogramas, histogramas_contagens, resumos_caixa, resumos_caixa_contagens, tracos_caixa
+from colunas_derivadas import MESES_ABREV
+from esquema_fontes import SENTIDO_CARDEAL, sistema_sentido
+from serie_temporal import reamostrar, tabela_ano_mes
+from motor_graficos import cor_ano, gerar_graficos, registrar_grafico, rotulo_anos
+
+meses_nomes = MESES_ABREV
 
 # ===== GRÁFICO 8: SÉRIE TEMPORAL DE ACIDENTES MENSAIS =====
-df['Mes'] = df['Data Abertura'].dt.month
-meses_nomes = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-
-fig8 = go.Figure()
-for i, ano in enumerate([2023, 2024, 2025]):
-    dados_ano = df[df['Ano']==ano].groupby('Mes').size().reindex(range(1, 13), fill_value=0)
-    fig8.add_trace(go.Scatter(
-        x=meses_nomes,
-        y=dados_ano.values,
-        mode='lines+markers',
-        name=str(ano),
-        marker=dict(size=8, color=CORES_SIGMA[i]),
-        line=dict(width=2, color=CORES_SIGMA[i])
-    ))
-
-fig8.update_layout(
-    title='<b>Série Temporal: Acidentes por Mês (2023-2024-2025)</b>',
-    xaxis_title='Mês',
-    yaxis_title='Quantidade de Acidentes',
-    hovermode='x unified',
-    template='plotly_white',
-    font=dict(size=11),
-    height=650,
-    xaxis=dict(type='category'),
-    legend=dict(
-        orientation='h',
-        yanchor='top',
-        y=-0.18,
-        xanchor='center',
-        x=0.5,
-        itemwidth=80
-    ),
-    margin=dict(b=130)
-)
-salvar_grafico_acessivel(fig8, '08_serie_temporal_acidentes.html', 'Série Temporal de Acidentes')
-print("✓ Gráfico 8 salvo")
+def dados_08(calendario):
+    mensal = tabela_ano_mes(reamostrar(calendario['Acidentes'], 'mes'))
+    return mensal.reindex(columns=range(1, 13)).fillna(0)
+
+
+@registrar_grafico('08', '08_serie_temporal_acidentes.html', 'Série Temporal de Acidentes',
+                   colunas=['Data Abertura'], entrada='calendario', agregacao=dados_08)
+def grafico_08(mensal):
+    fig8 = go.Figure()
+    for i, (ano, dados_ano) in enumerate(mensal.iterrows()):
+        fig8.add_trace(go.Scatter(
+            x=meses_nomes,
+            y=dados_ano.values,
+            mode='lines+markers',
+            name=str(ano),
+            marker=dict(size=8, color=cor_ano(i)),
+            line=dict(width=2, color=cor_ano(i))
+        ))
+
+    fig8.update_layout(
+        title=f'<b>Série Temporal: Acidentes por Mês ({rotulo_anos(mensal.index)})</b>',
+        xaxis_title='Mês',
+        yaxis_title='Quantidade de Acidentes',
+        hovermode='x unified',
+        template='plotly_white',
+        font=dict(size=11),
+        height=650,
+        xaxis=dict(type='category'),
+        legend=dict(
+            orientation='h',
+            yanchor='top',
+            y=-0.18,
+            xanchor='center',
+            x=0.5,
+            itemwidth=80
+        ),
+        margin=dict(b=130)
+    )
+    return fig8
+
 
 # ===== GRÁFICO 9: SÉRIE TEMPORAL DE VÍTIMAS MENSAIS =====
-fig9 = go.Figure()
-for i, ano in enumerate([2023, 2024, 2025]):
-    dados_ano = df[df['Ano']==ano].groupby('Mes')['Total de Vítimas'].sum().reindex(range(1, 13), fill_value=0)
-    fig9.add_trace(go.Scatter(
-        x=meses_nomes,
-        y=dados_ano.values,
-        mode='lines+markers',
-        name=str(ano),
-        marker=dict(size=8, color=CORES_SIGMA[i]),
-        line=dict(width=2, color=CORES_SIGMA[i])
-    ))
-
-fig9.update_layout(
-    title='<b>Série Temporal: Total de Vítimas por Mês (2023-2024-2025)</b>',
-    xaxis_title='Mês',
-    yaxis_title='Total de Vítimas',
-    hovermode='x unified',
-    template='plotly_white',
-    font=dict(size=11),
-    height=650,
-    xaxis=dict(type='category'),
-    legend=dict(
-        orientation='h',
-        yanchor='top',
-        y=-0.18,
-        xanchor='center',
-        x=0.5,
-        itemwidth=80
-    ),
-    margin=dict(b=130)
-)
-salvar_grafico_acessivel(fig9, '09_serie_temporal_vitimas.html', 'Série Temporal de Vítimas')
-print("✓ Gráfico 9 salvo")
+def dados_09(calendario):
+    mensal = tabela_ano_mes(reamostrar(calendario['Total de Vítimas'], 'mes'))
+    return mensal.reindex(columns=range(1, 13)).fillna(0)
+
+
+@registrar_grafico('09', '09_serie_temporal_vitimas.html', 'Série Temporal de Vítimas',
+                   colunas=['Data Abertura', 'Total de Vítimas'], entrada='calendario', agregacao=dados_09)
+def grafico_09(mensal):
+    fig9 = go.Figure()
+    for i, (ano, dados_ano) in enumerate(mensal.iterrows()):
+        fig9.add_trace(go.Scatter(
+            x=meses_nomes,
+            y=dados_ano.values,
+            mode='lines+markers',
+            name=str(ano),
+            marker=dict(size=8, color=cor_ano(i)),
+            line=dict(width=2, color=cor_ano(i))
+        ))
+
+    fig9.update_layout(
+        title=f'<b>Série Temporal: Total de Vítimas por Mês ({rotulo_anos(mensal.index)})</b>',
+        xaxis_title='Mês',
+        yaxis_title='Total de Vítimas',
+        hovermode='x unified',
+        template='plotly_white',
+        font=dict(size=11),
+        height=650,
+        xaxis=dict(type='category'),
+        legend=dict(
+            orientation='h',
+            yanchor='top',
+            y=-0.18,
+            xanchor='center',
+            x=0.5,
+            itemwidth=80
+        ),
+        margin=dict(b=130)
+    )
+    return fig9
+
 
 # ===== GRÁFICO 10: TAXA DE SEVERIDADE (GRAVES E FATAIS) =====
-severidade_2023 = df[df['Ano']==2023].copy()
-severidade_2024 = df[df['Ano']==2024].copy()
-severidade_2025 = df[df['Ano']==2025].copy()
-
-severidade_2023['Severidade'] = ((severidade_2023['Grave'] + severidade_2023['Fatal'] * 2) / 
-                                  (severidade_2023['Leve'] + severidade_2023['Grave'] + severidade_2023['Fatal'] + 1)) * 100
-severidade_2024['Severidade'] = ((severidade_2024['Grave'] + severidade_2024['Fatal'] * 2) / 
-                                  (severidade_2024['Leve'] + severidade_2024['Grave'] + severidade_2024['Fatal'] + 1)) * 100
-severidade_2025['Severidade'] = ((severidade_2025['Grave'] + severidade_2025['Fatal'] * 2) / 
-                                  (severidade_2025['Leve'] + severidade_2025['Grave'] + severidade_2025['Fatal'] + 1)) * 100
-
-fig10 = go.Figure()
-fig10.add_trace(go.Box(
-    y=severidade_2023['Severidade'],
-    name='2023',
-    marker_color=CORES_SIGMA[0],
-    boxmean='sd'
-))
-fig10.add_trace(go.Box(
-    y=severidade_2024['Severidade'],
-    name='2024',
-    marker_color=CORES_SIGMA[1],
-    boxmean='sd'
-))
-fig10.add_trace(go.Box(
-    y=severidade_2025['Severidade'],
-    name='2025',
-    marker_color=CORES_SIGMA[2],
-    boxmean='sd'
-))
-fig10.update_layout(
-    title='<b>Distribuição do Índice de Severidade dos Acidentes</b>',
-    yaxis_title='Índice de Severidade (%)',
-    hovermode='y unified',
-    template='plotly_white',
-    font=dict(size=11),
-    height=550,
-    legend=dict(
-        orientation='h',
-        yanchor='top',
-        y=-0.18,
-        xanchor='center',
-        x=0.5,
-        itemwidth=80
-    ),
-    margin=dict(b=130)
-)
-salvar_grafico_acessivel(fig10, '10_severidade_acidentes.html', 'Severidade dos Acidentes')
-print("✓ Gráfico 10 salvo")
+def dados_10(df):
+    # Índice de severidade gravado na consolidação (colunas_derivadas)
+    # Caixas pré-calculadas (quartis, bigodes e outliers distintos) por ano
+    return resumos_caixa(df['Severidade'], df['Ano'])
+
+
+def dados_banco_10(anos, caminho_banco):
+    from banco_analitico import contagens_banco
+    # Mesmas caixas a partir das contagens de cada índice distinto por ano
+    contagens = contagens_banco(['Ano', 'Severidade'], anos=anos, caminho_banco=caminho_banco)
+    return resumos_caixa_contagens(contagens, 'Severidade', 'Ano')
+
+
+@registrar_grafico('10', '10_severidade_acidentes.html', 'Severidade dos Acidentes',
+                   colunas=['Severidade'], agregacao=dados_10, agregacao_banco=dados_banco_10)
+def grafico_10(caixas):
+    resumo, outliers = caixas
+
+    fig10 = go.Figure()
+    for i, (ano, estatisticas) in enumerate(resumo.iterrows()):
+        for traco in tracos_caixa(estatisticas, outliers.get(ano), str(ano), str(ano), cor_ano(i), boxmean='sd'):
+            fig10.add_trace(traco)
+    fig10.update_layout(
+        title='<b>Distribuição do Índice de Severidade dos Acidentes</b>',
+        yaxis_title='Índice de Severidade (%)',
+        xaxis=dict(type='category'),
+        hovermode='y unified',
+        template='plotly_white',
+        font=dict(size=11),
+        height=550,
+        legend=dict(
+            orientation='h',
+            yanchor='top',
+            y=-0.18,
+            xanchor='center',
+            x=0.5,
+            itemwidth=80
+        ),
+        margin=dict(b=130)
+    )
+    return fig10
+
 
 # ===== GRÁFICO 11: DISTRIBUIÇÃO POR SENTIDO =====
-# Nota: Em 2025 houve mudança no padrão de registro - de Crescente/Decrescente para coordenadas cardeais
-sentidos_2023 = df[df['Ano']==2023]['Sentido'].value_counts()
-sentidos_2024 = df[df['Ano']==2024]['Sentido'].value_counts()
-# Para 2025, agrupar os principais sentidos cardeais
-sentidos_2025_raw = df[df['Ano']==2025]['Sentido'].value_counts()
-# Manter apenas os 4 principais (Norte, Sul, Leste, Oeste)
-sentidos_2025 = sentidos_2025_raw.head(4)
-sentidos_2025['Outros'] = sentidos_2025_raw.iloc[4:].sum()
-
-fig11 = make_subplots(
-    rows=1, cols=3,
-    subplot_titles=('2023 (Crescente/Decrescente)', '2024 (Crescente/Decrescente)', '2025 (Coordenadas Cardeais)'),
-    specs=[[{'type':'pie'}, {'type':'pie'}, {'type':'pie'}]]
-)
-
-fig11.add_trace(
-    go.Pie(labels=sentidos_2023.index, values=sentidos_2023.values, name='2023',
-            marker=dict(colors=['#1E3A5F', '#3D5A80', '#5C7AA0'])),
-    row=1, col=1
-)
-fig11.add_trace(
-    go.Pie(labels=sentidos_2024.index, values=sentidos_2024.values, name='2024',
-            marker=dict(colors=['#2E7D32', '#4E9D52', '#6EBD72'])),
-    row=1, col=2
-)
-fig11.add_trace(
-    go.Pie(labels=sentidos_2025.index, values=sentidos_2025.values, name='2025',
-            marker=dict(colors=['#F9A825', '#FBC02D', '#FDD835', '#FFEB3B', '#FFF176'])),
-    row=1, col=3
-)
-fig11.update_layout(
-    title_text='<b>Acidentes por Sentido da Via (2023-2024-2025)</b><br><sup>⚠️ Em 2025 houve mudança no padrão de registro: de Crescente/Decrescente para coordenadas cardeais (Norte/Sul/Leste/Oeste)</sup>',
-    height=550,
-    font=dict(size=11)
-)
-salvar_grafico_acessivel(fig11, '11_acidentes_por_sentido.html', 'Acidentes por Sentido')
-print("✓ Gráfico 11 salvo")
+def dados_11(cubo):
+    # O sistema de registro do sentido de cada ano vem de esquema_fontes
+    # (em 2025 passou de Crescente/Decrescente para coordenadas cardeais)
+    sentidos = tabela_cruzada(cubo, 'Ano', 'Sentido')
+    por_ano = {}
+    for ano in sentidos.index:
+        sentidos_ano = sentidos.loc[ano].loc[lambda s: s > 0].sort_values(ascending=False, kind='stable')
+        if sistema_sentido(ano) == SENTIDO_CARDEAL:
+            # Manter apenas os 4 principais (Norte, Sul, Leste, Oeste)
+            principais = sentidos_ano.head(4)
+            principais['Outros'] = sentidos_ano.iloc[4:].sum()
+            sentidos_ano = principais
+        por_ano[ano] = sentidos_ano
+    return por_ano
+
+
+@registrar_grafico('11', '11_acidentes_por_sentido.html', 'Acidentes por Sentido',
+                   colunas=['Sentido'], entrada='cubo', agregacao=dados_11)
+def grafico_11(sentidos):
+    from plotly.subplots import make_subplots
+
+    anos = list(sentidos)
+    paletas = [['#1E3A5F', '#3D5A80', '#5C7AA0'],
+               ['#2E7D32', '#4E9D52', '#6EBD72'],
+               ['#F9A825', '#FBC02D', '#FDD835', '#FFEB3B', '#FFF176']]
+
+    fig11 = make_subplots(
+        rows=1, cols=len(anos),
+        subplot_titles=[f"{ano} ({sistema_sentido(ano)})" for ano in anos],
+        specs=[[{'type': 'pie'} for _ in anos]]
+    )
+    for i, (ano, sentidos_ano) in enumerate(sentidos.items()):
+        fig11.add_trace(
+            go.Pie(labels=sentidos_ano.index, values=sentidos_ano.values, name=str(ano),
+                   marker=dict(colors=paletas[i % len(paletas)])),
+            row=1, col=i + 1
+        )
+    mudancas = [ano for anterior, ano in zip(anos, anos[1:])
+                if sistema_sentido(anterior) != SENTIDO_CARDEAL and sistema_sentido(ano) == SENTIDO_CARDEAL]
+    nota = ''.join(
+        f"<br><sup>⚠️ Em {ano} houve mudança no padrão de registro: de Crescente/Decrescente para coordenadas cardeais (Norte/Sul/Leste/Oeste)</sup>"
+        for ano in mudancas
+    )
+    fig11.update_layout(
+        title_text=f'<b>Acidentes por Sentido da Via ({rotulo_anos(anos)})</b>{nota}',
+        height=550,
+        font=dict(size=11)
+    )
+    return fig11
+
 
 # ===== GRÁFICO 12: DISTRIBUIÇÃO DE KM =====
-km_2023 = df[df['Ano']==2023]['Km'].dropna()
-km_2024 = df[df['Ano']==2024]['Km'].dropna()
-km_2025 = df[df['Ano']==2025]['Km'].dropna()
-
-fig12 = go.Figure()
-fig12.add_trace(go.Histogram(
-    x=km_2023,
-    nbinsx=50,
-    name='2023',
-    marker_color=CORES_SIGMA[0],
-    opacity=0.6
-))
-fig12.add_trace(go.Histogram(
-    x=km_2024,
-    nbinsx=50,
-    name='2024',
-    marker_color=CORES_SIGMA[1],
-    opacity=0.6
-))
-fig12.add_trace(go.Histogram(
-    x=km_2025,
-    nbinsx=50,
-    name='2025',
-    marker_color=CORES_SIGMA[2],
-    opacity=0.6
-))
-fig12.update_layout(
-    title='<b>Distribuição de Acidentes por Kilometragem (2023-2024-2025)</b>',
-    xaxis_title='Quilometragem (km)',
-    yaxis_title='Quantidade',
-    barmode='overlay',
-    hovermode='x unified',
-    template='plotly_white',
-    font=dict(size=11),
-    height=550,
-    legend=dict(
-        orientation='h',
-        yanchor='top',
-        y=-0.18,
-        xanchor='center',
-        x=0.5,
-        itemwidth=80
-    ),
-    margin=dict(b=130)
-)
-salvar_grafico_acessivel(fig12, '12_distribuicao_km.html', 'Distribuição por Quilometragem')
-print("✓ Gráfico 12 salvo")
+def dados_12(df):
+    # Contagens por faixa (50 faixas comuns a todos os anos) calculadas aqui
+    return histogramas(df['Km'], df['Ano'], bins=50)
+
+
+def dados_banco_12(anos, caminho_banco):
+    from banco_analitico import contagens_banco
+    contagens = contagens_banco(['Ano', 'Km'], anos=anos, caminho_banco=caminho_banco)
+    return histogramas_contagens(contagens, 'Km', 'Ano', bins=50)
+
+
+@registrar_grafico('12', '12_distribuicao_km.html', 'Distribuição por Quilometragem',
+                   colunas=['Km'], agregacao=dados_12, agregacao_banco=dados_banco_12)
+def grafico_12(histograma):
+    bordas, contagens = histograma
+    centros = (bordas[:-1] + bordas[1:]) / 2
+    faixas = np.column_stack([bordas[:-1], bordas[1:]])
+
+    fig12 = go.Figure()
+    for i, (ano, contagem) in enumerate(contagens.items()):
+        fig12.add_trace(go.Bar(
+            x=centros,
+            y=contagem,
+            width=bordas[1] - bordas[0],
+            name=str(ano),
+            marker_color=cor_ano(i),
+            opacity=0.6,
+            customdata=faixas,
+            hovertemplate='%{customdata[0]:.0f}-%{customdata[1]:.0f} km: %{y}'
+        ))
+    fig12.update_layout(
+        title=f'<b>Distribuição de Acidentes por Kilometragem ({rotulo_anos(contagens)})</b>',
+        xaxis_title='Quilometragem (km)',
+        yaxis_title='Quantidade',
+        barmode='overlay',
+        bargap=0,
+        hovermode='x unified',
+        template='plotly_white',
+        font=dict(size=11),
+        height=550,
+        legend=dict(
+            orientation='h',
+            yanchor='top',
+            y=-0.18,
+            xanchor='center',
+            x=0.5,
+            itemwidth=80
+        ),
+        margin=dict(b=130)
+    )
+    return fig12
+
 
 # ===== GRÁFICO 13: HEATMAP - ACIDENTES POR RODOVIA E MÊS =====
-df['Mes'] = df['Data Abertura'].dt.month
-df['Mes_Nome'] = df['Mes'].map({1:'Jan', 2:'Fev', 3:'Mar', 4:'Abr', 5:'Mai', 6:'Jun',
-                                 7:'Jul', 8:'Ago', 9:'Set', 10:'Out', 11:'Nov', 12:'Dez'})
-
-# Top 15 rodovias
-top_rodovias = df['Rodovia'].value_counts().head(15).index
-df_heatmap = df[df['Rodovia'].isin(top_rodovias)]
-
-heatmap_2023 = df_heatmap[df_heatmap['Ano']==2023].groupby(['Rodovia', 'Mes_Nome']).size().unstack(fill_value=0)
-heatmap_2024 = df_heatmap[df_heatmap['Ano']==2024].groupby(['Rodovia', 'Mes_Nome']).size().unstack(fill_value=0)
-heatmap_2025 = df_heatmap[df_heatmap['Ano']==2025].groupby(['Rodovia', 'Mes_Nome']).size().unstack(fill_value=0)
-
-# Ordenar meses
-meses_ordem = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-heatmap_2023 = heatmap_2023.reindex(columns=[m for m in meses_ordem if m in heatmap_2023.columns], fill_value=0)
-heatmap_2024 = heatmap_2024.reindex(columns=[m for m in meses_ordem if m in heatmap_2024.columns], fill_value=0)
-heatmap_2025 = heatmap_2025.reindex(columns=[m for m in meses_ordem if m in heatmap_2025.columns], fill_value=0)
-
-# Formatar nomes das rodovias com prefixo SP- e 3 dígitos (ex: 8 => SP-008)
-def formatar_rodovia(r):
-    try:
-        return f"SP-{int(r):03d}"
-    except:
-        return f"SP-{r}"
-
-heatmap_2023.index = [formatar_rodovia(r) for r in heatmap_2023.index]
-heatmap_2024.index = [formatar_rodovia(r) for r in heatmap_2024.index]
-heatmap_2025.index = [formatar_rodovia(r) for r in heatmap_2025.index]
-
-fig13 = make_subplots(
-    rows=1, cols=3,
-    subplot_titles=('2023', '2024', '2025'),
-    specs=[[{'type':'heatmap'}, {'type':'heatmap'}, {'type':'heatmap'}]],
-    horizontal_spacing=0.08
-)
-
-fig13.add_trace(
-    go.Heatmap(z=heatmap_2023.values, x=heatmap_2023.columns, y=heatmap_2023.index,
-               colorscale='Blues', name='2023', colorbar=dict(x=0.28, len=0.8, thickness=10)),
-    row=1, col=1
-)
-fig13.add_trace(
-    go.Heatmap(z=heatmap_2024.values if len(heatmap_2024) > 0 else [[0]], 
-               x=heatmap_2024.columns if len(heatmap_2024.columns) > 0 else ['Jan'], 
-               y=heatmap_2024.index if len(heatmap_2024) > 0 else [''],
-               colorscale='Greens', name='2024', colorbar=dict(x=0.64, len=0.8, thickness=10)),
-    row=1, col=2
-)
-fig13.add_trace(
-    go.Heatmap(z=heatmap_2025.values, x=heatmap_2025.columns, y=heatmap_2025.index,
-               colorscale='YlOrBr', name='2025', colorbar=dict(x=1.0, len=0.8, thickness=10)),
-    row=1, col=3
-)
-fig13.update_xaxes(title_text='Mês', row=1, col=1, tickfont=dict(size=7), tickangle=-45)
-fig13.update_xaxes(title_text='Mês', row=1, col=2, tickfont=dict(size=7), tickangle=-45)
-fig13.update_xaxes(title_text='Mês', row=1, col=3, tickfont=dict(size=7), tickangle=-45)
-fig13.update_yaxes(title_text='Rodovia', row=1, col=1, tickfont=dict(size=7))
-fig13.update_yaxes(tickfont=dict(size=7), row=1, col=2)
-fig13.update_yaxes(tickfont=dict(size=7), row=1, col=3)
-fig13.update_layout(
-    title_text='<b>Heatmap: Acidentes por Rodovia e Mês (Top 15 Rodovias)</b>',
-    height=550,
-    font=dict(size=8),
-    margin=dict(l=80, r=30, t=60, b=80)
-)
-salvar_grafico_acessivel(fig13, '13_heatmap_rodovia_mes.html', 'Heatmap Rodovia x Mês')
-print("✓ Gráfico 13 salvo")
-
-print("\n✓ 6 gráficos avançados gerados com sucesso!")
+def dados_13(cubo):
+    # Top 15 rodovias: tabela rodovia x mês de cada ano
+    top_rodovias = top_n(cubo, 'Rodovia', 15).index
+    cubo_heatmap = cubo[cubo['Rodovia'].isin(top_rodovias)]
+    heatmaps = {}
+    for ano in sorted(cubo_heatmap['Ano'].unique()):
+        heatmap_ano = tabela_cruzada(cubo_heatmap[cubo_heatmap['Ano'] == ano], 'Rodovia', 'Mes')
+        # Meses em ordem, com abreviações
+        heatmap_ano.columns = [meses_nomes[int(m) - 1] for m in heatmap_ano.columns]
+        heatmaps[ano] = heatmap_ano
+    return heatmaps
+
+
+@registrar_grafico('13', '13_heatmap_rodovia_mes.html', 'Heatmap Rodovia x Mês',
+                   colunas=['Mes', 'Rodovia'], entrada='cubo', agregacao=dados_13)
+def grafico_13(heatmaps):
+    from plotly.subplots import make_subplots
+
+    anos = list(heatmaps)
+    escalas = ['Blues', 'Greens', 'YlOrBr', 'Purples', 'Reds', 'Teal']
+
+    espacamento = 0.08
+    largura = (1 - espacamento * (len(anos) - 1)) / len(anos)
+    fig13 = make_subplots(
+        rows=1, cols=len(anos),
+        subplot_titles=[str(ano) for ano in anos],
+        specs=[[{'type':'heatmap'}] * len(anos)],
+        horizontal_spacing=espacamento
+    )
+
+    for i, (ano, heatmap_ano) in enumerate(heatmaps.items()):
+        # Barra de cores na borda direita do respectivo subplot
+        x_barra = round(i * (largura + espacamento) + largura, 2)
+        fig13.add_trace(
+            go.Heatmap(z=heatmap_ano.values if len(heatmap_ano) > 0 else [[0]],
+                       x=heatmap_ano.columns if len(heatmap_ano.columns) > 0 else ['Jan'],
+                       y=heatmap_ano.index if len(heatmap_ano) > 0 else [''],
+                       colorscale=escalas[i % len(escalas)], name=str(ano),
+                       colorbar=dict(x=x_barra, len=0.8, thickness=10)),
+            row=1, col=i + 1
+        )
+        fig13.update_xaxes(title_text='Mês', row=1, col=i + 1, tickfont=dict(size=7), tickangle=-45)
+    fig13.update_yaxes(title_text='Rodovia', row=1, col=1, tickfont=dict(size=7))
+    for col in range(2, len(anos) + 1):
+        fig13.update_yaxes(tickfont=dict(size=7), row=1, col=col)
+    fig13.update_layout(
+        title_text='<b>Heatmap: Acidentes por Rodovia e Mês (Top 15 Rodovias)</b>',
+        height=550,
+        font=dict(size=8),
+        margin=dict(l=80, r=30, t=60, b=80)
+    )
+    return fig13
+
+
+if __name__ == '__main__':
+    print("Gerando gráficos avançados...")
+    gerar_graficos(modulo=__name__)
+    print("\n✓ 6 gráficos avançados gerados com sucesso!")
@@ -0,0 +1,105 @@
+"""
+Gráficos 30 em diante: trechos críticos ao longo das rodovias (Rodovia x Km)
+"""
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+from densidade_km import BANDA_KM, COLUNAS_DENSIDADE, densidades, picos
+from indice_km import COLUNAS_INDICE_KM, IndiceKm
+from motor_graficos import gerar_graficos, registrar_grafico, rotulo_anos
+
+# ===== GRÁFICO 30: TRECHOS CRÍTICOS (JANELAS DE 1 KM) =====
+# Comprimento das janelas do gráfico 30, em km
+COMPRIMENTO_TRECHO = 1.0
+
+
+def dados_30(df):
+    anos = sorted(df['Ano'].unique())
+    # Busca exaustiva das janelas de 1 km no índice (Rodovia, Km), sem sobreposição
+    return anos, IndiceKm(df).top_trechos(k=20, comprimento=COMPRIMENTO_TRECHO)
+
+
+@registrar_grafico('30', '30_trechos_criticos.html', 'Trechos Críticos por Km',
+                   colunas=COLUNAS_INDICE_KM, agregacao=dados_30)
+def grafico_30(trechos):
+    anos, top_trechos = trechos
+    comprimento = COMPRIMENTO_TRECHO
+    # Maior índice no topo do gráfico
+    top_trechos = top_trechos.iloc[::-1]
+    rotulos = [f"{linha.Rodovia} km {linha.Km_Inicio:.1f}–{linha.Km_Fim:.1f}"
+               for linha in top_trechos.itertuples()]
+
+    fig30 = go.Figure()
+    fig30.add_trace(go.Bar(
+        x=top_trechos['Peso'],
+        y=rotulos,
+        orientation='h',
+        marker=dict(
+            color=top_trechos['Fatal'],
+            colorscale='Reds',
+            showscale=True,
+            colorbar=dict(title="Vítimas<br>Fatais")
+        ),
+        customdata=top_trechos[['Acidentes', 'Grave', 'Fatal']].to_numpy(),
+        hovertemplate=('%{y}<br>Índice: %{x}<br>Acidentes: %{customdata[0]}'
+                       '<br>Graves: %{customdata[1]}<br>Fatais: %{customdata[2]}<extra></extra>'),
+        text=[f"{int(v)}" for v in top_trechos['Peso']],
+        textposition='outside'
+    ))
+    fig30.update_layout(
+        title=f'<b>Top 20 Trechos Críticos de {comprimento:g} km (Índice Composto, {rotulo_anos(anos)})</b>',
+        xaxis_title='Índice de Periculosidade (acidentes + 5×graves + 20×fatais)',
+        yaxis_title='Trecho',
+        yaxis=dict(type='category'),
+        template='plotly_white',
+        font=dict(size=10),
+        height=700
+    )
+    return fig30
+
+
+# ===== GRÁFICO 31: DENSIDADE DE ACIDENTES AO LONGO DO KM (KDE) =====
+def dados_31(df):
+    anos = sorted(df['Ano'].unique())
+    # As 6 rodovias com os picos de densidade ponderada mais intensos
+    todos_picos = picos(df, n_por_rodovia=3)
+    rodovias = list(todos_picos.drop_duplicates('Rodovia')['Rodovia'].head(6))
+    return anos, rodovias, densidades(df, rodovias=rodovias), todos_picos
+
+
+@registrar_grafico('31', '31_densidade_kde_km.html', 'Densidade de Acidentes ao Longo do Km',
+                   colunas=COLUNAS_DENSIDADE, agregacao=dados_31)
+def grafico_31(densidade_km):
+    anos, rodovias, curvas, todos_picos = densidade_km
+    cores = qualitative.Set1
+
+    fig31 = go.Figure()
+    for i, rodovia in enumerate(rodovias):
+        grade, densidade = curvas[rodovia]
+        cor = cores[i % len(cores)]
+        fig31.add_trace(go.Scatter(
+            x=grade, y=densidade, mode='lines', name=rodovia, legendgroup=rodovia,
+            line=dict(color=cor, width=1.5),
+            hovertemplate=f'{rodovia}<br>Km %{{x:.1f}}<br>Intensidade: %{{y:.1f}}<extra></extra>'
+        ))
+        picos_rodovia = todos_picos[todos_picos['Rodovia'] == rodovia]
+        fig31.add_trace(go.Scatter(
+            x=picos_rodovia['Km'], y=picos_rodovia['Intensidade'], mode='markers',
+            name=f'{rodovia} (picos)', legendgroup=rodovia, showlegend=False,
+            marker=dict(color=cor, size=9, symbol='triangle-down', line=dict(color='black', width=1)),
+            hovertemplate=f'Pico {rodovia}<br>Km %{{x:.1f}}<br>Intensidade: %{{y:.1f}}<extra></extra>'
+        ))
+    fig31.update_layout(
+        title=f'<b>Densidade de Acidentes ao Longo do Km - Rodovias com Maiores Picos ({rotulo_anos(anos)})</b>',
+        xaxis_title='Km',
+        yaxis_title=f'Intensidade (índice de periculosidade por km, banda {BANDA_KM:g} km)',
+        hovermode='closest',
+        template='plotly_white',
+        height=600
+    )
+    return fig31
+
+
+if __name__ == '__main__':
+    print("Gerando análises de trechos críticos...")
+    gerar_graficos(modulo=__name__)
+    print("\n✓ Gráficos de trechos críticos gerados com sucesso!")
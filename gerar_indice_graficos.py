@@ -99,9 +99,9 @@ graficos = {
         },
         "26_tendencia_variacao_mensal.html": {
             "titulo": "Taxa de Variação Mensal",
-            "descricao": "Percentual de variação de acidentes 2025 vs 2023",
+            "descricao": "Variação de acidentes de cada mês em relação ao mesmo mês do ano anterior",
             "tipo": "Bar Chart",
-            "variaveis": ["Período", "Variação %"]
+            "variaveis": ["Mês", "Variação %"]
         }
     },
     
@@ -195,6 +195,18 @@ graficos = {
             "descricao": "Comparação entre crescente e decrescente",
             "tipo": "Pie Chart",
             "variaveis": ["Sentido", "Percentual"]
+        },
+        "30_trechos_criticos.html": {
+            "titulo": "Top 20 Trechos Críticos de 1 km",
+            "descricao": "Janelas de 1 km com maior índice composto (acidentes + 5×graves + 20×fatais), sem sobreposição",
+            "tipo": "Horizontal Bar Chart",
+            "variaveis": ["Rodovia", "Km", "Índice", "Fatais"]
+        },
+        "31_densidade_kde_km.html": {
+            "titulo": "Densidade de Acidentes ao Longo do Km",
+            "descricao": "Densidade por núcleo gaussiano ponderada pela severidade, com os picos das rodovias mais críticas",
+            "tipo": "Line Chart",
+            "variaveis": ["Rodovia", "Km", "Intensidade"]
         }
     }
 }
@@ -1,10 +1,33 @@
-import pandas as pd
-import numpy as np
-
-# Carregar dados
-df_total = pd.read_csv('dados_completos.csv')
-df_total['Data Abertura'] = pd.to_datetime(df_total['Data Abertura'], errors='coerce')
-df = df_total[df_total['Ano'].isin([2023, 2025])].copy()
+import sys
+
+from armazenamento import CAMINHO_DADOS, anos_disponiveis
+from cache_graficos import graficos_registrados
+from consulta import consultar
+from colunas_derivadas import MESES_NOME
+
+# O relatório compara o primeiro e o último ano presentes no dataset
+anos = anos_disponiveis()
+if not anos:
+    sys.exit(f"⚠ Nenhum ano consolidado em {CAMINHO_DADOS}/ - execute consolidar_dados.py antes")
+ANO_INICIAL, ANO_FINAL = anos[0], anos[-1]
+
+# Carregar dados do dataset Parquet (apenas colunas e anos do relatório)
+COLUNAS = ['Evento', 'Rodovia', 'Tipo Acidente', 'Regional', 'Mes', 'Km',
+           'Leve', 'Grave', 'Fatal', 'Total de Vítimas']
+df = consultar(colunas=COLUNAS, anos=[ANO_INICIAL, ANO_FINAL])
+
+# Totais e estatísticas de cada ano em uma única passada agrupada
+por_ano = df.groupby('Ano').agg(
+    Acidentes=('Ano', 'size'),
+    Leve=('Leve', 'sum'),
+    Grave=('Grave', 'sum'),
+    Fatal=('Fatal', 'sum'),
+    Vitimas=('Total de Vítimas', 'sum'),
+    Media_Vitimas=('Total de Vítimas', 'mean'),
+    Mediana_Vitimas=('Total de Vítimas', 'median'),
+)
+inicial = por_ano.loc[ANO_INICIAL]
+final = por_ano.loc[ANO_FINAL]
 
 print("\n" + "="*80)
 print(" "*20 + "RELATÓRIO DETALHADO - ANÁLISE ACIDENTES DER")
@@ -13,39 +36,24 @@ print("="*80 + "\n")
 # SEÇÃO 1: RESUMO GERAL
 print("\n📊 SEÇÃO 1: RESUMO GERAL DE DADOS\n")
 print(f"Total de Acidentes Analisados: {len(df):,}")
-print(f"Acidentes 2023: {len(df[df['Ano']==2023]):,}")
-print(f"Acidentes 2025: {len(df[df['Ano']==2025]):,}")
-print(f"Variação: {((len(df[df['Ano']==2025]) - len(df[df['Ano']==2023])) / len(df[df['Ano']==2023]) * 100):.1f}%")
+print(f"Acidentes {ANO_INICIAL}: {int(inicial['Acidentes']):,}")
+print(f"Acidentes {ANO_FINAL}: {int(final['Acidentes']):,}")
+print(f"Variação: {((final['Acidentes'] - inicial['Acidentes']) / inicial['Acidentes'] * 100):.1f}%")
 print(f"\nTotal de Vítimas: {int(df['Total de Vítimas'].sum()):,}")
-print(f"Vítimas 2023: {int(df[df['Ano']==2023]['Total de Vítimas'].sum()):,}")
-print(f"Vítimas 2025: {int(df[df['Ano']==2025]['Total de Vítimas'].sum()):,}")
+print(f"Vítimas {ANO_INICIAL}: {int(inicial['Vitimas']):,}")
+print(f"Vítimas {ANO_FINAL}: {int(final['Vitimas']):,}")
 
 # SEÇÃO 2: ANÁLISE DE VÍTIMAS
 print("\n\n👥 SEÇÃO 2: ANÁLISE DETALHADA DE VÍTIMAS\n")
 
-vitimas_por_categoria = {
-    'Leve': int(df['Leve'].sum()),
-    'Grave': int(df['Grave'].sum()),
-    'Fatal': int(df['Fatal'].sum())
-}
-
-vitimas_2023 = {
-    'Leve': int(df[df['Ano']==2023]['Leve'].sum()),
-    'Grave': int(df[df['Ano']==2023]['Grave'].sum()),
-    'Fatal': int(df[df['Ano']==2023]['Fatal'].sum())
-}
-
-vitimas_2025 = {
-    'Leve': int(df[df['Ano']==2025]['Leve'].sum()),
-    'Grave': int(df[df['Ano']==2025]['Grave'].sum()),
-    'Fatal': int(df[df['Ano']==2025]['Fatal'].sum())
-}
+vitimas_inicial = {categoria: int(inicial[categoria]) for categoria in ['Leve', 'Grave', 'Fatal']}
+vitimas_final = {categoria: int(final[categoria]) for categoria in ['Leve', 'Grave', 'Fatal']}
 
 for categoria in ['Leve', 'Grave', 'Fatal']:
-    var = ((vitimas_2025[categoria] - vitimas_2023[categoria]) / vitimas_2023[categoria] * 100)
+    var = ((vitimas_final[categoria] - vitimas_inicial[categoria]) / vitimas_inicial[categoria] * 100)
     print(f"{categoria}:")
-    print(f"  2023: {vitimas_2023[categoria]:,}")
-    print(f"  2025: {vitimas_2025[categoria]:,}")
+    print(f"  {ANO_INICIAL}: {vitimas_inicial[categoria]:,}")
+    print(f"  {ANO_FINAL}: {vitimas_final[categoria]:,}")
     print(f"  Variação: {var:+.1f}%\n")
 
 # SEÇÃO 3: RODOVIAS
@@ -69,38 +77,35 @@ for idx, (tipo, quantidade) in enumerate(tipos_total.items(), 1):
 # SEÇÃO 5: REGIÕES
 print("\n\n📍 SEÇÃO 5: ANÁLISE POR REGIONAL\n")
 
-regioes = df['Regional'].value_counts()
+regioes = df['Regional'].value_counts().loc[lambda s: s > 0]
+vitimas_regional = df.groupby('Regional', observed=True)['Total de Vítimas'].sum()
 print("Acidentes por Regional:\n")
 for regional, quantidade in regioes.items():
     pct = (quantidade / len(df) * 100)
-    vitimas = df[df['Regional']==regional]['Total de Vítimas'].sum()
+    vitimas = vitimas_regional[regional]
     print(f"{regional:25s} - {quantidade:5d} acidentes ({pct:5.1f}%) - {int(vitimas):5d} vítimas")
 
 # SEÇÃO 6: ANÁLISE TEMPORAL
 print("\n\n📅 SEÇÃO 6: ANÁLISE TEMPORAL\n")
 
-df['Mes'] = df['Data Abertura'].dt.month
-meses_pt = {1:'Janeiro', 2:'Fevereiro', 3:'Março', 4:'Abril', 5:'Maio', 6:'Junho',
-            7:'Julho', 8:'Agosto', 9:'Setembro', 10:'Outubro', 11:'Novembro', 12:'Dezembro'}
-
 acidentes_mes = df.groupby('Mes').size()
 print("Distribuição de Acidentes por Mês:\n")
 for mes in range(1, 13):
     if mes in acidentes_mes.index:
         qtd = acidentes_mes[mes]
         pct = (qtd / len(df) * 100)
-        print(f"{meses_pt[mes]:12s} - {qtd:5d} acidentes ({pct:5.1f}%)")
+        print(f"{MESES_NOME[mes - 1]:12s} - {qtd:5d} acidentes ({pct:5.1f}%)")
 
 # SEÇÃO 7: ANÁLISE DE SEVERIDADE
 print("\n\n⚠️  SEÇÃO 7: ANÁLISE DE SEVERIDADE\n")
 
 print("Estatísticas de Severidade:\n")
-print(f"Taxa de Mortalidade (2023):  {(vitimas_2023['Fatal'] / len(df[df['Ano']==2023]) * 100):.2f}%")
-print(f"Taxa de Mortalidade (2025):  {(vitimas_2025['Fatal'] / len(df[df['Ano']==2025]) * 100):.2f}%")
-print(f"\nMédia de Vítimas por Acidente (2023): {df[df['Ano']==2023]['Total de Vítimas'].mean():.2f}")
-print(f"Média de Vítimas por Acidente (2025): {df[df['Ano']==2025]['Total de Vítimas'].mean():.2f}")
-print(f"\nMédiana de Vítimas (2023): {df[df['Ano']==2023]['Total de Vítimas'].median():.0f}")
-print(f"Mediana de Vítimas (2025): {df[df['Ano']==2025]['Total de Vítimas'].median():.0f}")
+print(f"Taxa de Mortalidade ({ANO_INICIAL}):  {(vitimas_inicial['Fatal'] / inicial['Acidentes'] * 100):.2f}%")
+print(f"Taxa de Mortalidade ({ANO_FINAL}):  {(vitimas_final['Fatal'] / final['Acidentes'] * 100):.2f}%")
+print(f"\nMédia de Vítimas por Acidente ({ANO_INICIAL}): {inicial['Media_Vitimas']:.2f}")
+print(f"Média de Vítimas por Acidente ({ANO_FINAL}): {final['Media_Vitimas']:.2f}")
+print(f"\nMédiana de Vítimas ({ANO_INICIAL}): {inicial['Mediana_Vitimas']:.0f}")
+print(f"Mediana de Vítimas ({ANO_FINAL}): {final['Mediana_Vitimas']:.0f}")
 
 # SEÇÃO 8: CORRELAÇÕES
 print("\n\n🔗 SEÇÃO 8: CORRELAÇÕES ESTATÍSTICAS\n")
@@ -129,7 +134,7 @@ for col in cols_importantes:
 # SEÇÃO 10: ÍNDICES DE PERICULOSIDADE
 print("\n\n🚨 SEÇÃO 10: TOP 10 RODOVIAS MAIS PERIGOSAS (ÍNDICE COMPOSTO)\n")
 
-rodovia_stats = df.groupby('Rodovia').agg({
+rodovia_stats = df.groupby('Rodovia', observed=True).agg({
     'Evento': 'count',
     'Fatal': 'sum',
     'Grave': 'sum',
@@ -180,9 +185,9 @@ with open('RELATORIO_DETALHADO.txt', 'w', encoding='utf-8') as f:
     f.write(f"Data de Geração: 13 de Janeiro de 2026\n")
     f.write(f"Total de Acidentes: {len(df):,}\n")
     f.write(f"Total de Vítimas: {int(df['Total de Vítimas'].sum()):,}\n")
-    f.write(f"Períodos Analisados: 2023 e 2025\n\n")
+    f.write(f"Períodos Analisados: {ANO_INICIAL} e {ANO_FINAL}\n\n")
     f.write(f"Este documento contém análise exploratória completa de {len(df):,} acidentes,\n")
-    f.write(f"consolidados de 3 anos de dados (2023, 2024, 2025), com foco em 2023 e 2025.\n")
-    f.write(f"Total de 29 gráficos interativos foram gerados para visualização dos padrões.\n")
+    f.write(f"consolidados de {len(anos)} anos de dados ({', '.join(str(ano) for ano in anos)}), com foco em {ANO_INICIAL} e {ANO_FINAL}.\n")
+    f.write(f"Total de {len(graficos_registrados())} gráficos interativos foram gerados para visualização dos padrões.\n")
 
 print("✓ Relatório salvo em: RELATORIO_DETALHADO.txt")
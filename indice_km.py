@@ -0,0 +1,144 @@
+"""
+Índice espacial dos acidentes ao longo das rodovias (Rodovia, Km)
+
+Para cada rodovia, os km dos acidentes ficam em um array ordenado com as
+somas acumuladas de acidentes, graves, fatais e do peso de severidade (o
+índice do gráfico 20 por acidente: 1 + 5 x graves + 20 x fatais). Qualquer
+trecho [km_inicio, km_fim] é respondido com duas buscas binárias
+(np.searchsorted) e uma subtração, e a busca exaustiva de trechos críticos
+avalia uma janela por acidente em O(n log n) por rodovia, em vez de varrer
+todas as posições de todas as rodovias.
+
+Uso:
+    indice = IndiceKm(consultar(colunas=COLUNAS_INDICE_KM))
+    indice.contar('SP-055', 120, 125)
+    indice.top_trechos(k=20, comprimento=1.0)
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_INDICE_KM = ['Rodovia', 'Km', 'Grave', 'Fatal']
+
+# Pesos do índice de periculosidade (gráfico 20): acidente + 5 x graves + 20 x fatais
+PESO_ACIDENTE = 1
+PESO_GRAVE = 5
+PESO_FATAL = 20
+
+METRICAS_TRECHO = ['Acidentes', 'Grave', 'Fatal', 'Peso']
+
+
+def peso_severidade(grave, fatal):
+    """Peso de cada acidente no índice de periculosidade"""
+    return PESO_ACIDENTE + PESO_GRAVE * np.nan_to_num(grave) + PESO_FATAL * np.nan_to_num(fatal)
+
+
+class IndiceKm:
+    """Km ordenados e somas acumuladas por rodovia
+
+    `df` precisa das colunas COLUNAS_INDICE_KM; acidentes sem Km ou sem
+    rodovia ficam fora do índice.
+    """
+
+    def __init__(self, df):
+        dados = df[COLUNAS_INDICE_KM].dropna(subset=['Rodovia', 'Km'])
+        valores = pd.DataFrame({
+            'Rodovia': dados['Rodovia'].astype(str).to_numpy(),
+            'Km': dados['Km'].to_numpy(dtype='float64'),
+            'Acidentes': 1.0,
+            'Grave': np.nan_to_num(dados['Grave'].to_numpy(dtype='float64')),
+            'Fatal': np.nan_to_num(dados['Fatal'].to_numpy(dtype='float64')),
+        })
+        valores['Peso'] = peso_severidade(valores['Grave'], valores['Fatal'])
+        valores = valores.sort_values(['Rodovia', 'Km'], kind='stable')
+
+        self.km = {}
+        # Somas acumuladas com um zero à frente: soma de [i, j) = acum[j] - acum[i]
+        self.acumulados = {}
+        for rodovia, grupo in valores.groupby('Rodovia', sort=True):
+            self.km[rodovia] = grupo['Km'].to_numpy()
+            metricas = grupo[METRICAS_TRECHO].to_numpy()
+            self.acumulados[rodovia] = np.vstack([np.zeros(len(METRICAS_TRECHO)), np.cumsum(metricas, axis=0)])
+
+    @property
+    def rodovias(self):
+        return list(self.km)
+
+    def _limites(self, rodovia, km_inicio, km_fim):
+        km = self.km[rodovia]
+        return np.searchsorted(km, km_inicio, side='left'), np.searchsorted(km, km_fim, side='right')
+
+    def contar(self, rodovia, km_inicio, km_fim):
+        """Acidentes, graves, fatais e peso no trecho [km_inicio, km_fim] da rodovia"""
+        if rodovia not in self.km:
+            return dict.fromkeys(METRICAS_TRECHO, 0)
+        i, j = self._limites(rodovia, km_inicio, km_fim)
+        somas = self.acumulados[rodovia][j] - self.acumulados[rodovia][i]
+        return {metrica: int(round(valor)) for metrica, valor in zip(METRICAS_TRECHO, somas)}
+
+    def contar_trechos(self, rodovia, inicios, fins):
+        """Versão vetorizada de contar: arrays de inícios e fins de trechos"""
+        if rodovia not in self.km:
+            return pd.DataFrame(0, index=range(len(inicios)), columns=METRICAS_TRECHO)
+        i, j = self._limites(rodovia, np.asarray(inicios, dtype='float64'), np.asarray(fins, dtype='float64'))
+        somas = self.acumulados[rodovia][j] - self.acumulados[rodovia][i]
+        return pd.DataFrame(np.rint(somas).astype('int64'), columns=METRICAS_TRECHO)
+
+    def janelas(self, comprimento=1.0, rodovias=None):
+        """Todas as janelas candidatas de `comprimento` km
+
+        Cada acidente abre uma janela [km, km + comprimento]: toda janela de
+        máximo local começa em um acidente, então a busca é exaustiva sem
+        percorrer posições vazias. Devolve um DataFrame com Rodovia,
+        Km_Inicio, Km_Fim e as METRICAS_TRECHO de cada janela.
+        """
+        partes = []
+        for rodovia in (self.rodovias if rodovias is None else rodovias):
+            if rodovia not in self.km:
+                continue
+            inicios = np.unique(self.km[rodovia])
+            metricas = self.contar_trechos(rodovia, inicios, inicios + comprimento)
+            metricas.insert(0, 'Km_Fim', inicios + comprimento)
+            metricas.insert(0, 'Km_Inicio', inicios)
+            metricas.insert(0, 'Rodovia', rodovia)
+            partes.append(metricas)
+        if not partes:
+            return pd.DataFrame(columns=['Rodovia', 'Km_Inicio', 'Km_Fim'] + METRICAS_TRECHO)
+        return pd.concat(partes, ignore_index=True)
+
+    def top_trechos(self, k=20, comprimento=1.0, metrica='Peso', rodovias=None):
+        """Os `k` trechos de `comprimento` km com maior `metrica`, sem sobreposição
+
+        Seleção gulosa: a melhor janela de todas é escolhida e as janelas da
+        mesma rodovia que se sobrepõem a ela são descartadas, até `k` trechos.
+        As candidatas são ordenadas uma vez (np.lexsort) e cada uma é
+        comparada só com os vizinhos entre os trechos já escolhidos da
+        rodovia (busca binária nos inícios ordenados), em O(n log n).
+        """
+        candidatas = self.janelas(comprimento, rodovias)
+        rodovia = candidatas['Rodovia'].to_numpy()
+        inicios = candidatas['Km_Inicio'].to_numpy(dtype='float64')
+        fins = candidatas['Km_Fim'].to_numpy(dtype='float64')
+        # Maior métrica, depois mais acidentes, rodovia e km (a última chave é a principal)
+        ordem = np.lexsort((inicios, rodovia, -candidatas['Acidentes'].to_numpy(dtype='float64'),
+                            -candidatas[metrica].to_numpy(dtype='float64')))
+
+        escolhidos = []
+        # Por rodovia: inícios e fins dos trechos escolhidos, ordenados pelo início
+        # (trechos disjuntos, então os fins também ficam em ordem)
+        ocupados = {}
+        for posicao in ordem:
+            if len(escolhidos) == k:
+                break
+            inicio, fim = inicios[posicao], fins[posicao]
+            trechos_inicio, trechos_fim = ocupados.setdefault(rodovia[posicao], ([], []))
+            vizinho = bisect.bisect_right(trechos_inicio, inicio)
+            if vizinho > 0 and trechos_fim[vizinho - 1] >= inicio:
+                continue
+            if vizinho < len(trechos_inicio) and trechos_inicio[vizinho] <= fim:
+                continue
+            trechos_inicio.insert(vizinho, inicio)
+            trechos_fim.insert(vizinho, fim)
+            escolhidos.append(posicao)
+        return candidatas.iloc[escolhidos].reset_index(drop=True)
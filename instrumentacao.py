@@ -0,0 +1,225 @@
+"""
+Instrumentação das etapas do pipeline (tempo, CPU, memória e bytes)
+
+Desligada por padrão: `etapa()` não mede nada até `ativar()` (opção
+--profile de motor_graficos.py e consolidar_dados.py). Ativa, cada etapa
+registra o início e o tempo decorrido, o tempo de CPU do processo, o
+aumento do pico de memória residente (RSS) e, quando a etapa informa, os
+bytes produzidos. Etapas podem ser aninhadas (ex.: a derivação de cada bloco
+dentro da consolidação de uma planilha); o tempo da etapa externa inclui o
+das internas. O rastro é gravado em JSON e CSV.
+
+Com um perfilador ('cprofile' ou 'pyinstrument'), cada bloco `perfilar()`
+(um por gráfico) grava também o perfil completo em DIRETORIO_PERFIS:
+.prof do cProfile (abrir com `python -m pstats` ou snakeviz) ou .html do
+pyinstrument.
+
+`registrar_importacoes()` acrescenta ao rastro o tempo de importação de cada
+módulo, medido com `python -X importtime` em um processo limpo (no processo
+atual os módulos já estão importados).
+
+Uso:
+    ativar(perfilador='cprofile')
+    with etapa('carga') as registro:
+        df = consultar(...)
+        registro['bytes'] = int(df.memory_usage().sum())
+    salvar_rastro('rastro_graficos')
+"""
+import contextlib
+import cProfile
+import csv
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument é opcional; cProfile é da biblioteca padrão
+    pyinstrument = None
+
+PERFILADORES = ['cprofile', 'pyinstrument']
+DIRETORIO_PERFIS = 'perfis'
+
+# Importações mais rápidas que isso (tempo acumulado, ms) ficam fora do rastro
+MINIMO_IMPORTACAO_MS = 5.0
+
+# Linha de -X importtime: "import time:  próprio |  acumulado | [espaços]módulo" (em us)
+_LINHA_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+# Colunas fixas do CSV (os detalhes de cada etapa vêm depois)
+CAMPOS_RASTRO = ['etapa', 'nivel', 'inicio_s', 'parede_s', 'cpu_s', 'pico_rss_delta_mb', 'bytes']
+
+_rastro = None
+_perfilador = None
+_nivel = 0
+_origem = None
+
+
+def ativar(perfilador=None):
+    """Liga a instrumentação (e o perfil por gráfico, se `perfilador`)"""
+    global _rastro, _perfilador, _nivel, _origem
+    if perfilador is not None and perfilador not in PERFILADORES:
+        raise ValueError(f"Perfilador inválido: {perfilador} (use {', '.join(PERFILADORES)})")
+    if perfilador == 'pyinstrument' and pyinstrument is None:
+        raise ImportError("pyinstrument não instalado (pip install pyinstrument) - use 'cprofile'")
+    _rastro, _perfilador, _nivel, _origem = [], perfilador, 0, time.perf_counter()
+
+
+def ativo():
+    return _rastro is not None
+
+
+def registros():
+    """Registros das etapas já concluídas (lista vazia se desligada)"""
+    return list(_rastro or [])
+
+
+def pico_rss_mb():
+    """Pico de memória residente do processo até agora, em MB (None sem `resource`)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KB no Linux
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+@contextlib.contextmanager
+def etapa(nome, **detalhes):
+    """Mede o bloco como uma etapa
+
+    O dicionário devolvido é o registro da etapa: o bloco pode preencher
+    'bytes' (ou outros detalhes) antes de terminar.
+    """
+    global _nivel
+    registro = {'etapa': nome, **detalhes}
+    if _rastro is None:
+        yield registro
+        return
+    registro['nivel'] = _nivel
+    parede, cpu, pico = time.perf_counter(), time.process_time(), pico_rss_mb()
+    _nivel += 1
+    try:
+        yield registro
+    finally:
+        _nivel -= 1
+        registro['inicio_s'] = round(parede - _origem, 4)
+        registro['parede_s'] = round(time.perf_counter() - parede, 4)
+        registro['cpu_s'] = round(time.process_time() - cpu, 4)
+        if pico is not None:
+            registro['pico_rss_delta_mb'] = round(pico_rss_mb() - pico, 2)
+        _rastro.append(registro)
+
+
+@contextlib.contextmanager
+def perfilar(nome):
+    """Perfil completo do bloco com o perfilador ativo (nada, se nenhum)"""
+    if _perfilador is None:
+        yield
+        return
+    os.makedirs(DIRETORIO_PERFIS, exist_ok=True)
+    if _perfilador == 'pyinstrument':
+        perfil = pyinstrument.Profiler()
+        perfil.start()
+        try:
+            yield
+        finally:
+            perfil.stop()
+            with open(os.path.join(DIRETORIO_PERFIS, f'{nome}.html'), 'w', encoding='utf-8') as f:
+                f.write(perfil.output_html())
+        return
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        perfil.dump_stats(os.path.join(DIRETORIO_PERFIS, f'{nome}.prof'))
+
+
+def tempos_importacao(codigo, minimo_ms=MINIMO_IMPORTACAO_MS):
+    """Tempo de importação dos módulos que `codigo` importa, em um processo novo
+
+    Devolve uma lista de {'modulo', 'proprio_ms', 'acumulado_ms', 'nivel'} na
+    ordem em que as importações terminaram (dependências antes de quem as
+    importa), só com os módulos de tempo acumulado >= `minimo_ms`.
+    """
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo],
+                              capture_output=True, text=True, cwd=os.getcwd())
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao medir as importações: {processo.stderr.strip().splitlines()[-1:]}")
+    tempos = []
+    for linha in processo.stderr.splitlines():
+        casamento = _LINHA_IMPORTTIME.match(linha)
+        if casamento is None:
+            continue
+        proprio, acumulado, recuo, modulo = casamento.groups()
+        if int(acumulado) / 1000 < minimo_ms:
+            continue
+        tempos.append({'modulo': modulo, 'proprio_ms': round(int(proprio) / 1000, 2),
+                       'acumulado_ms': round(int(acumulado) / 1000, 2), 'nivel': len(recuo) // 2})
+    return tempos
+
+
+def registrar_importacoes(codigo, minimo_ms=MINIMO_IMPORTACAO_MS):
+    """Acrescenta ao rastro uma etapa 'importacao' por módulo importado por `codigo`
+
+    Como as importações se aninham, o tempo da etapa é o tempo próprio do
+    módulo (somado no resumo sem contar duas vezes); o acumulado fica em
+    'acumulado_ms'. Nada se a instrumentação está desligada. Uma falha na
+    medição é avisada e não interrompe a execução.
+    """
+    if _rastro is None:
+        return
+    try:
+        tempos = tempos_importacao(codigo, minimo_ms)
+    except (OSError, RuntimeError) as erro:
+        print(f"⚠ Tempo de importação não medido: {erro}")
+        return
+    for tempo in tempos:
+        proprio_s = round(tempo['proprio_ms'] / 1000, 4)
+        _rastro.append({'etapa': 'importacao', 'nivel': tempo['nivel'], 'inicio_s': 0.0,
+                        'parede_s': proprio_s, 'cpu_s': proprio_s,
+                        'modulo': tempo['modulo'], 'acumulado_ms': tempo['acumulado_ms']})
+
+
+def salvar_rastro(base):
+    """Grava o rastro em `base`.json e `base`.csv; devolve os dois caminhos"""
+    lista = registros()
+    caminho_json, caminho_csv = f'{base}.json', f'{base}.csv'
+    with open(caminho_json, 'w', encoding='utf-8') as f:
+        json.dump(lista, f, indent=2, ensure_ascii=False)
+    campos = list(CAMPOS_RASTRO)
+    for registro in lista:
+        campos.extend(c for c in registro if c not in campos)
+    with open(caminho_csv, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=campos)
+        escritor.writeheader()
+        escritor.writerows(lista)
+    return caminho_json, caminho_csv
+
+
+def imprimir_resumo(n=10):
+    """Tempo total por tipo de etapa e as `n` etapas mais lentas"""
+    lista = registros()
+    if not lista:
+        return
+    totais = {}
+    for registro in lista:
+        parede, cpu = totais.get(registro['etapa'], (0.0, 0.0))
+        totais[registro['etapa']] = (parede + registro['parede_s'], cpu + registro['cpu_s'])
+    print("\nTempo por etapa (parede / CPU):")
+    for nome, (parede, cpu) in sorted(totais.items(), key=lambda item: -item[1][0]):
+        print(f"  {nome:24s} {parede:8.2f}s {cpu:8.2f}s")
+    print(f"\n{n} etapas mais lentas:")
+    for registro in sorted(lista, key=lambda r: -r['parede_s'])[:n]:
+        detalhes = ', '.join(f"{k}={v}" for k, v in registro.items()
+                             if k not in CAMPOS_RASTRO and k != 'etapa')
+        print(f"  {registro['parede_s']:8.2f}s  {registro['etapa']}  {detalhes}")
@@ -0,0 +1,593 @@
+"""
+Motor de geração dos gráficos interativos
+
+Cada gráfico é uma função registrada com @registrar_grafico nos módulos
+gerar_graficos_1..6, com a sua agregação em uma função separada. O motor
+carrega os dados uma única vez (com as colunas derivadas já gravadas na
+consolidação, ver colunas_derivadas.py), monta o cubo agregado
+(cubo_agregado.py) e gera todos os gráficos (ou apenas os escolhidos) no
+mesmo processo. A agregação de cada gráfico recebe o cubo, o calendário
+diário (serie_temporal.py) ou, se precisa de valores individuais
+(distribuições), as linhas; a figura é montada a partir do resultado.
+
+Uso:
+    python motor_graficos.py              # todos os gráficos
+    python motor_graficos.py 01 13 20     # apenas os gráficos indicados
+    python motor_graficos.py --listar
+    python motor_graficos.py --processos 8   # renderização em paralelo
+    python motor_graficos.py --plotlyjs inline   # páginas autocontidas (offline)
+    python motor_graficos.py --formato json --comprimir gz br   # JSON + painel.html
+    python motor_graficos.py --forcar     # ignora o cache e redesenha tudo
+    python motor_graficos.py --banco      # cubo, calendário e distribuições agregados no banco DuckDB/SQLite
+    python motor_graficos.py --profile --forcar   # rastro por etapa em rastro_graficos.json/.csv
+    python motor_graficos.py --profile --perfil-graficos cprofile 13   # + perfis/grafico_13.prof
+
+Gráficos cujas entradas e código (inclusive o dos módulos do projeto que
+usam) não mudaram desde a última execução não são redesenhados (ver
+cache_graficos.py).
+
+Importações pesadas usadas por poucos gráficos (plotly.subplots) ou só por
+algumas opções (banco analítico) ficam dentro das funções que as usam, para
+que gerar um único gráfico ou listar os gráficos não pague por elas. Com
+--profile, o rastro inclui o tempo de importação de cada módulo
+(python -X importtime).
+"""
+import argparse
+import html
+import importlib
+import multiprocessing
+import os
+import time
+import warnings
+
+import plotly.io as pio
+import plotly.offline
+
+try:
+    import brotli
+except ImportError:  # compressão .br é opcional
+    brotli = None
+
+import cubo_agregado
+import serie_temporal
+from ativos_estaticos import gravar_comprimidos, minificar_html
+from consulta import consultar
+from cache_graficos import (MODULOS_GRAFICOS, carregar_manifesto_graficos, chave_grafico, em_cache,
+                            hash_dependencias, impressoes_entradas, podar_versionados, registrar_saida,
+                            salvar_manifesto_graficos)
+from instrumentacao import (PERFILADORES, ativar, etapa, imprimir_resumo, perfilar, registrar_importacoes,
+                            salvar_rastro)
+warnings.filterwarnings('ignore')
+
+# Anos incluídos na análise (None = todos os anos presentes no dataset)
+ANOS_ANALISE = None
+
+# Paleta de cores Sigma-PLI (azul institucional, verde, amarelo)
+CORES_SIGMA = ['#1E3A5F', '#2E7D32', '#F9A825']  # Azul, Verde, Amarelo
+# Cores das séries de anos além dos três primeiros
+CORES_EXTRAS = ['#6A1B9A', '#C62828', '#00838F', '#6D4C41']
+
+# Como as páginas carregam o plotly.js:
+#   'local'  - um único plotly-<versão>.min.js gravado junto aos gráficos (padrão)
+#   'cdn'    - a mesma versão servida pelo CDN do Plotly
+#   'inline' - biblioteca embutida em cada página (pacote offline, sem servidor)
+MODOS_PLOTLYJS = ['local', 'cdn', 'inline']
+VERSAO_PLOTLYJS = plotly.offline.get_plotlyjs_version()
+ARQUIVO_PLOTLYJS = f'plotly-{VERSAO_PLOTLYJS}.min.js'
+
+# Formatos de saída: 'html' (uma página por gráfico) ou 'json' (apenas dados
+# e layout em DIRETORIO_JSON, exibidos pelo painel único CAMINHO_PAINEL)
+FORMATOS_SAIDA = ['html', 'json']
+DIRETORIO_JSON = 'graficos'
+CAMINHO_PAINEL = 'painel.html'
+COMPRESSOES = ['gz', 'br']
+
+# Rastro das etapas gravado com --profile (.json e .csv)
+RASTRO_GRAFICOS = 'rastro_graficos'
+
+# Registro: número do gráfico ('01', '02', ...) -> definição
+GRAFICOS = {}
+
+
+class Grafico:
+    """Definição de um gráfico registrado"""
+
+    def __init__(self, numero, arquivo, titulo, colunas, entrada, funcao, agregacao=None, agregacao_banco=None):
+        self.numero = numero
+        self.arquivo = arquivo
+        self.titulo = titulo
+        self.colunas = list(colunas)
+        self.entrada = entrada
+        self.funcao = funcao
+        self.agregacao = agregacao
+        self.agregacao_banco = agregacao_banco
+        self.modulo = funcao.__module__
+
+    def agregar(self, entradas):
+        """Dados do gráfico a partir das entradas do motor (a própria entrada,
+        se o gráfico não tem função de agregação; os dados já agregados no
+        banco, se preparar_dados os calculou)"""
+        if self.numero in entradas.get('banco', {}):
+            return entradas['banco'][self.numero]
+        entrada = entradas[self.entrada]
+        return entrada if self.agregacao is None else self.agregacao(entrada)
+
+
+def registrar_grafico(numero, arquivo, titulo, colunas, entrada='linhas', agregacao=None, agregacao_banco=None):
+    """Decorador que registra a função geradora de um gráfico
+
+    `agregacao` recebe a entrada indicada ('cubo' = cubo agregado,
+    'calendario' = calendário diário de serie_temporal, 'linhas' = DataFrame
+    de acidentes já derivado) e devolve os dados do gráfico; a função
+    decorada recebe esses dados e devolve a figura. As duas etapas são
+    medidas separadamente com --profile. `colunas` lista as colunas do
+    dataset que o gráfico utiliza. `agregacao_banco` (gráficos de linhas)
+    devolve os mesmos dados consultando o banco analítico: recebe os
+    argumentos das consultas de banco_analitico (anos, caminho_banco) e é
+    usada com --banco, no lugar de carregar as linhas.
+    """
+    def decorador(funcao):
+        GRAFICOS[numero] = Grafico(numero, arquivo, titulo, colunas, entrada, funcao, agregacao, agregacao_banco)
+        return funcao
+    return decorador
+
+
+def ajustar_layout(fig):
+    """Configurar para ser responsivo"""
+    fig.update_layout(
+        autosize=True,
+        margin=dict(l=50, r=50, t=80, b=150, autoexpand=True)
+    )
+
+
+def escrever_plotlyjs(diretorio='.'):
+    """Grava o plotly.min.js versionado compartilhado pelos gráficos
+    (apenas se ainda não existe) e devolve o caminho"""
+    caminho = os.path.join(diretorio, ARQUIVO_PLOTLYJS)
+    if not os.path.exists(caminho):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(plotly.offline.get_plotlyjs())
+    return caminho
+
+
+def tag_plotlyjs(plotlyjs='local'):
+    """Tag <script> única que carrega o plotly.js no <head> da página"""
+    if plotlyjs == 'local':
+        src = ARQUIVO_PLOTLYJS
+    elif plotlyjs == 'cdn':
+        src = f'https://cdn.plot.ly/{ARQUIVO_PLOTLYJS}'
+    else:
+        # 'inline': a biblioteca vem embutida no corpo pelo to_html
+        return ''
+    return f'<script src="{src}" charset="utf-8"></script>'
+
+
+# Função para salvar gráfico com HTML acessível
+def salvar_grafico_acessivel(fig, filename, titulo, plotlyjs='local', compressoes=()):
+    """Salva o gráfico com HTML completo (minificado) e tags de acessibilidade
+
+    O plotly.js é referenciado uma única vez por página (ver MODOS_PLOTLYJS).
+    Com `compressoes` grava também as versões pré-comprimidas (.gz, .br).
+    """
+    if plotlyjs not in MODOS_PLOTLYJS:
+        raise ValueError(f"Modo de plotly.js inválido: {plotlyjs} (use {', '.join(MODOS_PLOTLYJS)})")
+    with etapa('serializacao', arquivo=filename):
+        conteudo = _pagina_grafico(fig, titulo, plotlyjs).encode('utf-8')
+    with etapa('gravacao', arquivo=filename) as registro:
+        with open(filename, 'wb') as f:
+            f.write(conteudo)
+        registro['bytes'] = len(conteudo)
+    gravar_comprimidos(filename, conteudo, compressoes)
+
+
+def _pagina_grafico(fig, titulo, plotlyjs):
+    """Página HTML completa do gráfico"""
+    ajustar_layout(fig)
+    html_content = fig.to_html(include_plotlyjs=(plotlyjs == 'inline'), full_html=False,
+                               config={'responsive': True})
+    return minificar_html(f'''<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{titulo} - Análise de Acidentes DER</title>
+    {tag_plotlyjs(plotlyjs)}
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        html, body {{ width: 100%; height: 100%; overflow: hidden; }}
+        .plotly-graph-div {{ width: 100% !important; height: 100% !important; }}
+        .js-plotly-plot {{ width: 100% !important; height: 100% !important; }}
+    </style>
+</head>
+<body>
+{html_content}
+</body>
+</html>''')
+
+
+def cor_ano(indice):
+    """Cor da série do `indice`-ésimo ano (paleta Sigma-PLI, depois as extras)"""
+    cores = CORES_SIGMA + CORES_EXTRAS
+    return cores[indice % len(cores)]
+
+
+def rotulo_anos(anos):
+    """Rótulo dos anos para os títulos (ex: '2023-2024-2025')"""
+    return '-'.join(str(ano) for ano in anos)
+
+
+def caminho_json(grafico):
+    """Arquivo JSON da figura (ex: graficos/01_total_acidentes_por_ano.json)"""
+    nome = os.path.splitext(grafico.arquivo)[0] + '.json'
+    return os.path.join(DIRETORIO_JSON, nome)
+
+
+def salvar_grafico_json(fig, caminho, compressoes=()):
+    """Salva apenas os dados e o layout da figura em JSON minificado
+
+    Com `compressoes` grava também as versões pré-comprimidas (.gz, .br)
+    ao lado do arquivo, para servidores que as entregam diretamente.
+    """
+    with etapa('serializacao', arquivo=caminho):
+        ajustar_layout(fig)
+        conteudo = pio.to_json(fig, validate=False, pretty=False).encode('utf-8')
+    with etapa('gravacao', arquivo=caminho) as registro:
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with open(caminho, 'wb') as f:
+            f.write(conteudo)
+        registro['bytes'] = len(conteudo)
+    gravar_comprimidos(caminho, conteudo, compressoes)
+
+
+def caminho_saida(grafico, formato='html'):
+    """Arquivo gravado para o gráfico no formato dado"""
+    return caminho_json(grafico) if formato == 'json' else grafico.arquivo
+
+
+def gerar_painel(graficos, caminho=CAMINHO_PAINEL, plotlyjs='local', manifesto=None, compressoes=()):
+    """Gera a página única que exibe os gráficos a partir dos arquivos JSON
+
+    A página carrega o plotly.js uma vez e só busca e desenha cada figura
+    quando ela se aproxima da área visível (IntersectionObserver). Com o
+    `manifesto` do cache, referencia as cópias versionadas dos JSON. Com
+    `compressoes`, grava também as versões pré-comprimidas da página.
+    """
+    manifesto = manifesto or {}
+    if plotlyjs == 'inline':
+        script_plotly = f'<script charset="utf-8">{plotly.offline.get_plotlyjs()}</script>'
+    else:
+        script_plotly = tag_plotlyjs(plotlyjs)
+    secoes = []
+    for grafico in graficos:
+        titulo = html.escape(grafico.titulo)
+        src = caminho_json(grafico)
+        src = manifesto.get(src, {}).get('versionado', src).replace(os.sep, '/')
+        secoes.append(f'''    <section class="grafico" id="grafico-{grafico.numero}">
+        <h2>{int(grafico.numero)}. {titulo}</h2>
+        <div class="figura" role="img" aria-label="{titulo}" data-src="{src}">Carregando…</div>
+    </section>''')
+    secoes_html = '\n'.join(secoes)
+    html_completo = minificar_html(f'''<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Painel de Gráficos - Análise de Acidentes DER</title>
+    {script_plotly}
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: #f4f6f8; padding: 20px; }}
+        h1 {{ color: #1E3A5F; text-align: center; margin-bottom: 20px; }}
+        .grafico {{ background: white; border-radius: 8px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+                    max-width: 1400px; margin: 0 auto 30px; padding: 20px; }}
+        .grafico h2 {{ color: #1E3A5F; font-size: 1.2em; margin-bottom: 10px; }}
+        .figura {{ width: 100%; min-height: 500px; color: #888; }}
+    </style>
+</head>
+<body>
+    <h1>📊 Análise Exploratória: Acidentes DER</h1>
+{secoes_html}
+    <script>
+        // Busca e desenha a figura quando ela se aproxima da área visível
+        async function hidratar(div) {{
+            try {{
+                const resposta = await fetch(div.dataset.src);
+                const figura = await resposta.json();
+                div.textContent = '';
+                await Plotly.newPlot(div, figura.data, figura.layout, {{responsive: true}});
+            }} catch (erro) {{
+                div.textContent = 'Não foi possível carregar o gráfico (' + div.dataset.src + ').';
+            }}
+        }}
+        const observador = new IntersectionObserver(function(entradas) {{
+            entradas.forEach(function(entrada) {{
+                if (entrada.isIntersecting) {{
+                    observador.unobserve(entrada.target);
+                    hidratar(entrada.target);
+                }}
+            }});
+        }}, {{rootMargin: '300px 0px'}});
+        document.querySelectorAll('.figura').forEach(function(div) {{ observador.observe(div); }});
+    </script>
+</body>
+</html>''')
+    # Regravar só se mudou, preservando o cache dos clientes
+    if not os.path.exists(caminho) or open(caminho, encoding='utf-8').read() != html_completo:
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(html_completo)
+        gravar_comprimidos(caminho, html_completo.encode('utf-8'), compressoes)
+    return caminho
+
+
+def carregar_registro():
+    """Importa os módulos de gráficos para preencher o registro"""
+    for modulo in MODULOS_GRAFICOS:
+        importlib.import_module(modulo)
+    return GRAFICOS
+
+
+def selecionar_graficos(numeros=None, modulo=None):
+    """Definições dos gráficos pedidos, em ordem numérica"""
+    if modulo is None:
+        carregar_registro()
+    if numeros:
+        numeros = [f"{int(n):02d}" for n in numeros]
+        desconhecidos = [n for n in numeros if n not in GRAFICOS]
+        if desconhecidos:
+            raise KeyError(f"Gráficos não registrados: {', '.join(desconhecidos)}")
+        selecionados = [GRAFICOS[n] for n in numeros]
+    else:
+        selecionados = [g for g in GRAFICOS.values() if modulo is None or g.modulo == modulo]
+    return sorted(selecionados, key=lambda g: g.numero)
+
+
+def _colunas(graficos):
+    colunas = []
+    for grafico in graficos:
+        colunas.extend(c for c in grafico.colunas if c not in colunas)
+    return colunas
+
+
+def _carregar_linhas(colunas, anos):
+    with etapa('carga') as registro:
+        df = consultar(colunas=colunas, anos=anos)
+        registro['registros'] = len(df)
+        registro['bytes'] = int(df.memory_usage().sum())
+    return df
+
+
+def preparar_dados(graficos, anos=ANOS_ANALISE, banco=False):
+    """Carrega uma vez as colunas usadas pelos gráficos e monta o cubo e o
+    calendário diário se algum gráfico os utiliza
+
+    O cubo e o calendário são buscados nos módulos a cada chamada, para que
+    o modo de observação (observar_graficos.py) use o código recarregado.
+    Com `banco`, o cubo, o calendário e os dados dos gráficos com
+    `agregacao_banco` são agregados no banco analítico (banco_analitico.py);
+    só os demais gráficos de linhas carregam linhas (apenas as suas
+    colunas). Devolve as entradas dos gráficos: {'linhas': df, 'cubo': cubo,
+    'calendario': calendario, 'banco': {numero: dados}}.
+    """
+    usam_cubo = [g for g in graficos if g.entrada == 'cubo']
+    usam_calendario = [g for g in graficos if g.entrada == 'calendario']
+    usam_linhas = [g for g in graficos if g.entrada == 'linhas']
+    entradas = {}
+    if not banco:
+        df = _carregar_linhas(_colunas(graficos), anos)
+        entradas['linhas'] = df
+        if usam_cubo:
+            with etapa('cubo'):
+                entradas['cubo'] = cubo_agregado.construir_cubo(df)
+        if usam_calendario:
+            with etapa('calendario'):
+                entradas['calendario'] = serie_temporal.calendario_diario(df)
+        return entradas
+
+    # Só com --banco: evita importar o DuckDB nas demais execuções
+    from banco_analitico import calendario_banco, construir_cubo_banco, criar_banco
+
+    usam_banco = [g for g in usam_linhas if g.agregacao_banco is not None]
+    usam_linhas = [g for g in usam_linhas if g.agregacao_banco is None]
+    if usam_linhas:
+        entradas['linhas'] = _carregar_linhas(_colunas(usam_linhas), anos)
+    if usam_cubo or usam_calendario or usam_banco:
+        caminho_banco = criar_banco()
+    if usam_banco:
+        entradas['banco'] = {}
+        for grafico in usam_banco:
+            with etapa('agregacao', grafico=grafico.numero, motor='banco'):
+                entradas['banco'][grafico.numero] = grafico.agregacao_banco(anos=anos, caminho_banco=caminho_banco)
+    if usam_calendario:
+        with etapa('calendario', motor='banco'):
+            entradas['calendario'] = calendario_banco(_colunas(usam_calendario), anos=anos,
+                                                      caminho_banco=caminho_banco)
+    if usam_cubo:
+        with etapa('cubo', motor='banco'):
+            entradas['cubo'] = construir_cubo_banco(_colunas(usam_cubo), anos=anos, caminho_banco=caminho_banco)
+    return entradas
+
+
+def versao_motor():
+    """Hash do código do motor e dos módulos do projeto que ele importa
+    (cubo, calendário, consulta, banco, template e minificação das páginas)
+    e da versão do Plotly"""
+    return hash_dependencias(__name__) + plotly.__version__
+
+
+def renderizar_grafico(grafico, entradas, plotlyjs='local', formato='html', compressoes=()):
+    """Gera e salva um gráfico; devolve o tempo gasto em segundos"""
+    inicio = time.perf_counter()
+    with perfilar(f'grafico_{grafico.numero}'), etapa('grafico', grafico=grafico.numero):
+        # Agregação a partir da entrada (roll-up do cubo, calendário ou linhas)
+        with etapa('agregacao', grafico=grafico.numero):
+            dados = grafico.agregar(entradas)
+        with etapa('figura', grafico=grafico.numero):
+            fig = grafico.funcao(dados)
+        if formato == 'json':
+            salvar_grafico_json(fig, caminho_json(grafico), compressoes)
+        else:
+            salvar_grafico_acessivel(fig, grafico.arquivo, grafico.titulo, plotlyjs, compressoes)
+    return time.perf_counter() - inicio
+
+
+# Entradas compartilhadas com os processos de trabalho. Com 'fork' elas são
+# herdadas do processo principal (sem serialização); com 'spawn' cada
+# processo carrega o dataset Parquet uma única vez no inicializador.
+_ENTRADAS_COMPARTILHADAS = None
+
+
+def _inicializar_trabalhador(numeros):
+    global _ENTRADAS_COMPARTILHADAS
+    if _ENTRADAS_COMPARTILHADAS is None:
+        _ENTRADAS_COMPARTILHADAS = preparar_dados(selecionar_graficos(numeros))
+
+
+def _renderizar_no_trabalhador(tarefa):
+    numero, opcoes = tarefa
+    return numero, renderizar_grafico(GRAFICOS[numero], _ENTRADAS_COMPARTILHADAS, **opcoes)
+
+
+def _renderizar_em_paralelo(graficos, entradas, processos, opcoes):
+    """Distribui os gráficos entre processos e devolve {numero: segundos}"""
+    global _ENTRADAS_COMPARTILHADAS
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context('fork' if 'fork' in metodos else 'spawn')
+    numeros = [g.numero for g in graficos]
+    _ENTRADAS_COMPARTILHADAS = entradas if contexto.get_start_method() == 'fork' else None
+    tempos = {}
+    try:
+        with contexto.Pool(processos, initializer=_inicializar_trabalhador, initargs=(numeros,)) as pool:
+            tarefas = [(numero, opcoes) for numero in numeros]
+            for numero, segundos in pool.imap_unordered(_renderizar_no_trabalhador, tarefas):
+                tempos[numero] = segundos
+                print(f"✓ Gráfico {int(numero)} salvo ({segundos:.2f}s)")
+    finally:
+        _ENTRADAS_COMPARTILHADAS = None
+    return tempos
+
+
+def gerar_graficos(numeros=None, modulo=None, entradas=None, processos=1, plotlyjs='local',
+                   formato='html', compressoes=(), forcar=False, banco=False):
+    """Gera e salva os gráficos selecionados reutilizando as mesmas entradas
+
+    Com processos > 1 os gráficos são renderizados em paralelo. `plotlyjs`
+    escolhe como as páginas carregam a biblioteca (ver MODOS_PLOTLYJS).
+    Com formato='json' grava só os dados de cada figura (com as
+    `compressoes` pedidas) e o painel único que os exibe. Gráficos em cache
+    (mesma chave no manifesto) são pulados, a menos que `forcar`.
+    Com `banco`, o cubo, o calendário e os gráficos com `agregacao_banco`
+    são agregados no banco analítico (ver preparar_dados).
+    Devolve {numero: segundos} com o tempo de cada gráfico redesenhado.
+    """
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS_SAIDA)})")
+    if 'br' in compressoes and brotli is None:
+        print("⚠ Módulo brotli não instalado: arquivos .br não serão gerados")
+    graficos = selecionar_graficos(numeros, modulo)
+    if entradas is None:
+        entradas = preparar_dados(graficos, banco=banco)
+    if plotlyjs == 'local':
+        escrever_plotlyjs()
+    opcoes = dict(plotlyjs=plotlyjs, formato=formato, compressoes=tuple(compressoes))
+
+    # Cache endereçado por conteúdo: pular gráficos cuja chave não mudou
+    manifesto = carregar_manifesto_graficos()
+    impressoes = impressoes_entradas(graficos, entradas)
+    versao = versao_motor()
+    chaves = {g.numero: chave_grafico(g, impressoes[g.numero], versao, opcoes) for g in graficos}
+    pendentes = []
+    for grafico in graficos:
+        if not forcar and em_cache(manifesto, caminho_saida(grafico, formato), chaves[grafico.numero]):
+            print(f"• Gráfico {int(grafico.numero)} inalterado (cache)")
+        else:
+            pendentes.append(grafico)
+
+    if processos > 1 and len(pendentes) > 1:
+        tempos = _renderizar_em_paralelo(pendentes, entradas, min(processos, len(pendentes)), opcoes)
+    else:
+        tempos = {}
+        for grafico in pendentes:
+            tempos[grafico.numero] = renderizar_grafico(grafico, entradas, **opcoes)
+            print(f"✓ Gráfico {int(grafico.numero)} salvo ({tempos[grafico.numero]:.2f}s)")
+
+    for grafico in pendentes:
+        registrar_saida(manifesto, caminho_saida(grafico, formato), chaves[grafico.numero])
+    podados = podar_versionados(manifesto)
+    if podados:
+        print(f"• {len(podados)} entradas/cópias versionadas obsoletas removidas")
+    salvar_manifesto_graficos(manifesto)
+
+    if formato == 'json':
+        # O painel lista todos os gráficos registrados, não só os regenerados
+        painel = gerar_painel(selecionar_graficos(), plotlyjs=plotlyjs, manifesto=manifesto,
+                              compressoes=compressoes)
+        print(f"✓ Painel salvo em {painel}")
+    return tempos
+
+
+def imprimir_tempos(tempos, total):
+    """Resumo dos tempos por gráfico, do mais lento ao mais rápido"""
+    print(f"\nTempo por gráfico (total {total:.2f}s):")
+    for numero, segundos in sorted(tempos.items(), key=lambda item: -item[1]):
+        grafico = GRAFICOS[numero]
+        print(f"  {numero}  {segundos:6.2f}s  {grafico.arquivo}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera os gráficos interativos de acidentes DER')
+    parser.add_argument('graficos', nargs='*', help='números dos gráficos (padrão: todos)')
+    parser.add_argument('--listar', action='store_true', help='lista os gráficos registrados')
+    parser.add_argument('-p', '--processos', type=int, default=1,
+                        help='número de processos de renderização (0 = todos os núcleos)')
+    parser.add_argument('--plotlyjs', choices=MODOS_PLOTLYJS, default='local',
+                        help='como as páginas carregam o plotly.js (padrão: arquivo local compartilhado; '
+                             'inline = pacote offline com páginas autocontidas)')
+    parser.add_argument('--formato', choices=FORMATOS_SAIDA, default='html',
+                        help=f'html = uma página por gráfico; json = figuras em {DIRETORIO_JSON}/ '
+                             f'exibidas por {CAMINHO_PAINEL}')
+    parser.add_argument('--comprimir', nargs='+', choices=COMPRESSOES, default=[],
+                        help='grava também versões pré-comprimidas das páginas ou dos JSON (.gz, .br)')
+    parser.add_argument('--forcar', action='store_true',
+                        help='redesenha todos os gráficos, ignorando o cache')
+    parser.add_argument('--banco', action='store_true',
+                        help='agrega o cubo, o calendário e as distribuições no banco analítico (DuckDB/SQLite) '
+                             'em vez do pandas')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'mede cada etapa (tempo, CPU, memória, bytes) e grava {RASTRO_GRAFICOS}.json/.csv '
+                             '(gráficos em cache não são medidos: use com --forcar)')
+    parser.add_argument('--perfil-graficos', choices=PERFILADORES,
+                        help='com --profile, grava também o perfil de cada gráfico em perfis/')
+    args = parser.parse_args(argv)
+    processos = args.processos or os.cpu_count() or 1
+    if args.perfil_graficos and not args.profile:
+        parser.error("--perfil-graficos requer --profile")
+    if args.profile:
+        ativar(args.perfil_graficos)
+        registrar_importacoes("import motor_graficos; motor_graficos.carregar_registro()")
+        if processos > 1:
+            print("⚠ --profile mede em um único processo: ignorando --processos")
+            processos = 1
+
+    if args.listar:
+        for grafico in selecionar_graficos():
+            print(f"{grafico.numero}  {grafico.arquivo:40s} {grafico.titulo}")
+        return
+
+    print("Gerando gráficos interativos...")
+    inicio = time.perf_counter()
+    tempos = gerar_graficos(args.graficos or None, processos=processos, plotlyjs=args.plotlyjs,
+                            formato=args.formato, compressoes=args.comprimir, forcar=args.forcar,
+                            banco=args.banco)
+    imprimir_tempos(tempos, time.perf_counter() - inicio)
+    print(f"\n✓ {len(tempos)} gráficos gerados com sucesso!")
+    if args.profile:
+        imprimir_resumo()
+        caminho_json_rastro, caminho_csv_rastro = salvar_rastro(RASTRO_GRAFICOS)
+        print(f"\n✓ Rastro salvo em {caminho_json_rastro} e {caminho_csv_rastro}")
+
+
+if __name__ == '__main__':
+    # Executar pelo módulo importável: os módulos de gráficos registram-se
+    # em motor_graficos.GRAFICOS, não em __main__.GRAFICOS
+    import motor_graficos
+    motor_graficos.main()
@@ -0,0 +1,225 @@
+"""
+Modo de observação: regenera os gráficos afetados a cada alteração
+
+Processo de longa duração que verifica periodicamente (pela data de
+modificação e tamanho) as planilhas de ESQUEMAS_FONTES, os módulos de
+gráficos (gerar_graficos_1..6) e os módulos de análise que eles usam. A cada
+alteração:
+  - planilha: consolida só o ano da planilha (consolidar_dados) e recarrega
+    o dataset; o cache de saída redesenha só os gráficos cujas colunas
+    (registradas em @registrar_grafico) mudaram
+  - módulo de gráficos: recarrega o módulo e regenera só os seus gráficos
+    (e, pelo cache, só aqueles cuja função ou código compartilhado mudou),
+    sem reler os dados
+  - módulo de análise (cubo, série temporal, pré-agregação, índice e
+    densidade por km): recarrega os módulos de análise e os de gráficos; o
+    cache, que inclui o código dos módulos importados, redesenha só os
+    gráficos que dependem do módulo alterado
+
+O dataset, o cubo e o calendário ficam em memória entre as reconstruções.
+Um erro (planilha ainda sendo gravada, erro de sintaxe no módulo) é
+mostrado e a observação continua. Alterações no esquema das planilhas ou nas
+colunas derivadas exigem rodar consolidar_dados.py de novo.
+
+Uso:
+    python observar_graficos.py
+    python observar_graficos.py --formato json --intervalo 2
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+
+from consolidar_dados import consolidar
+from esquema_fontes import ESQUEMAS_FONTES, arquivos_fonte
+from motor_graficos import (COMPRESSOES, FORMATOS_SAIDA, GRAFICOS, MODOS_PLOTLYJS, MODULOS_GRAFICOS,
+                            carregar_registro, gerar_graficos, preparar_dados, selecionar_graficos)
+
+# Módulos de análise usados pelos gráficos (recarregados quando alterados)
+MODULOS_COMPARTILHADOS = ['cubo_agregado', 'serie_temporal', 'pre_agregacao', 'indice_km', 'densidade_km']
+
+# Segundos entre duas verificações dos arquivos
+INTERVALO_OBSERVACAO = 1.0
+
+
+def assinatura(caminho):
+    """(mtime, tamanho) do arquivo, ou None se não existe"""
+    try:
+        st = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def arquivos_observados():
+    """{caminho: (tipo, alvo)}: ('planilha', ano), ('graficos', módulo) ou
+    ('compartilhado', módulo)"""
+    arquivos = {}
+    for ano in ESQUEMAS_FONTES:
+        try:
+            arquivos.update((arquivo, ('planilha', ano)) for arquivo in arquivos_fonte(ano))
+        except FileNotFoundError:
+            # Ano dividido em planilhas que ainda não existem
+            continue
+    for tipo, modulos in (('graficos', MODULOS_GRAFICOS), ('compartilhado', MODULOS_COMPARTILHADOS)):
+        for nome in modulos:
+            arquivos[f'{nome}.py'] = (tipo, nome)
+    return arquivos
+
+
+def recarregar_modulo_graficos(nome):
+    """Recarrega um módulo de gráficos e devolve os números dos seus gráficos
+
+    Os gráficos do módulo saem do registro antes de recarregar (um gráfico
+    removido do código deixa de ser gerado); se o módulo falhar ao carregar,
+    o registro anterior é restaurado.
+    """
+    anteriores = {numero: g for numero, g in GRAFICOS.items() if g.modulo == nome}
+    for numero in anteriores:
+        del GRAFICOS[numero]
+    try:
+        if nome in sys.modules:
+            importlib.reload(sys.modules[nome])
+        else:
+            importlib.import_module(nome)
+    except Exception:
+        GRAFICOS.update(anteriores)
+        raise
+    return sorted(numero for numero, g in GRAFICOS.items() if g.modulo == nome)
+
+
+class Observador:
+    """Estado do modo de observação: assinaturas dos arquivos e entradas em memória"""
+
+    def __init__(self, opcoes, intervalo=INTERVALO_OBSERVACAO):
+        self.opcoes = opcoes
+        self.intervalo = intervalo
+        self.arquivos = arquivos_observados()
+        self.assinaturas = {caminho: assinatura(caminho) for caminho in self.arquivos}
+        self.entradas = None
+
+    def carregar_dados(self):
+        inicio = time.perf_counter()
+        self.entradas = preparar_dados(selecionar_graficos())
+        print(f"• Dados carregados em memória ({len(self.entradas['linhas']):,} registros, "
+              f"{time.perf_counter() - inicio:.2f}s)")
+
+    def gerar(self, numeros=None):
+        inicio = time.perf_counter()
+        tempos = gerar_graficos(numeros, entradas=self.entradas, **self.opcoes)
+        print(f"✓ {len(tempos)} gráficos redesenhados em {time.perf_counter() - inicio:.2f}s")
+
+    def iniciar(self):
+        """Consolidação incremental, carga dos dados e geração inicial"""
+        consolidar()
+        self.carregar_dados()
+        self.gerar()
+
+    def alterados(self):
+        """Arquivos cuja assinatura mudou, esperando a gravação terminar
+
+        Um arquivo só é considerado quando a assinatura se repete em duas
+        verificações seguidas (o Excel grava a planilha em etapas). A lista é
+        refeita a cada verificação: uma planilha nova de um ano dividido em
+        várias (padrão glob em ESQUEMAS_FONTES) conta como alterada.
+        """
+        self.arquivos.update(arquivos_observados())
+        atuais = {caminho: assinatura(caminho) for caminho in self.arquivos}
+        mudaram = [c for c in self.arquivos if atuais[c] != self.assinaturas.get(c)]
+        if not mudaram:
+            return []
+        while True:
+            time.sleep(self.intervalo)
+            self.arquivos.update(arquivos_observados())
+            novas = {caminho: assinatura(caminho) for caminho in self.arquivos}
+            if novas == atuais:
+                break
+            mudaram = [c for c in self.arquivos if novas[c] != self.assinaturas.get(c)]
+            atuais = novas
+        self.assinaturas = atuais
+        # Módulo removido (ou renomeado pelo editor ao salvar): nada a fazer até
+        # reaparecer; planilha removida: o ano é consolidado sem ela
+        return [c for c in mudaram if atuais[c] is not None or self.arquivos[c][0] == 'planilha']
+
+    def processar(self, alterados):
+        """Reconstrói o que depende dos arquivos alterados"""
+        alvos = {}
+        for caminho in alterados:
+            tipo, alvo = self.arquivos[caminho]
+            alvos.setdefault(tipo, []).append(alvo)
+            print(f"\n• {caminho} alterado")
+
+        recarregar_dados = False
+        modulos = set(alvos.get('graficos', []))
+        if alvos.get('compartilhado'):
+            # Os módulos de análise importam nomes uns dos outros (na ordem de
+            # MODULOS_COMPARTILHADOS) e os de gráficos importam nomes deles:
+            # recarregar todos; a chave de cache de cada gráfico inclui o
+            # código dos módulos que ele usa, então só os afetados mudam
+            for nome in MODULOS_COMPARTILHADOS:
+                if nome in sys.modules:
+                    importlib.reload(sys.modules[nome])
+            modulos.update(MODULOS_GRAFICOS)
+            recarregar_dados = True
+
+        numeros = set()
+        for nome in sorted(modulos):
+            numeros.update(recarregar_modulo_graficos(nome))
+
+        anos = sorted(alvos.get('planilha', []))
+        if anos:
+            status = consolidar(anos=anos)
+            if 'processado' in status.values():
+                recarregar_dados = True
+                numeros = set(GRAFICOS)
+
+        # Um gráfico editado pode passar a usar uma coluna ainda não carregada
+        colunas = {c for g in GRAFICOS.values() for c in g.colunas}
+        if not colunas <= set(self.entradas['linhas'].columns):
+            recarregar_dados = True
+        if recarregar_dados:
+            self.carregar_dados()
+
+        if numeros:
+            self.gerar(sorted(numeros))
+
+    def executar(self):
+        print(f"\nObservando {len(self.arquivos)} arquivos (Ctrl+C para encerrar)...")
+        while True:
+            time.sleep(self.intervalo)
+            alterados = self.alterados()
+            if not alterados:
+                continue
+            try:
+                self.processar(alterados)
+            except Exception:
+                print(f"⚠ Erro ao reconstruir:\n{traceback.format_exc(limit=-3)}")
+            print("\nObservando...")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenera os gráficos afetados a cada alteração '
+                                                 'das planilhas ou do código')
+    parser.add_argument('--intervalo', type=float, default=INTERVALO_OBSERVACAO,
+                        help=f'segundos entre verificações (padrão: {INTERVALO_OBSERVACAO})')
+    parser.add_argument('--plotlyjs', choices=MODOS_PLOTLYJS, default='local',
+                        help='como as páginas carregam o plotly.js (padrão: local)')
+    parser.add_argument('--formato', choices=FORMATOS_SAIDA, default='html', help='formato de saída (padrão: html)')
+    parser.add_argument('--comprimir', nargs='+', choices=COMPRESSOES, default=[],
+                        help='com --formato json, grava também .gz/.br')
+    args = parser.parse_args()
+
+    carregar_registro()
+    observador = Observador(dict(plotlyjs=args.plotlyjs, formato=args.formato, compressoes=args.comprimir),
+                            args.intervalo)
+    observador.iniciar()
+    try:
+        observador.executar()
+    except KeyboardInterrupt:
+        print("\n✓ Observação encerrada")
+
+
+if __name__ == '__main__':
+    main()
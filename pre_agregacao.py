@@ -0,0 +1,205 @@
+"""
+Pré-agregação dos gráficos de distribuição (box plots, histogramas, dispersão)
+
+Em vez de embutir um valor por acidente no HTML, os gráficos 10, 12, 17 e 25
+recebem apenas estatísticas já calculadas: quartis, limites e outliers
+distintos de cada caixa, contagens por faixa dos histogramas e contagens por
+célula (km x vítimas) da dispersão. O tamanho dos arquivos passa a depender
+do número de grupos e faixas, não do número de acidentes.
+
+As funções *_contagens calculam o mesmo a partir de contagens de valores
+distintos (banco_analitico.contagens_banco), sem trazer as linhas do banco:
+quartis, percentis, bigodes, outliers e faixas saem iguais; média e desvio
+padrão, salvo arredondamento de ponto flutuante.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+def resumos_caixa(valores, grupos):
+    """Estatísticas de box plot de `valores` para cada grupo, em uma passada
+
+    `grupos` é uma Series ou lista de Series alinhadas a `valores`. Devolve
+    (resumo, outliers): um DataFrame indexado pelos grupos com q1, mediana,
+    q3, limite_inferior, limite_superior (bigodes a 1,5 x IQR, como no
+    Plotly), media e dp; e {grupo: valores distintos fora dos bigodes}.
+    """
+    valores = pd.Series(valores).astype('float64')
+    dados = pd.DataFrame({'valor': valores})
+    if isinstance(grupos, pd.Series):
+        grupos = [grupos]
+    chaves = []
+    for i, grupo in enumerate(grupos):
+        chave = grupo.name if grupo.name is not None else f'grupo_{i}'
+        dados[chave] = grupo.values
+        chaves.append(chave)
+    dados = dados.dropna(subset=['valor'])
+    agrupado = dados.groupby(chaves, observed=True, sort=True)['valor']
+
+    quartis = agrupado.quantile([0.25, 0.5, 0.75]).unstack()
+    resumo = pd.DataFrame({
+        'q1': quartis[0.25],
+        'mediana': quartis[0.5],
+        'q3': quartis[0.75],
+        'media': agrupado.mean(),
+        'dp': agrupado.std().fillna(0),
+    })
+
+    # Bigodes: menor e maior valor dentro de [q1 - 1,5 IQR, q3 + 1,5 IQR]
+    iqr = resumo['q3'] - resumo['q1']
+    cercas = pd.DataFrame({'baixo': resumo['q1'] - 1.5 * iqr, 'alto': resumo['q3'] + 1.5 * iqr})
+    dados = dados.join(cercas, on=chaves)
+    dentro = dados['valor'].between(dados['baixo'], dados['alto'])
+    internos = dados[dentro].groupby(chaves, observed=True)['valor']
+    resumo['limite_inferior'] = internos.min()
+    resumo['limite_superior'] = internos.max()
+
+    externos = dados[~dentro].groupby(chaves, observed=True)['valor'].unique()
+    outliers = {grupo: np.sort(vals) for grupo, vals in externos.items()}
+    return resumo, outliers
+
+
+def tracos_caixa(resumo, outliers, posicao, nome, cor, mostrar_legenda=True, **kwargs):
+    """Box plot pré-calculado (uma linha de `resumo`) e o traço dos outliers
+
+    Devolve a lista de traços: a caixa, com média e desvio padrão, e os
+    outliers distintos como marcadores na mesma posição.
+    """
+    tracos = [go.Box(
+        x=[posicao],
+        q1=[resumo['q1']],
+        median=[resumo['mediana']],
+        q3=[resumo['q3']],
+        lowerfence=[resumo['limite_inferior']],
+        upperfence=[resumo['limite_superior']],
+        mean=[resumo['media']],
+        sd=[resumo['dp']],
+        name=nome,
+        legendgroup=nome,
+        marker_color=cor,
+        showlegend=mostrar_legenda,
+        **kwargs
+    )]
+    if outliers is not None and len(outliers) > 0:
+        tracos.append(go.Scatter(
+            x=[posicao] * len(outliers),
+            y=outliers,
+            mode='markers',
+            name=nome,
+            legendgroup=nome,
+            marker=dict(color=cor, size=4, symbol='circle-open'),
+            showlegend=False,
+            hovertemplate='%{y}<extra>' + str(nome) + ' (outlier)</extra>'
+        ))
+    return tracos
+
+
+def histogramas(valores, grupos, bins=50):
+    """Contagens por faixa de `valores` para cada grupo, com faixas comuns
+
+    Devolve (bordas, {grupo: contagens}) calculados com np.histogram sobre
+    as mesmas bordas para todos os grupos.
+    """
+    validos = pd.DataFrame({'valor': valores, 'grupo': grupos}).dropna(subset=['valor'])
+    bordas = np.histogram_bin_edges(validos['valor'], bins=bins)
+    contagens = {}
+    for grupo, dados in validos.groupby('grupo', sort=True):
+        contagens[grupo], _ = np.histogram(dados['valor'], bins=bordas)
+    return bordas, contagens
+
+
+def contagens_celulas(x, y, grupos, largura_x):
+    """Contagem de pontos por célula (faixa de x de `largura_x` x valor de y)
+
+    Substitui a amostragem aleatória dos gráficos de dispersão: todos os
+    pontos entram na contagem. Devolve um DataFrame com grupo, x (centro da
+    faixa), y e Acidentes.
+    """
+    dados = pd.DataFrame({'grupo': grupos, 'x': x, 'y': y}).dropna()
+    dados['x'] = (np.floor(dados['x'] / largura_x) + 0.5) * largura_x
+    celulas = dados.groupby(['grupo', 'x', 'y'], sort=True).size().rename('Acidentes')
+    return celulas.reset_index()
+
+
+def _chaves_grupos(grupos, por):
+    """Índice dos grupos de um groupby por `por` (nível único se uma dimensão)"""
+    if len(por) == 1:
+        return pd.Index([g[0] for g in grupos], name=por[0])
+    return pd.MultiIndex.from_tuples(grupos, names=por)
+
+
+def _quantis_contagens(valores, contagens, quantis):
+    """Quantis com interpolação linear (como o quantile do pandas) dos
+    `valores` distintos e ordenados, cada um repetido `contagens` vezes"""
+    acumulado = np.cumsum(contagens)
+    posicoes = (acumulado[-1] - 1) * np.asarray(quantis, dtype='float64')
+    abaixo = np.floor(posicoes)
+    a = valores[np.searchsorted(acumulado, abaixo, side='right')]
+    b = valores[np.searchsorted(acumulado, np.minimum(abaixo + 1, acumulado[-1] - 1), side='right')]
+    return a + (b - a) * (posicoes - abaixo)
+
+
+def _grupos_contagens(contagens, valor, por):
+    """(grupo, valores distintos ordenados, contagens) de cada grupo de `por`"""
+    for grupo, dados in contagens.groupby(por, observed=True, sort=True):
+        dados = dados.sort_values(valor)
+        yield grupo, dados[valor].to_numpy(dtype='float64'), dados['Acidentes'].to_numpy()
+
+
+def resumos_caixa_contagens(contagens, valor, por):
+    """resumos_caixa a partir das contagens de cada valor distinto
+
+    `contagens` tem as colunas `por`, `valor` e Acidentes (linhas com cada
+    valor). Devolve (resumo, outliers) como resumos_caixa(linhas[valor],
+    [linhas[p] for p in por]).
+    """
+    por = [por] if isinstance(por, str) else list(por)
+    grupos, linhas, outliers = [], [], {}
+    for grupo, valores, n in _grupos_contagens(contagens, valor, por):
+        q1, mediana, q3 = _quantis_contagens(valores, n, [0.25, 0.5, 0.75])
+        total = n.sum()
+        media = (valores * n).sum() / total
+        dp = np.sqrt((n * (valores - media) ** 2).sum() / (total - 1)) if total > 1 else 0.0
+        dentro = (valores >= q1 - 1.5 * (q3 - q1)) & (valores <= q3 + 1.5 * (q3 - q1))
+        chave = grupo[0] if len(por) == 1 else grupo
+        grupos.append(grupo)
+        linhas.append([q1, mediana, q3, media, dp, valores[dentro].min(), valores[dentro].max()])
+        if not dentro.all():
+            outliers[chave] = valores[~dentro]
+    resumo = pd.DataFrame(linhas, index=_chaves_grupos(grupos, por),
+                          columns=['q1', 'mediana', 'q3', 'media', 'dp', 'limite_inferior', 'limite_superior'])
+    return resumo, outliers
+
+
+def quantis_contagens(contagens, valor, por, quantis):
+    """Quantis de `valor` por grupo (como groupby(por)[valor].quantile(quantis)
+    .unstack() nas linhas) a partir das contagens de cada valor distinto"""
+    por = [por] if isinstance(por, str) else list(por)
+    grupos, linhas = [], []
+    for grupo, valores, n in _grupos_contagens(contagens, valor, por):
+        grupos.append(grupo)
+        linhas.append(_quantis_contagens(valores, n, quantis))
+    return pd.DataFrame(linhas, index=_chaves_grupos(grupos, por), columns=list(quantis))
+
+
+def histogramas_contagens(contagens, valor, grupo, bins=50):
+    """histogramas a partir das contagens de cada valor distinto por grupo"""
+    bordas = np.histogram_bin_edges(contagens[valor], bins=bins)
+    resultado = {}
+    for chave, dados in contagens.groupby(grupo, observed=True, sort=True):
+        pesos, _ = np.histogram(dados[valor], bins=bordas, weights=dados['Acidentes'])
+        resultado[chave] = pesos.astype('int64')
+    return bordas, resultado
+
+
+def contagens_celulas_faixas(contagens, x, y, grupo, largura_x):
+    """contagens_celulas a partir das contagens por índice de faixa de x
+    (floor(x / largura_x)), valor de y e grupo"""
+    celulas = pd.DataFrame({
+        'grupo': contagens[grupo],
+        'x': (contagens[x] + 0.5) * largura_x,
+        'y': contagens[y],
+        'Acidentes': contagens['Acidentes'],
+    })
+    return celulas.sort_values(['grupo', 'x', 'y']).reset_index(drop=True)
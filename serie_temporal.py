@@ -0,0 +1,182 @@
+"""
+Séries temporais de acidentes a partir de um calendário diário denso
+
+O calendário é montado uma única vez a partir da Data Abertura: uma linha
+por dia de cada ano com registros (dias sem acidentes com zero; anos sem
+nenhum registro, como o de uma planilha ausente, ficam de fora), com a
+contagem de acidentes e as somas de vítimas, opcionalmente abertas por
+uma dimensão (rodovia, regional...). Sobre ele, tudo é vetorizado no
+pandas:
+  - reamostrar: dia, semana, mês, trimestre ou ano
+  - media_movel: média móvel em número de períodos
+  - variacao: variação em relação ao mesmo período do ano (ou mês, semana,
+    dia) anterior, alinhada pelo calendário e não pela posição
+  - indice_sazonal: índice sazonal de cada mês (100 = mês médio do ano)
+
+Períodos fora da cobertura do calendário ficam ausentes (e a variação sai
+nula), em vez de serem comparados com o mês errado.
+
+Uso:
+    python serie_temporal.py --frequencia semana --metrica Fatal --media-movel 4
+    python serie_temporal.py --rodovia SP-055 --variacao ano
+
+    from serie_temporal import calendario_diario, reamostrar, variacao
+    mensal = reamostrar(calendario_diario(df, por='Regional'), 'mes')
+    variacao(mensal['Acidentes'], 'ano')
+"""
+import argparse
+
+import pandas as pd
+
+from cubo_agregado import METRICAS_CUBO
+
+COLUNAS_SERIE = ['Data Abertura'] + METRICAS_CUBO
+METRICAS_SERIE = ['Acidentes'] + METRICAS_CUBO
+
+# Frequências de reamostragem (início de cada período; semanas de segunda a domingo)
+FREQUENCIAS = {'dia': 'D', 'semana': 'W-MON', 'mes': 'MS', 'trimestre': 'QS', 'ano': 'YS'}
+
+# Deslocamento de calendário usado nas variações
+DESLOCAMENTOS = {
+    'dia': pd.DateOffset(days=1),
+    'semana': pd.DateOffset(weeks=1),
+    'mes': pd.DateOffset(months=1),
+    'trimestre': pd.DateOffset(months=3),
+    'ano': pd.DateOffset(years=1),
+}
+
+
+def calendario_diario(df, por=None, metricas=None):
+    """Calendário diário denso com contagem de acidentes e somas de vítimas
+
+    Índice: todos os dias de cada ano com registros, do primeiro ao último
+    registro ('Data'); anos sem registros não entram (não viram zero).
+    Colunas: as `metricas` (padrão: Acidentes e as somas de vítimas
+    presentes em `df`); com `por`, colunas (métrica, valor da dimensão).
+    """
+    if metricas is None:
+        metricas = [m for m in METRICAS_SERIE if m == 'Acidentes' or m in df.columns]
+    somas = [m for m in metricas if m != 'Acidentes']
+    datas = df['Data Abertura'].dt.normalize().rename('Data')
+    chaves = [datas] if por is None else [datas, df[por]]
+
+    grupos = df[somas].groupby(chaves, observed=True)
+    diario = grupos.sum()
+    diario['Acidentes'] = grupos.size()
+    diario = diario[metricas]
+    if por is not None:
+        diario = diario.unstack(por, fill_value=0)
+
+    return densificar(diario)
+
+
+def densificar(diario):
+    """Calendário denso a partir das somas dos dias com registros (índice
+    'Data'): os demais dias de cada ano coberto entram com zero"""
+    return diario.reindex(_dias_cobertos(diario.index.to_series()), fill_value=0)
+
+
+def _dias_cobertos(datas):
+    """Todos os dias de cada ano presente em `datas`, limitados ao primeiro
+    e ao último registro"""
+    inicio, fim = datas.min(), datas.max()
+    periodos = [pd.date_range(max(inicio, pd.Timestamp(ano, 1, 1)), min(fim, pd.Timestamp(ano, 12, 31)), freq='D')
+                for ano in sorted(int(a) for a in datas.dt.year.dropna().unique())]
+    if not periodos:
+        return pd.DatetimeIndex([], name='Data')
+    return periodos[0].append(periodos[1:]).rename('Data')
+
+
+def reamostrar(serie, frequencia='mes'):
+    """Soma da série (ou calendário) por período; índice = início do período
+
+    Períodos sem nenhum dia no calendário (ex.: os meses de um ano ausente)
+    ficam fora do resultado, em vez de aparecerem com zero.
+    """
+    if frequencia not in FREQUENCIAS:
+        raise ValueError(f"Frequência inválida: {frequencia} (use {', '.join(FREQUENCIAS)})")
+    regra = dict(rule=FREQUENCIAS[frequencia], label='left', closed='left')
+    cobertos = serie.index.to_series().resample(**regra).count() > 0
+    return serie.resample(**regra).sum()[cobertos]
+
+
+def media_movel(serie, janela, centralizada=False, minimo_periodos=None):
+    """Média móvel de `janela` períodos (nula até completar a janela)"""
+    return serie.rolling(janela, center=centralizada, min_periods=minimo_periodos).mean()
+
+
+def variacao(serie, periodo='ano', percentual=True):
+    """Variação de cada período em relação ao mesmo período `periodo` antes
+
+    A referência é buscada pela data (ex.: março/2025 contra março/2024),
+    não pela posição: se o período anterior não existe na série, ou é zero
+    na variação percentual, o resultado é nulo.
+    """
+    if periodo not in DESLOCAMENTOS:
+        raise ValueError(f"Período inválido: {periodo} (use {', '.join(DESLOCAMENTOS)})")
+    anterior = serie.copy()
+    anterior.index = anterior.index + DESLOCAMENTOS[periodo]
+    # 29/02 + 1 ano cai em 28/02, que já existe: fica o valor do próprio 28/02
+    anterior = anterior[~anterior.index.duplicated(keep='first')].reindex(serie.index)
+    if not percentual:
+        return serie - anterior
+    return (serie - anterior) / anterior.where(anterior != 0) * 100
+
+
+def tabela_ano_mes(serie):
+    """Série mensal (índice = início do mês) como tabela Ano x Mes (1-12)"""
+    tabela = serie.groupby([serie.index.year.rename('Ano'), serie.index.month.rename('Mes')]).sum(min_count=1)
+    return tabela.unstack('Mes')
+
+
+def indice_sazonal(serie):
+    """Índice sazonal de cada mês (1-12): valor do mês / média mensal do ano x 100,
+    em média sobre os anos
+
+    Usa apenas os anos com os 12 meses no calendário (todos, se nenhum está
+    completo).
+    """
+    mensal = reamostrar(serie, 'mes')
+    anos = mensal.index.year
+    completos = pd.Series(anos).value_counts()
+    completos = completos.index[completos == 12]
+    if len(completos):
+        mensal = mensal[anos.isin(completos)]
+        anos = mensal.index.year
+    relativo = mensal / mensal.groupby(anos).transform('mean') * 100
+    indice = relativo.groupby(mensal.index.month).mean()
+    indice.index.name = 'Mes'
+    return indice
+
+
+def main():
+    from consulta import consultar
+
+    parser = argparse.ArgumentParser(description='Séries temporais de acidentes')
+    parser.add_argument('--frequencia', choices=list(FREQUENCIAS), default='mes', help='período (padrão: mes)')
+    parser.add_argument('--metrica', choices=METRICAS_SERIE, default='Acidentes', help='métrica (padrão: Acidentes)')
+    parser.add_argument('--media-movel', type=int, help='janela da média móvel, em períodos')
+    parser.add_argument('--variacao', choices=list(DESLOCAMENTOS), help='variação em relação ao período anterior')
+    parser.add_argument('--sazonal', action='store_true', help='mostra o índice sazonal mensal')
+    parser.add_argument('--ano', nargs='+', type=int, help='anos considerados (padrão: todos)')
+    parser.add_argument('--rodovia', nargs='+', help='rodovias (ex: SP-055)')
+    parser.add_argument('--regional', nargs='+', help='regionais (ex: CR.05)')
+    args = parser.parse_args()
+
+    df = consultar(colunas=COLUNAS_SERIE, anos=args.ano, rodovias=args.rodovia, regionais=args.regional)
+    diario = calendario_diario(df, metricas=[args.metrica])[args.metrica]
+    if args.sazonal:
+        print(indice_sazonal(diario).round(1).to_string())
+        return
+    serie = reamostrar(diario, args.frequencia)
+    resultado = pd.DataFrame({args.metrica: serie})
+    if args.media_movel:
+        resultado[f'Média móvel ({args.media_movel})'] = media_movel(serie, args.media_movel)
+    if args.variacao:
+        resultado[f'Variação {args.variacao} (%)'] = variacao(serie, args.variacao)
+    print(resultado.round(1).to_string())
+    print(f"\n• {len(diario)} dias ({diario.index.min():%d/%m/%Y} a {diario.index.max():%d/%m/%Y})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Servidor local de pré-visualização do site
+
+Serve a pasta do site como o site publicado, com:
+  - versões pré-comprimidas: se o navegador aceita br ou gzip e existe o
+    .br/.gz atualizado ao lado do arquivo (ativos_estaticos.py ou
+    motor_graficos.py --comprimir), entrega-o com Content-Encoding
+  - ETag forte com o hash do conteúdo entregue (uma por codificação) e
+    resposta 304 para If-None-Match
+  - Cache-Control immutable para arquivos com impressão digital no nome
+    (versionados/ e plotly-<versão>.min.js, como no render.yaml); os demais
+    são revalidados a cada acesso (no-cache), para que uma página
+    regenerada apareça logo
+
+Uso:
+    python servidor_local.py                    # http://127.0.0.1:8000/
+    python servidor_local.py --porta 8080 --preparar
+"""
+import argparse
+import email.utils
+import functools
+import os
+import re
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from ativos_estaticos import EXTENSOES_COMPRIMIVEIS, preparar_ativos, variante_atual
+from cache_graficos import DIRETORIO_VERSIONADOS, TAMANHO_IMPRESSAO, hash_conteudo
+
+PORTA_PADRAO = 8000
+
+# Codificações na ordem de preferência: (Content-Encoding, extensão)
+CODIFICACOES = [('br', 'br'), ('gzip', 'gz')]
+
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+# Nomes com impressão digital: versionados/<nome>.<hash>.<ext> e plotly-<versão>.min.js
+_VERSIONADO = re.compile(rf'^[^/]+\.[0-9a-f]{{{TAMANHO_IMPRESSAO}}}\.[^./]+$')
+_PLOTLYJS = re.compile(r'^plotly-\d+\.\d+\.\d+\.min\.js$')
+
+# ETag por (caminho, mtime, tamanho): cada arquivo só é lido para o hash uma vez
+_ETAGS = {}
+
+
+def imutavel(relativo):
+    """True se o caminho (relativo à raiz do site, com '/') tem impressão digital"""
+    pasta, _, nome = relativo.rpartition('/')
+    if pasta == DIRETORIO_VERSIONADOS:
+        return bool(_VERSIONADO.match(nome))
+    return pasta == '' and bool(_PLOTLYJS.match(nome))
+
+
+def etag(caminho):
+    """ETag forte: prefixo do SHA-256 do conteúdo do arquivo"""
+    st = os.stat(caminho)
+    chave = (caminho, st.st_mtime_ns, st.st_size)
+    if chave not in _ETAGS:
+        _ETAGS[chave] = f'"{hash_conteudo(caminho)[:32]}"'
+    return _ETAGS[chave]
+
+
+def codificacoes_aceitas(cabecalho):
+    """Codificações do Accept-Encoding com q > 0 ('*' aceita qualquer uma)"""
+    aceitas = set()
+    for item in (cabecalho or '').split(','):
+        nome, _, parametros = item.strip().partition(';')
+        qualidade = 1.0
+        for parametro in parametros.split(';'):
+            chave, _, valor = parametro.strip().partition('=')
+            if chave == 'q':
+                try:
+                    qualidade = float(valor)
+                except ValueError:
+                    qualidade = 0.0
+        if nome and qualidade > 0:
+            aceitas.add(nome.lower())
+    if '*' in aceitas:
+        aceitas.update(codificacao for codificacao, _ in CODIFICACOES)
+    return aceitas
+
+
+class ManipuladorSite(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler com pré-compressão, ETag e Cache-Control"""
+
+    def send_head(self):
+        caminho = self.translate_path(self.path)
+        if os.path.isdir(caminho):
+            indice = os.path.join(caminho, 'index.html')
+            if not self.path.split('?', 1)[0].endswith('/') or not os.path.isfile(indice):
+                # Redirecionamento para a barra final ou listagem da pasta
+                return super().send_head()
+            caminho = indice
+        if not os.path.isfile(caminho):
+            self.send_error(HTTPStatus.NOT_FOUND, "Arquivo não encontrado")
+            return None
+
+        # Arquivo entregue: a versão comprimida preferida, se aceita e atualizada
+        entregue, codificacao = caminho, None
+        comprimivel = caminho.endswith(EXTENSOES_COMPRIMIVEIS)
+        if comprimivel:
+            aceitas = codificacoes_aceitas(self.headers.get('Accept-Encoding'))
+            for nome, extensao in CODIFICACOES:
+                if nome in aceitas and variante_atual(caminho, extensao):
+                    entregue, codificacao = f'{caminho}.{extensao}', nome
+                    break
+
+        relativo = os.path.relpath(caminho, self.directory).replace(os.sep, '/')
+        cabecalhos = {
+            'ETag': etag(entregue),
+            'Cache-Control': CACHE_IMUTAVEL if imutavel(relativo) else CACHE_REVALIDAR,
+        }
+        if comprimivel:
+            cabecalhos['Vary'] = 'Accept-Encoding'
+
+        candidatas = self.headers.get('If-None-Match')
+        if candidatas:
+            etags = {item.strip().removeprefix('W/') for item in candidatas.split(',')}
+            if '*' in etags or cabecalhos['ETag'] in etags:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                for nome, valor in cabecalhos.items():
+                    self.send_header(nome, valor)
+                self.end_headers()
+                return None
+
+        arquivo = open(entregue, 'rb')
+        try:
+            st = os.fstat(arquivo.fileno())
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', self.guess_type(caminho))
+            self.send_header('Content-Length', str(st.st_size))
+            self.send_header('Last-Modified', email.utils.formatdate(st.st_mtime, usegmt=True))
+            if codificacao:
+                self.send_header('Content-Encoding', codificacao)
+            for nome, valor in cabecalhos.items():
+                self.send_header(nome, valor)
+            self.end_headers()
+        except Exception:
+            arquivo.close()
+            raise
+        return arquivo
+
+
+def servir(diretorio='.', porta=PORTA_PADRAO, host='127.0.0.1'):
+    """Serve `diretorio` até Ctrl+C"""
+    manipulador = functools.partial(ManipuladorSite, directory=diretorio)
+    with ThreadingHTTPServer((host, porta), manipulador) as servidor:
+        print(f"✓ Servindo {os.path.abspath(diretorio)} em http://{host}:{porta}/ (Ctrl+C para encerrar)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            print("\n✓ Servidor encerrado")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local de pré-visualização do site')
+    parser.add_argument('diretorio', nargs='?', default='.', help='pasta do site (padrão: atual)')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help=f'porta (padrão: {PORTA_PADRAO})')
+    parser.add_argument('--host', default='127.0.0.1', help='endereço (padrão: 127.0.0.1; 0.0.0.0 expõe na rede)')
+    parser.add_argument('--preparar', action='store_true',
+                        help='gera antes as versões .gz/.br desatualizadas (ativos_estaticos.py)')
+    args = parser.parse_args()
+
+    if args.preparar:
+        resumo = preparar_ativos(args.diretorio)
+        print(f"✓ {resumo['comprimidos']} arquivos comprimidos, {resumo['atuais']} já atualizados")
+    servir(args.diretorio, args.porta, args.host)
+
+
+if __name__ == '__main__':
+    main()
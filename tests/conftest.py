@@ -0,0 +1,56 @@
+"""
+Configuração dos testes: módulos do projeto importáveis a partir de tests/
+
+Os scripts do projeto ficam na raiz (sem pacote), então a raiz entra no
+sys.path antes de os testes importarem os módulos. As fixtures de planilhas
+gravam fontes pequenas, no formato de cada ano, para os testes que
+consolidam um dataset de verdade.
+"""
+import datetime
+import os
+import sys
+
+import pytest
+from openpyxl import Workbook
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from esquema_fontes import ESQUEMAS_FONTES, esquema_fonte  # noqa: E402 (depois do sys.path)
+
+COLUNAS_PLANILHA = ['Evento', 'Rodovia', 'Km', 'Sentido', 'Ocorrencia', 'Tipo Acidente', 'Leve', 'Grave',
+                    'Fatal', 'Data Abertura', 'Regional', 'Nova data', 'Total de Vítimas']
+
+
+def _gravar_planilha(ano, n_linhas):
+    """Grava na pasta atual a planilha do ano com `n_linhas` acidentes
+    (aba e cabeçalho com os aliases registrados em ESQUEMAS_FONTES)"""
+    fonte = esquema_fonte(ano)
+    originais = {canonico: original for original, canonico in fonte['aliases'].items()}
+    pasta = Workbook()
+    planilha = pasta.active
+    planilha.title = fonte['aba']
+    planilha.append([originais.get(coluna, coluna) for coluna in COLUNAS_PLANILHA])
+    for i in range(n_linhas):
+        data = datetime.datetime(ano, i % 12 + 1, i % 28 + 1, 8 + i % 12)
+        leve, grave, fatal = i % 3, i % 2, int(i % 7 == 0)
+        planilha.append([f'{ano}-{i}', 55 + i % 3, 10.5 + i, ['Crescente', 'Decrescente'][i % 2],
+                         'Acidente com Vítima', ['Colisão', 'Capotamento', 'Atropelamento'][i % 3],
+                         leve, grave, fatal, data, f'DR-0{i % 4 + 1}', data, leve + grave + fatal])
+    pasta.save(fonte['arquivo'])
+
+
+@pytest.fixture
+def gravar_planilha():
+    """Função que grava (ou regrava) a planilha de um ano na pasta atual"""
+    return _gravar_planilha
+
+
+@pytest.fixture
+def planilhas(tmp_path, monkeypatch):
+    """Pasta temporária (pasta atual) com uma planilha por ano: 10, 11, 12... linhas"""
+    monkeypatch.chdir(tmp_path)
+    for indice, ano in enumerate(sorted(ESQUEMAS_FONTES)):
+        _gravar_planilha(ano, 10 + indice)
+    return tmp_path
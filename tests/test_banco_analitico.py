@@ -0,0 +1,125 @@
+"""
+Testes do banco analítico (banco_analitico.py) contra o cubo do pandas
+
+O banco é montado a partir de um dataset consolidado de planilhas pequenas
+(fixture `planilhas`); os testes usam o SQLite, sempre disponível.
+"""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from armazenamento import caminho_particao, caminho_provisorio, carregar_dados
+from banco_analitico import (assinatura_dataset, calendario_banco, construir_cubo_banco, contagens_banco,
+                             correlacoes_banco, criar_banco)
+from consolidar_dados import consolidar
+from cubo_agregado import DIMENSOES_CUBO, METRICAS_CUBO, construir_cubo
+from esquema_fontes import ESQUEMAS_FONTES
+from serie_temporal import calendario_diario
+
+COLUNAS = ['Ano', 'Mes', 'Rodovia', 'Regional', 'Tipo Acidente', 'Sentido', 'Leve', 'Grave', 'Fatal']
+
+
+@pytest.fixture
+def banco(planilhas):
+    consolidar(processos=1)
+    return criar_banco(caminho_banco=str(planilhas / 'acidentes.sqlite'), motor='sqlite')
+
+
+def _normalizar(cubo):
+    """Dimensões como texto e métricas como float, nas linhas ordenadas"""
+    dimensoes = [d for d in DIMENSOES_CUBO if d in cubo.columns]
+    cubo = cubo.copy()
+    for dimensao in dimensoes:
+        cubo[dimensao] = cubo[dimensao].astype(str)
+    for metrica in ['Acidentes'] + METRICAS_CUBO:
+        if metrica in cubo.columns:
+            cubo[metrica] = cubo[metrica].astype('float64')
+    return cubo.sort_values(dimensoes).reset_index(drop=True)
+
+
+def test_cubo_do_banco_igual_ao_do_pandas(banco):
+    resultado = construir_cubo_banco(COLUNAS, caminho_banco=banco, motor='sqlite')
+    esperado = construir_cubo(carregar_dados(colunas=COLUNAS))
+    pd.testing.assert_frame_equal(_normalizar(resultado), _normalizar(esperado[resultado.columns]))
+
+
+def test_cubo_do_banco_filtra_os_anos(banco):
+    anos = sorted(ESQUEMAS_FONTES)[:1]
+    resultado = construir_cubo_banco(COLUNAS, anos=anos, caminho_banco=banco, motor='sqlite')
+    assert set(resultado['Ano']) == set(anos)
+
+
+def test_cubo_do_banco_ordenado_pelas_dimensoes(banco):
+    resultado = construir_cubo_banco(COLUNAS, caminho_banco=banco, motor='sqlite')
+    dimensoes = [d for d in DIMENSOES_CUBO if d in resultado.columns]
+    # ORDER BY no banco: valores (texto ou número), não a ordem das categorias
+    valores = resultado[dimensoes].apply(lambda c: c.astype(str) if c.dtype == 'category' else c)
+    assert valores.sort_values(dimensoes).index.tolist() == list(range(len(resultado)))
+    assert not valores.duplicated().any()
+
+
+def test_calendario_do_banco_igual_ao_do_pandas(banco):
+    colunas = ['Data Abertura', 'Total de Vítimas', 'Fatal']
+    resultado = calendario_banco(colunas, caminho_banco=banco, motor='sqlite')
+    esperado = calendario_diario(carregar_dados(colunas=colunas))
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False, check_freq=False)
+
+
+def test_contagens_do_banco_iguais_ao_groupby(banco):
+    colunas = ['Ano', 'Regional', 'Total de Vítimas']
+    resultado = contagens_banco(colunas, caminho_banco=banco, motor='sqlite')
+    esperado = carregar_dados(colunas=colunas).groupby(colunas, observed=True).size().rename('Acidentes')
+    pd.testing.assert_frame_equal(_normalizar(resultado), _normalizar(esperado.reset_index()))
+
+
+def test_faixas_do_banco_iguais_ao_floor(banco):
+    resultado = contagens_banco(['Ano', 'Km'], faixas={'Km': 5}, caminho_banco=banco, motor='sqlite')
+    linhas = carregar_dados(colunas=['Km'])
+    esperado = linhas.groupby(['Ano', np.floor(linhas['Km'] / 5)]).size()
+    assert resultado['Km'].tolist() == esperado.index.get_level_values('Km').astype(int).tolist()
+    assert resultado['Acidentes'].tolist() == esperado.tolist()
+
+
+def test_correlacoes_do_banco_iguais_ao_pandas(banco):
+    colunas = ['Km', 'Leve', 'Grave', 'Fatal', 'Total de Vítimas']
+    resultado = correlacoes_banco(colunas, caminho_banco=banco, motor='sqlite')
+    esperado = carregar_dados(colunas=colunas)[colunas].dropna().corr()
+    pd.testing.assert_frame_equal(resultado, esperado, rtol=1e-12)
+
+
+def test_graficos_de_linhas_agregados_no_banco(planilhas):
+    import motor_graficos
+    consolidar(processos=1)
+    motor_graficos.carregar_registro()
+    graficos = motor_graficos.selecionar_graficos(['12', '27', '30'])
+    entradas = motor_graficos.preparar_dados(graficos, banco=True)
+    # Só o gráfico sem agregacao_banco (30) carrega linhas, e só as suas colunas
+    assert sorted(entradas['banco']) == ['12', '27']
+    assert set(entradas['linhas'].columns) == {'Ano'} | set(motor_graficos.GRAFICOS['30'].colunas)
+    linhas = carregar_dados(colunas=['Total de Vítimas'])
+    pd.testing.assert_frame_equal(graficos[1].agregar(entradas), graficos[1].agregacao(linhas),
+                                  check_index_type=False)
+
+
+def test_assinatura_ignora_particao_provisoria(planilhas):
+    consolidar(processos=1)
+    assinatura = assinatura_dataset()
+    ano = sorted(ESQUEMAS_FONTES)[0]
+    shutil.copytree(caminho_particao(ano), caminho_provisorio(ano))
+    assert assinatura_dataset() == assinatura
+
+
+def test_banco_reaproveitado_ate_o_dataset_mudar(banco, gravar_planilha):
+    mtime = os.stat(banco).st_mtime_ns
+    assert criar_banco(caminho_banco=banco, motor='sqlite') == banco
+    assert os.stat(banco).st_mtime_ns == mtime
+
+    ano = sorted(ESQUEMAS_FONTES)[0]
+    gravar_planilha(ano, 30)
+    consolidar(processos=1)
+    criar_banco(caminho_banco=banco, motor='sqlite')
+    resultado = construir_cubo_banco(['Ano'], anos=[ano], caminho_banco=banco, motor='sqlite')
+    assert resultado['Acidentes'].sum() == 30
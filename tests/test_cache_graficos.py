@@ -0,0 +1,203 @@
+"""
+Testes do cache de saída dos gráficos (cache_graficos.py)
+
+Cada teste monta um projeto mínimo em uma pasta temporária: um módulo de
+cores e um módulo com dois gráficos registrados que o importa (o segundo
+com a sua agregação em uma função separada).
+"""
+import importlib
+import sys
+
+import pandas as pd
+import pytest
+
+import motor_graficos
+from cache_graficos import (chave_grafico, em_cache, graficos_registrados, impressoes_entradas, podar_versionados,
+                            registrar_saida)
+from cubo_agregado import construir_cubo
+from serie_temporal import calendario_diario
+
+CORES = "PALETA = ['#1E3A5F', '#2E7D32']\n"
+
+GRAFICOS = '''from motor_graficos import registrar_grafico
+from cores_teste import PALETA
+
+
+@registrar_grafico('91', 'g91.html', 'Gráfico A', colunas=['Rodovia'])
+def grafico_a(df):
+    return PALETA[0]
+
+
+def dados_b(df):
+    return df['Rodovia'].value_counts()
+
+
+@registrar_grafico('92', 'g92.html', 'Gráfico B', colunas=['Rodovia'], agregacao=dados_b)
+def grafico_b(contagens):
+    return PALETA[1]
+'''
+
+IMPRESSAO = 'entrada'
+OPCOES = {'formato': 'html'}
+
+
+@pytest.fixture
+def projeto(tmp_path, monkeypatch):
+    """Pasta do projeto de teste (também a pasta atual) e seu registro de gráficos"""
+    (tmp_path / 'cores_teste.py').write_text(CORES, encoding='utf-8')
+    (tmp_path / 'graficos_teste.py').write_text(GRAFICOS, encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(motor_graficos, 'GRAFICOS', {})
+    for nome in ('cores_teste', 'graficos_teste'):
+        monkeypatch.delitem(sys.modules, nome, raising=False)
+    importlib.import_module('graficos_teste')
+    return tmp_path
+
+
+def _recarregar():
+    """Recarrega os módulos do projeto de teste (após editar os arquivos)"""
+    importlib.invalidate_caches()
+    importlib.reload(sys.modules['cores_teste'])
+    importlib.reload(sys.modules['graficos_teste'])
+
+
+def _chave(projeto, numero):
+    return chave_grafico(motor_graficos.GRAFICOS[numero], IMPRESSAO, 'motor', OPCOES, str(projeto))
+
+
+def _gravar(projeto, numero):
+    """Simula a renderização: grava a saída e a registra no manifesto"""
+    manifesto = {}
+    saida = motor_graficos.GRAFICOS[numero].arquivo
+    (projeto / saida).write_text(f'grafico {numero}', encoding='utf-8')
+    registrar_saida(manifesto, saida, _chave(projeto, numero))
+    return manifesto, saida
+
+
+def test_mesmas_entradas_e_codigo_usam_o_cache(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    assert em_cache(manifesto, saida, _chave(projeto, '91'))
+
+
+def test_dependencia_alterada_invalida_o_cache(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    (projeto / 'cores_teste.py').write_text(CORES.replace('#1E3A5F', '#000000'), encoding='utf-8')
+    _recarregar()
+    assert not em_cache(manifesto, saida, _chave(projeto, '91'))
+
+
+def test_codigo_do_modulo_fora_dos_graficos_invalida_o_cache(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    texto = GRAFICOS.replace('from cores_teste import PALETA\n',
+                             'from cores_teste import PALETA\n\nLARGURA = 800\n')
+    (projeto / 'graficos_teste.py').write_text(texto, encoding='utf-8')
+    _recarregar()
+    assert not em_cache(manifesto, saida, _chave(projeto, '91'))
+
+
+def test_editar_outro_grafico_do_modulo_mantem_o_cache(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    chave_92 = _chave(projeto, '92')
+    (projeto / 'graficos_teste.py').write_text(GRAFICOS.replace('PALETA[1]', 'PALETA[-1]'), encoding='utf-8')
+    _recarregar()
+    assert em_cache(manifesto, saida, _chave(projeto, '91'))
+    assert _chave(projeto, '92') != chave_92
+
+
+def test_agregacao_entra_so_na_chave_do_seu_grafico(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    chave_92 = _chave(projeto, '92')
+    (projeto / 'graficos_teste.py').write_text(GRAFICOS.replace('value_counts()', 'value_counts(sort=False)'),
+                                               encoding='utf-8')
+    _recarregar()
+    assert em_cache(manifesto, saida, _chave(projeto, '91'))
+    assert _chave(projeto, '92') != chave_92
+
+
+def test_entrada_alterada_invalida_o_cache(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    chave = chave_grafico(motor_graficos.GRAFICOS['91'], 'outra', 'motor', OPCOES, str(projeto))
+    assert not em_cache(manifesto, saida, chave)
+
+
+def test_saida_alterada_fora_do_motor_invalida_o_cache(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    (projeto / saida).write_text('editado à mão', encoding='utf-8')
+    assert not em_cache(manifesto, saida, _chave(projeto, '91'))
+
+
+def test_so_as_saidas_json_tem_copia_versionada(projeto):
+    manifesto, saida = _gravar(projeto, '91')
+    assert 'versionado' not in manifesto[saida]
+    (projeto / 'g91.json').write_text('{"data": []}', encoding='utf-8')
+    registro = registrar_saida(manifesto, 'g91.json', 'chave')
+    assert registro['versionado'].startswith('versionados/g91.')
+    assert (projeto / registro['versionado']).read_text(encoding='utf-8') == '{"data": []}'
+
+
+def test_podar_remove_entradas_e_copias_obsoletas(projeto):
+    manifesto = {}
+    for nome in ('g91.json', 'g92.json'):
+        (projeto / nome).write_text(nome, encoding='utf-8')
+        registrar_saida(manifesto, nome, 'chave')
+    atual = manifesto['g91.json']['versionado']
+    # Cópia HTML de uma versão anterior do cache e gráfico 92 removido
+    (projeto / 'versionados' / 'g91.0123456789ab.html').write_text('antiga', encoding='utf-8')
+    (projeto / 'g92.json').unlink()
+    removidos = podar_versionados(manifesto)
+    assert list(manifesto) == ['g91.json']
+    assert sorted(p.name for p in (projeto / 'versionados').iterdir()) == [atual.split('/')[-1]]
+    assert 'g92.json' in removidos and 'versionados/g91.0123456789ab.html' in removidos
+
+
+def _linhas():
+    return pd.DataFrame({
+        'Ano': [2024, 2024, 2025, 2025],
+        'Data Abertura': pd.to_datetime(['2024-01-02', '2024-01-02', '2025-03-04', '2025-05-06']),
+        'Rodovia': ['SP-055', 'SP-056', 'SP-055', None],
+        'Regional': ['DR-01', 'DR-02', 'DR-01', 'DR-02'],
+        'Fatal': [0, 1, 0, 1],
+        'Grave': [1, 0, 2, 0],
+    })
+
+
+def _impressoes(linhas, colunas_cubo=None):
+    """Impressões de um gráfico de cada entrada: cubo por Rodovia, calendário
+    de Fatal e linhas de Rodovia"""
+    graficos = [motor_graficos.Grafico('81', 'c.html', 'C', ['Rodovia'], 'cubo', len),
+                motor_graficos.Grafico('82', 'd.html', 'D', ['Data Abertura', 'Fatal'], 'calendario', len),
+                motor_graficos.Grafico('83', 'l.html', 'L', ['Rodovia'], 'linhas', len)]
+    cubo = construir_cubo(linhas if colunas_cubo is None else linhas[colunas_cubo])
+    entradas = {'cubo': cubo, 'calendario': calendario_diario(linhas), 'linhas': linhas}
+    return impressoes_entradas(graficos, entradas)
+
+
+def test_impressao_usa_so_a_parte_da_entrada_do_grafico():
+    base = _impressoes(_linhas())
+    # Cubo com menos dimensões (outra seleção de gráficos): mesmo roll-up
+    assert _impressoes(_linhas(), ['Ano', 'Rodovia', 'Fatal', 'Grave'])['81'] == base['81']
+    # Colunas que nenhum dos gráficos usa
+    outras = _linhas().assign(Regional='DR-09', Grave=5)
+    assert _impressoes(outras) == base
+
+
+def test_impressao_muda_com_a_parte_usada():
+    base = _impressoes(_linhas())
+    rodovia = _linhas().assign(Rodovia=['SP-055', 'SP-055', 'SP-055', None])
+    assert _impressoes(rodovia)['81'] != base['81']
+    assert _impressoes(rodovia)['83'] != base['83']
+    assert _impressoes(rodovia)['82'] == base['82']
+    fatal = _linhas().assign(Fatal=[0, 1, 1, 1])
+    assert _impressoes(fatal)['82'] != base['82']
+    # Célula com Rodovia nula também entra no roll-up
+    nula = _linhas().assign(Ano=[2024, 2024, 2025, 2024])
+    assert _impressoes(nula)['81'] != base['81']
+
+
+def test_graficos_registrados_sem_importar_os_modulos(projeto):
+    assert graficos_registrados(['graficos_teste', 'cores_teste'], str(projeto)) == ['91', '92']
+
+
+def test_graficos_registrados_iguais_ao_registro():
+    assert graficos_registrados() == sorted(motor_graficos.carregar_registro())
@@ -0,0 +1,109 @@
+"""
+Testes da consolidação incremental (consolidar_dados.py)
+
+Cada teste grava planilhas pequenas, no formato registrado em
+ESQUEMAS_FONTES para cada ano, em uma pasta temporária e consolida ali
+(fixtures `planilhas` e `gravar_planilha` em conftest.py).
+"""
+import os
+
+from armazenamento import caminho_particao, carregar_dados
+from consolidar_dados import carregar_manifesto, consolidar
+from esquema_fontes import ESQUEMAS_FONTES, esquema_fonte
+
+ANOS = sorted(ESQUEMAS_FONTES)
+
+
+def _mtimes_particoes():
+    mtimes = {}
+    for ano in ANOS:
+        particao = caminho_particao(ano)
+        for nome in sorted(os.listdir(particao)):
+            mtimes[(ano, nome)] = os.stat(os.path.join(particao, nome)).st_mtime_ns
+    return mtimes
+
+
+def _registros_por_ano():
+    return carregar_dados(colunas=['Ano'])['Ano'].value_counts().sort_index().to_dict()
+
+
+def test_primeira_consolidacao_processa_todos_os_anos(planilhas):
+    assert consolidar(processos=1) == dict.fromkeys(ANOS, 'processado')
+    assert _registros_por_ano() == {ano: 10 + indice for indice, ano in enumerate(ANOS)}
+
+
+def test_planilhas_inalteradas_reaproveitam_as_particoes(planilhas):
+    consolidar(processos=1)
+    antes = _mtimes_particoes()
+    assert consolidar(processos=1) == dict.fromkeys(ANOS, 'reaproveitado')
+    assert _mtimes_particoes() == antes
+
+
+def test_mesmo_sha256_com_mtime_novo_reaproveita_a_particao(planilhas):
+    consolidar(processos=1)
+    antes = _mtimes_particoes()
+    arquivo = esquema_fonte(ANOS[0])['arquivo']
+    sha256 = carregar_manifesto()[str(ANOS[0])]['arquivos'][arquivo]['sha256']
+    os.utime(arquivo, (1_000_000_000, 1_000_000_000))
+
+    assert consolidar(processos=1) == dict.fromkeys(ANOS, 'reaproveitado')
+    assert _mtimes_particoes() == antes
+    # O manifesto guarda o mtime novo (a próxima execução não relê o arquivo)
+    digital = carregar_manifesto()[str(ANOS[0])]['arquivos'][arquivo]
+    assert digital['sha256'] == sha256 and digital['mtime'] == 1_000_000_000
+
+
+def test_planilha_alterada_reprocessa_so_o_seu_ano(planilhas, gravar_planilha):
+    consolidar(processos=1)
+    gravar_planilha(ANOS[0], 25)
+    esperado = dict.fromkeys(ANOS, 'reaproveitado')
+    esperado[ANOS[0]] = 'processado'
+    assert consolidar(processos=1) == esperado
+    assert _registros_por_ano()[ANOS[0]] == 25
+
+
+def test_completo_reprocessa_mesmo_sem_alteracoes(planilhas):
+    consolidar(processos=1)
+    assert consolidar(completo=True, processos=1) == dict.fromkeys(ANOS, 'processado')
+
+
+def _corromper(ano):
+    with open(esquema_fonte(ano)['arquivo'], 'wb') as arquivo:
+        arquivo.write(b'nao e uma planilha xlsx')
+
+
+def test_planilha_corrompida_nao_interrompe_os_demais_anos(planilhas, gravar_planilha):
+    consolidar(processos=1)
+    sha256 = carregar_manifesto()[str(ANOS[-1])]['arquivos'][esquema_fonte(ANOS[-1])['arquivo']]['sha256']
+    gravar_planilha(ANOS[0], 25)
+    _corromper(ANOS[-1])
+
+    # processos=2: as planilhas são lidas no pool de processos
+    status = consolidar(processos=2)
+    assert status[ANOS[0]] == 'processado'
+    assert status[ANOS[-1]] == 'erro'
+    assert all(status[ano] == 'reaproveitado' for ano in ANOS[1:-1])
+
+    # Partição anterior mantida, sem partição provisória esquecida
+    assert _registros_por_ano() == {ano: 25 if ano == ANOS[0] else 10 + indice for indice, ano in enumerate(ANOS)}
+    assert not [nome for nome in os.listdir(os.path.dirname(caminho_particao(ANOS[0]))) if nome.startswith('_Ano=')]
+    # O manifesto do ano com erro não muda: a próxima execução tenta de novo
+    assert carregar_manifesto()[str(ANOS[-1])]['arquivos'][esquema_fonte(ANOS[-1])['arquivo']]['sha256'] == sha256
+
+
+def test_primeira_consolidacao_com_planilha_corrompida(planilhas, gravar_planilha):
+    _corromper(ANOS[0])
+    status = consolidar(processos=2)
+    assert status == {**dict.fromkeys(ANOS, 'processado'), ANOS[0]: 'erro'}
+    assert not os.path.exists(caminho_particao(ANOS[0]))
+    assert set(_registros_por_ano()) == set(ANOS[1:])
+
+    gravar_planilha(ANOS[0], 10)
+    assert consolidar(processos=2) == {**dict.fromkeys(ANOS, 'reaproveitado'), ANOS[0]: 'processado'}
+
+
+def test_planilha_ausente_nao_interrompe_os_demais_anos(planilhas):
+    os.remove(esquema_fonte(ANOS[-1])['arquivo'])
+    status = consolidar(processos=2)
+    assert status[ANOS[-1]] == 'erro'
+    assert all(status[ano] == 'processado' for ano in ANOS[:-1])
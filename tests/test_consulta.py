@@ -0,0 +1,94 @@
+"""
+Testes das consultas filtradas (consulta.py) contra o pandas nas linhas do dataset
+
+O dataset é consolidado a partir de planilhas pequenas (fixture `planilhas`);
+o esperado é o mesmo filtro/agrupamento feito no pandas sobre todas as linhas.
+"""
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from armazenamento import carregar_dados
+from consolidar_dados import consolidar
+from consulta import METRICAS_CONSULTA, consultar, filtro_consulta
+from esquema_fontes import ESQUEMAS_FONTES
+
+METRICAS = [m for m in METRICAS_CONSULTA if m != 'Acidentes']
+
+
+@pytest.fixture
+def linhas(planilhas):
+    consolidar(processos=1)
+    return carregar_dados()
+
+
+def _texto(df):
+    """Categorias como texto (como na saída Arrow da consulta)"""
+    df = df.copy()
+    for coluna in df.columns:
+        if df[coluna].dtype == 'category':
+            df[coluna] = df[coluna].astype(str)
+    return df
+
+
+def _por_evento(df):
+    """Linhas ordenadas por Evento, para comparar sem depender da ordem"""
+    return _texto(df).sort_values('Evento').reset_index(drop=True)
+
+
+def _agrupado(df, por):
+    esperado = df.groupby(por, observed=True)[METRICAS].sum()
+    esperado.insert(0, 'Acidentes', df.groupby(por, observed=True).size())
+    return _texto(esperado.reset_index()).sort_values(por).reset_index(drop=True)
+
+
+def test_sem_filtros_o_filtro_e_none():
+    assert filtro_consulta() is None
+
+
+@pytest.mark.parametrize('filtros, mascara', [
+    ({'anos': [2024]}, lambda df: df['Ano'] == 2024),
+    ({'rodovias': [56]}, lambda df: df['Rodovia'].astype(str) == 'SP-056'),
+    ({'rodovias': 'SP-057'}, lambda df: df['Rodovia'].astype(str) == 'SP-057'),
+    ({'regionais': ['DR-01', 'DR-03']}, lambda df: df['Regional'].astype(str).isin(['DR-01', 'DR-03'])),
+    ({'anos': [2023, 2025], 'rodovias': [55], 'regionais': 'DR-02'},
+     lambda df: df['Ano'].isin([2023, 2025]) & (df['Rodovia'].astype(str) == 'SP-055')
+     & (df['Regional'].astype(str) == 'DR-02')),
+])
+def test_linhas_filtradas_iguais_ao_pandas(linhas, filtros, mascara):
+    esperado = linhas[mascara(linhas)]
+    assert len(esperado) > 0
+    resultado = consultar(**filtros)
+    pd.testing.assert_frame_equal(_por_evento(resultado[esperado.columns]), _por_evento(esperado), check_dtype=False)
+    tabela = consultar(formato='arrow', colunas=['Evento', 'Fatal'], **filtros)
+    assert isinstance(tabela, pa.Table)
+    assert sorted(tabela.column('Evento').to_pylist()) == sorted(esperado['Evento'])
+
+
+@pytest.mark.parametrize('por', [['Ano'], ['Regional'], ['Ano', 'Rodovia']])
+def test_agrupamento_igual_ao_groupby(linhas, por):
+    esperado = _agrupado(linhas, por)
+    resultado = consultar(por=por)
+    pd.testing.assert_frame_equal(_texto(resultado), esperado, check_dtype=False)
+    tabela = consultar(por=por, formato='arrow')
+    pd.testing.assert_frame_equal(tabela.to_pandas(), esperado, check_dtype=False)
+
+
+def test_agrupamento_filtrado_igual_ao_groupby(linhas):
+    filtrado = linhas[(linhas['Ano'] == 2025) & linhas['Regional'].astype(str).isin(['DR-01', 'DR-04'])]
+    esperado = _agrupado(filtrado, ['Rodovia'])[['Rodovia', 'Acidentes', 'Fatal']]
+    resultado = consultar(por='Rodovia', metricas=['Acidentes', 'Fatal'], anos=2025,
+                          regionais=['DR-01', 'DR-04'], formato='arrow')
+    pd.testing.assert_frame_equal(resultado.to_pandas(), esperado, check_dtype=False)
+
+
+def test_anos_de_todas_as_fontes(linhas):
+    resultado = consultar(por='Ano', metricas='Acidentes')
+    assert resultado['Ano'].tolist() == sorted(ESQUEMAS_FONTES)
+    assert resultado['Acidentes'].sum() == len(linhas)
+
+
+def test_metrica_desconhecida(linhas):
+    with pytest.raises(KeyError):
+        consultar(por='Ano', metricas=['Acidentes', 'Mortos'])
+
@@ -0,0 +1,70 @@
+"""
+Testes do cubo agregado (cubo_agregado.py): roll-ups iguais aos groupby diretos nas linhas
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubo_agregado import agregar, construir_cubo, tabela_cruzada, top_n
+
+
+@pytest.fixture
+def acidentes():
+    """Acidentes sintéticos com Evento e Rodovia às vezes nulos"""
+    rng = np.random.default_rng(5)
+    n = 2000
+    df = pd.DataFrame({
+        'Ano': rng.choice([2023, 2024, 2025], n),
+        'Mes': rng.integers(1, 13, n),
+        'Rodovia': pd.Categorical(rng.choice(['SP-055', 'SP-330', 'SP-008', None], n, p=[0.4, 0.3, 0.2, 0.1])),
+        'Regional': rng.choice(['DR-01', 'DR-02', 'DR-03'], n),
+        'Tipo Acidente': rng.choice(['Colisão', 'Capotamento', 'Atropelamento'], n),
+        'Evento': [f'E{i}' for i in range(n)],
+        'Leve': rng.integers(0, 3, n),
+        'Grave': rng.integers(0, 2, n),
+        'Fatal': (rng.random(n) < 0.05).astype('int64'),
+    })
+    df['Total de Vítimas'] = df['Leve'] + df['Grave'] + df['Fatal']
+    df.loc[rng.random(n) < 0.05, 'Evento'] = None
+    return df
+
+
+def test_agregar_igual_ao_groupby_das_linhas(acidentes):
+    cubo = construir_cubo(acidentes)
+    metricas = ['Leve', 'Grave', 'Fatal', 'Total de Vítimas']
+    for por in (['Ano'], ['Regional'], ['Ano', 'Tipo Acidente'], ['Ano', 'Mes', 'Regional']):
+        resultado = agregar(cubo, por, ['Acidentes'] + metricas)
+        esperado = acidentes.groupby(por, observed=True)[metricas].sum()
+        esperado.insert(0, 'Acidentes', acidentes.groupby(por, observed=True).size())
+        pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+
+def test_cubo_mantem_as_linhas_com_dimensao_nula(acidentes):
+    cubo = construir_cubo(acidentes)
+    assert cubo['Acidentes'].sum() == len(acidentes)
+    nulas = cubo[cubo['Rodovia'].isna()]
+    assert nulas['Acidentes'].sum() == acidentes['Rodovia'].isna().sum()
+
+
+def test_acidentes_conta_linhas_e_nao_eventos_preenchidos(acidentes):
+    # Acidentes é o tamanho do grupo ('size'); os scripts originais contavam
+    # Evento ('count'), que ignora os Eventos nulos
+    por_rodovia = agregar(construir_cubo(acidentes), 'Rodovia', ['Acidentes'])['Acidentes']
+    tamanho = acidentes.groupby('Rodovia', observed=True).size()
+    contagem = acidentes.groupby('Rodovia', observed=True)['Evento'].count()
+    pd.testing.assert_series_equal(por_rodovia, tamanho, check_dtype=False, check_names=False)
+    assert (por_rodovia >= contagem).all()
+    assert (por_rodovia - contagem).sum() == acidentes.loc[acidentes['Rodovia'].notna(), 'Evento'].isna().sum()
+
+
+def test_tabela_cruzada_igual_ao_crosstab(acidentes):
+    resultado = tabela_cruzada(construir_cubo(acidentes), 'Ano', 'Regional')
+    esperado = pd.crosstab(acidentes['Ano'], acidentes['Regional'])
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False, check_names=False)
+
+
+def test_top_n_igual_ao_value_counts(acidentes):
+    resultado = top_n(construir_cubo(acidentes), 'Tipo Acidente', 2)
+    esperado = acidentes['Tipo Acidente'].value_counts().head(2)
+    assert resultado.index.tolist() == esperado.index.tolist()
+    assert resultado.tolist() == esperado.tolist()
@@ -0,0 +1,70 @@
+"""
+Testes da densidade por km (densidade_km.py) contra a convolução direta
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from densidade_km import ALCANCE_NUCLEO, _convolver_fft, _nucleo, densidade_rodovia, densidades, picos
+from indice_km import peso_severidade
+
+
+def _densidade_direta(grade, km, pesos, resolucao, banda):
+    """Soma direta de um núcleo por acidente em cada ponto da grade"""
+    nucleo = _nucleo(resolucao, banda)
+    meia_largura = len(nucleo) // 2
+    densidade = np.zeros(len(grade))
+    for k, peso in zip(km, pesos):
+        deslocamentos = np.rint((grade - k) / resolucao).astype('int64')
+        perto = np.abs(deslocamentos) <= meia_largura
+        densidade[perto] += peso * nucleo[deslocamentos[perto] + meia_largura]
+    return densidade
+
+
+@pytest.mark.parametrize('tamanho', [1, 7, 64, 1000])
+def test_convolucao_fft_igual_a_direta(tamanho):
+    rng = np.random.default_rng(tamanho)
+    sinal = rng.random(tamanho) * (rng.random(tamanho) < 0.3)
+    nucleo = _nucleo(0.1, 0.5)
+    esperado = np.convolve(sinal, nucleo, mode='full')[len(nucleo) // 2:len(nucleo) // 2 + tamanho]
+    np.testing.assert_allclose(_convolver_fft(sinal, nucleo), esperado, atol=1e-12)
+
+
+def test_nucleo_gaussiano_com_integral_um():
+    for resolucao, banda in [(0.1, 0.5), (0.05, 1.0), (0.1, 0.25)]:
+        nucleo = _nucleo(resolucao, banda)
+        assert nucleo.sum() * resolucao == pytest.approx(1.0)
+        meia_largura = len(nucleo) // 2
+        assert meia_largura * resolucao >= ALCANCE_NUCLEO * banda
+        x = (np.arange(len(nucleo)) - meia_largura) * resolucao
+        np.testing.assert_allclose(nucleo / nucleo.max(), np.exp(-0.5 * (x / banda) ** 2))
+
+
+@pytest.mark.parametrize('banda', [0.25, 0.5, 1.0])
+def test_densidade_igual_a_soma_direta_dos_nucleos(banda):
+    rng = np.random.default_rng(3)
+    km = rng.uniform(0, 40, 300)
+    pesos = peso_severidade(rng.integers(0, 3, 300), rng.random(300) < 0.05)
+    grade, densidade = densidade_rodovia(km, pesos, resolucao=0.1, banda=banda)
+    np.testing.assert_allclose(densidade, _densidade_direta(grade, km, pesos, 0.1, banda), atol=1e-9)
+
+
+def test_densidade_preserva_o_peso_total():
+    rng = np.random.default_rng(5)
+    km = rng.uniform(10, 60, 500)
+    pesos = rng.integers(1, 30, 500).astype('float64')
+    grade, densidade = densidade_rodovia(km, pesos)
+    assert densidade.min() >= 0
+    assert densidade.sum() * (grade[1] - grade[0]) == pytest.approx(pesos.sum(), rel=1e-9)
+
+
+def test_picos_encontram_o_aglomerado():
+    df = pd.DataFrame({
+        'Rodovia': ['SP-055'] * 60,
+        'Km': np.r_[np.full(40, 12.3), np.linspace(0, 50, 20)],
+        'Grave': 0.0,
+        'Fatal': 0.0,
+    })
+    resultado = picos(df, n_por_rodovia=1)
+    assert resultado.loc[0, 'Km'] == pytest.approx(12.3, abs=0.1)
+    assert set(densidades(df)) == {'SP-055'}
@@ -0,0 +1,114 @@
+"""
+Testes do índice (Rodovia, Km) contra contagens por força bruta (indice_km.py)
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache_graficos import dependencias_modulo
+from indice_km import METRICAS_TRECHO, IndiceKm, peso_severidade
+
+
+@pytest.fixture
+def acidentes():
+    """Acidentes sintéticos em três rodovias, com km repetidos e nulos"""
+    rng = np.random.default_rng(7)
+    n = 2000
+    df = pd.DataFrame({
+        'Rodovia': rng.choice(['SP-055', 'SP-070', 'SP-310'], n),
+        # Km arredondados a 100 m: muitos acidentes no mesmo km
+        'Km': rng.uniform(0, 80, n).round(1),
+        'Grave': rng.integers(0, 3, n).astype('float64'),
+        'Fatal': (rng.random(n) < 0.05).astype('float64'),
+    })
+    df.loc[::97, 'Km'] = np.nan
+    df.loc[::53, 'Grave'] = np.nan
+    df.loc[::211, 'Rodovia'] = None
+    return df
+
+
+def _forca_bruta(df, rodovia, km_inicio, km_fim):
+    trecho = df[(df['Rodovia'] == rodovia) & (df['Km'] >= km_inicio) & (df['Km'] <= km_fim)]
+    grave = trecho['Grave'].fillna(0)
+    fatal = trecho['Fatal'].fillna(0)
+    return {
+        'Acidentes': len(trecho),
+        'Grave': int(grave.sum()),
+        'Fatal': int(fatal.sum()),
+        'Peso': int(round(peso_severidade(grave, fatal).sum())),
+    }
+
+
+def test_contar_igual_a_forca_bruta(acidentes):
+    indice = IndiceKm(acidentes)
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        rodovia = rng.choice(['SP-055', 'SP-070', 'SP-310'])
+        km_inicio = float(rng.uniform(-5, 85))
+        km_fim = km_inicio + float(rng.uniform(0, 20))
+        assert indice.contar(rodovia, km_inicio, km_fim) == _forca_bruta(acidentes, rodovia, km_inicio, km_fim)
+
+
+def test_contar_inclui_as_bordas_do_trecho(acidentes):
+    indice = IndiceKm(acidentes)
+    km = acidentes.loc[acidentes['Rodovia'] == 'SP-070', 'Km'].dropna().iloc[0]
+    assert indice.contar('SP-070', km, km) == _forca_bruta(acidentes, 'SP-070', km, km)
+    assert indice.contar('SP-070', km, km)['Acidentes'] >= 1
+
+
+def test_rodovia_ausente_tem_contagem_zero(acidentes):
+    assert IndiceKm(acidentes).contar('SP-999', 0, 100) == dict.fromkeys(METRICAS_TRECHO, 0)
+
+
+def test_contar_trechos_igual_a_contar(acidentes):
+    indice = IndiceKm(acidentes)
+    inicios = np.arange(0, 80, 2.5)
+    resultado = indice.contar_trechos('SP-310', inicios, inicios + 4)
+    esperado = pd.DataFrame([indice.contar('SP-310', a, a + 4) for a in inicios])
+    pd.testing.assert_frame_equal(resultado, esperado[METRICAS_TRECHO], check_dtype=False)
+
+
+def _top_trechos_ingenuo(candidatas, k, metrica):
+    """Seleção gulosa de referência: reavalia todos os trechos escolhidos"""
+    candidatas = candidatas.sort_values([metrica, 'Acidentes', 'Rodovia', 'Km_Inicio'],
+                                        ascending=[False, False, True, True], kind='stable')
+    escolhidos = []
+    for linha in candidatas.itertuples(index=False):
+        if any(linha.Rodovia == e.Rodovia and linha.Km_Inicio <= e.Km_Fim and e.Km_Inicio <= linha.Km_Fim
+               for e in escolhidos):
+            continue
+        escolhidos.append(linha)
+        if len(escolhidos) == k:
+            break
+    return pd.DataFrame(escolhidos, columns=candidatas.columns)
+
+
+@pytest.mark.parametrize('k, comprimento, metrica', [(10, 1.0, 'Peso'), (40, 0.5, 'Acidentes'),
+                                                     (500, 3.0, 'Fatal')])
+def test_top_trechos_igual_a_selecao_ingenua(acidentes, k, comprimento, metrica):
+    indice = IndiceKm(acidentes)
+    resultado = indice.top_trechos(k, comprimento, metrica)
+    esperado = _top_trechos_ingenuo(indice.janelas(comprimento), k, metrica)
+    pd.testing.assert_frame_equal(resultado, esperado.reset_index(drop=True))
+
+
+def test_top_trechos_sem_sobreposicao(acidentes):
+    resultado = IndiceKm(acidentes).top_trechos(k=200, comprimento=2.0)
+    for _, trechos in resultado.groupby('Rodovia'):
+        trechos = trechos.sort_values('Km_Inicio')
+        assert (trechos['Km_Inicio'].to_numpy()[1:] > trechos['Km_Fim'].to_numpy()[:-1]).all()
+
+
+def test_janela_unica_por_rodovia_e_km(acidentes):
+    janelas = IndiceKm(acidentes).janelas(1.0)
+    assert not janelas.duplicated(['Rodovia', 'Km_Inicio']).any()
+    assert janelas['Acidentes'].min() >= 1
+
+
+@pytest.mark.parametrize('modulo', ['indice_km.py', 'densidade_km.py'])
+def test_chave_dos_graficos_por_km_inclui_os_modulos_de_analise(modulo):
+    # Gráficos 30 e 31 (gerar_graficos_6): PESO_FATAL ou BANDA_KM alterados
+    # precisam mudar a chave de cache
+    assert modulo in [os.path.basename(caminho) for caminho in dependencias_modulo('gerar_graficos_6')]
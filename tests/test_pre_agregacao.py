@@ -0,0 +1,119 @@
+"""
+Testes da pré-agregação dos gráficos de distribuição (pre_agregacao.py) contra o numpy
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from pre_agregacao import (contagens_celulas, contagens_celulas_faixas, histogramas, histogramas_contagens,
+                           quantis_contagens, resumos_caixa, resumos_caixa_contagens)
+
+
+@pytest.fixture
+def amostra():
+    """Valores assimétricos (com outliers) e nulos, em três anos e duas regionais"""
+    rng = np.random.default_rng(3)
+    n = 1500
+    valores = np.round(rng.lognormal(0.5, 0.8, n), 1)
+    valores[rng.random(n) < 0.03] = np.nan
+    return pd.DataFrame({
+        'valor': valores,
+        'Ano': rng.choice([2023, 2024, 2025], n),
+        'Regional': rng.choice(['DR-01', 'DR-02'], n),
+        'Km': rng.uniform(0, 300, n),
+    })
+
+
+def _caixa_numpy(valores):
+    valores = valores[~np.isnan(valores)]
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    baixo, alto = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    dentro = valores[(valores >= baixo) & (valores <= alto)]
+    fora = np.unique(valores[(valores < baixo) | (valores > alto)])
+    return [q1, mediana, q3, dentro.min(), dentro.max(), valores.mean(), valores.std(ddof=1)], fora
+
+
+def test_resumos_caixa_iguais_ao_numpy(amostra):
+    resumo, outliers = resumos_caixa(amostra['valor'], amostra['Ano'])
+    assert resumo.index.tolist() == [2023, 2024, 2025]
+    for ano, grupo in amostra.groupby('Ano'):
+        esperado, fora = _caixa_numpy(grupo['valor'].to_numpy())
+        linha = resumo.loc[ano, ['q1', 'mediana', 'q3', 'limite_inferior', 'limite_superior', 'media', 'dp']]
+        np.testing.assert_allclose(linha.to_numpy(dtype='float64'), esperado)
+        np.testing.assert_array_equal(outliers.get(ano, np.array([])), fora)
+    assert any(len(fora) for fora in outliers.values())
+
+
+def test_resumos_caixa_por_dois_grupos(amostra):
+    resumo, outliers = resumos_caixa(amostra['valor'], [amostra['Ano'], amostra['Regional']])
+    assert len(resumo) == 6
+    grupo = amostra[(amostra['Ano'] == 2024) & (amostra['Regional'] == 'DR-02')]
+    esperado, fora = _caixa_numpy(grupo['valor'].to_numpy())
+    np.testing.assert_allclose(resumo.loc[(2024, 'DR-02'), ['q1', 'mediana', 'q3']].to_numpy(dtype='float64'),
+                               esperado[:3])
+    np.testing.assert_array_equal(outliers.get((2024, 'DR-02'), np.array([])), fora)
+
+
+def test_histogramas_iguais_ao_numpy(amostra):
+    bordas, contagens = histogramas(amostra['Km'], amostra['Ano'], bins=50)
+    np.testing.assert_allclose(bordas, np.histogram_bin_edges(amostra['Km'], bins=50))
+    assert sorted(contagens) == [2023, 2024, 2025]
+    for ano, grupo in amostra.groupby('Ano'):
+        esperado, _ = np.histogram(grupo['Km'], bins=bordas)
+        np.testing.assert_array_equal(contagens[ano], esperado)
+    assert sum(c.sum() for c in contagens.values()) == len(amostra)
+
+
+def test_contagens_celulas_cobrem_todos_os_pontos(amostra):
+    dados = amostra.dropna(subset=['valor'])
+    celulas = contagens_celulas(dados['Km'], dados['valor'], dados['Ano'], largura_x=5)
+    assert celulas['Acidentes'].sum() == len(dados)
+    # Centro da faixa de 5 km de cada ponto
+    assert ((celulas['x'] - 2.5) % 5 == 0).all()
+    ponto = dados.iloc[0]
+    x = (np.floor(ponto['Km'] / 5) + 0.5) * 5
+    esperado = ((dados['Ano'] == ponto['Ano']) & (np.floor(dados['Km'] / 5) == np.floor(ponto['Km'] / 5))
+                & (dados['valor'] == ponto['valor'])).sum()
+    celula = celulas[(celulas['grupo'] == ponto['Ano']) & (celulas['x'] == x) & (celulas['y'] == ponto['valor'])]
+    assert celula['Acidentes'].tolist() == [esperado]
+
+
+def _contagens(amostra, colunas):
+    """Acidentes por combinação de valores (como banco_analitico.contagens_banco)"""
+    return amostra.dropna(subset=colunas).groupby(colunas).size().rename('Acidentes').reset_index()
+
+
+@pytest.mark.parametrize('por', [['Ano'], ['Ano', 'Regional']])
+def test_resumos_caixa_das_contagens_iguais_aos_das_linhas(amostra, por):
+    esperado, outliers_esperados = resumos_caixa(amostra['valor'], [amostra[p] for p in por])
+    resumo, outliers = resumos_caixa_contagens(_contagens(amostra, por + ['valor']), 'valor', por)
+    exatas = ['q1', 'mediana', 'q3', 'limite_inferior', 'limite_superior']
+    pd.testing.assert_frame_equal(resumo[exatas], esperado[exatas], check_exact=True, check_index_type=False)
+    pd.testing.assert_frame_equal(resumo[['media', 'dp']], esperado[['media', 'dp']], check_index_type=False)
+    assert list(outliers) == list(outliers_esperados)
+    for grupo, fora in outliers_esperados.items():
+        np.testing.assert_array_equal(outliers[grupo], fora)
+
+
+def test_quantis_das_contagens_iguais_ao_quantile(amostra):
+    quantis = [0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+    esperado = amostra.groupby('Ano')['valor'].quantile(quantis).unstack()
+    resultado = quantis_contagens(_contagens(amostra, ['Ano', 'valor']), 'valor', 'Ano', quantis)
+    pd.testing.assert_frame_equal(resultado, esperado, check_exact=True, check_index_type=False,
+                                  check_column_type=False)
+
+
+def test_histogramas_das_contagens_iguais_aos_das_linhas(amostra):
+    bordas_esperadas, esperado = histogramas(amostra['valor'], amostra['Ano'], bins=20)
+    bordas, contagens = histogramas_contagens(_contagens(amostra, ['Ano', 'valor']), 'valor', 'Ano', bins=20)
+    np.testing.assert_array_equal(bordas, bordas_esperadas)
+    assert list(contagens) == list(esperado)
+    for ano, contagem in esperado.items():
+        np.testing.assert_array_equal(contagens[ano], contagem)
+
+
+def test_celulas_das_faixas_iguais_as_das_linhas(amostra):
+    esperado = contagens_celulas(amostra['Km'], amostra['valor'], amostra['Ano'], largura_x=5)
+    faixas = amostra.assign(Km=np.floor(amostra['Km'] / 5).astype('int64'))
+    resultado = contagens_celulas_faixas(_contagens(faixas, ['Ano', 'Km', 'valor']), 'Km', 'valor', 'Ano', 5)
+    pd.testing.assert_frame_equal(resultado, esperado, check_exact=True)
@@ -0,0 +1,86 @@
+"""
+Testes da série temporal (serie_temporal.py) sobre o calendário diário denso
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from serie_temporal import calendario_diario, indice_sazonal, reamostrar, tabela_ano_mes, variacao
+
+
+@pytest.fixture
+def acidentes():
+    """Acidentes sintéticos de 2023 a 2024, com dias sem nenhum registro"""
+    rng = np.random.default_rng(11)
+    n = 3000
+    dias = rng.integers(0, 731, n)
+    dias = dias[(dias % 17) != 0]  # buracos no calendário
+    horas = rng.integers(0, 24 * 60, len(dias))
+    datas = pd.Timestamp('2023-01-01') + pd.to_timedelta(dias, unit='D') + pd.to_timedelta(horas, unit='min')
+    return pd.DataFrame({
+        'Data Abertura': datas,
+        'Regional': rng.choice(['DR-01', 'DR-02', 'DR-03'], len(dias)),
+        'Leve': rng.integers(0, 3, len(dias)),
+        'Grave': rng.integers(0, 2, len(dias)),
+        'Fatal': (rng.random(len(dias)) < 0.05).astype('int64'),
+    })
+
+
+def test_calendario_denso_e_com_as_somas(acidentes):
+    calendario = calendario_diario(acidentes)
+    datas = acidentes['Data Abertura'].dt.normalize()
+    assert calendario.index.equals(pd.date_range(datas.min(), datas.max(), freq='D', name='Data'))
+    assert list(calendario.columns) == ['Acidentes', 'Leve', 'Grave', 'Fatal']
+    assert (calendario.loc[~calendario.index.isin(datas), 'Acidentes'] == 0).all()
+
+    esperado = acidentes.groupby(datas.rename('Data'))[['Leve', 'Grave', 'Fatal']].sum()
+    esperado['Acidentes'] = datas.value_counts()
+    pd.testing.assert_frame_equal(calendario.loc[esperado.index, esperado.columns], esperado, check_dtype=False,
+                                  check_freq=False)
+
+
+def test_calendario_por_dimensao_soma_o_total(acidentes):
+    por_regional = calendario_diario(acidentes, por='Regional')
+    total = calendario_diario(acidentes)
+    assert por_regional.index.equals(total.index)
+    for metrica in total.columns:
+        pd.testing.assert_series_equal(por_regional[metrica].sum(axis=1), total[metrica], check_names=False,
+                                       check_dtype=False)
+
+
+def test_reamostrar_mensal_igual_ao_groupby(acidentes):
+    mensal = reamostrar(calendario_diario(acidentes)['Acidentes'], 'mes')
+    esperado = acidentes['Data Abertura'].dt.to_period('M').value_counts().sort_index()
+    assert mensal.tolist() == esperado.tolist()
+    assert mensal.index[0] == pd.Timestamp('2023-01-01')
+
+
+def test_variacao_anual_alinhada_pelo_calendario():
+    mensal = pd.Series([10.0, 20.0, 15.0, 30.0],
+                       index=pd.to_datetime(['2023-03-01', '2023-04-01', '2024-03-01', '2024-05-01']))
+    resultado = variacao(mensal, 'ano')
+    # Março/2024 contra março/2023; maio/2024 não tem referência (sem maio/2023)
+    assert resultado['2024-03-01'] == pytest.approx(50.0)
+    assert resultado[['2023-03-01', '2023-04-01', '2024-05-01']].isna().all()
+
+
+def test_ano_sem_registros_fica_fora_do_calendario(acidentes):
+    # Sem 2024 (ex.: planilha ausente): 2025 segue 2023 sem um 2024 zerado no meio
+    deslocadas = acidentes['Data Abertura'] + pd.DateOffset(years=1)
+    acidentes = acidentes.assign(**{'Data Abertura': acidentes['Data Abertura'].where(
+        acidentes['Data Abertura'].dt.year == 2023, deslocadas)})
+    calendario = calendario_diario(acidentes)
+    assert sorted(set(calendario.index.year)) == [2023, 2025]
+    assert calendario['Acidentes'].sum() == len(acidentes)
+
+    mensal = reamostrar(calendario['Acidentes'], 'mes')
+    assert len(mensal) == 24
+    assert list(tabela_ano_mes(mensal).index) == [2023, 2025]
+    # Janeiro/2025 não tem janeiro/2024 como referência: variação nula, não -100%
+    assert variacao(mensal, 'ano').isna().all()
+
+
+def test_indice_sazonal_com_media_cem(acidentes):
+    indice = indice_sazonal(calendario_diario(acidentes)['Acidentes'])
+    assert list(indice.index) == list(range(1, 13))
+    assert indice.mean() == pytest.approx(100.0)